@@ -3,6 +3,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Local storage for data built at deploy time (python -m services.vader_lexicon), not committed
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
 # API Keys (set these in .env file)
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")  # Get free key from newsapi.org
 GNEWS_API_KEY = os.getenv("GNEWS_API_KEY", "")  # Get free key from gnews.io
@@ -5,11 +5,12 @@ Uses VADER (Valence Aware Dictionary and sEntiment Reasoner)
 - Works well for social media text
 """
 
+import threading
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
 from cachetools import TTLCache
 from typing import Dict, List, Any, Optional
 from config import YSRCP_KEYWORDS, TDP_KEYWORDS
+from services.vader_lexicon import build_analyzer
 
 # Cache for sentiment results
 sentiment_cache = TTLCache(maxsize=500, ttl=3600)
@@ -17,41 +18,17 @@ sentiment_cache = TTLCache(maxsize=500, ttl=3600)
 
 class SentimentService:
     def __init__(self):
-        self.vader = SentimentIntensityAnalyzer()
-
-        # Add political context words to VADER
-        self._add_political_lexicon()
-
-    def _add_political_lexicon(self):
-        """Add political terms to VADER's lexicon"""
-        political_words = {
-            # Positive political terms
-            "welfare": 2.0,
-            "development": 1.5,
-            "progress": 1.5,
-            "success": 2.0,
-            "achievement": 2.0,
-            "benefit": 1.5,
-            "support": 1.0,
-            "victory": 2.5,
-            "growth": 1.5,
-
-            # Negative political terms
-            "corruption": -2.5,
-            "scam": -3.0,
-            "failure": -2.0,
-            "protest": -1.0,
-            "scandal": -2.5,
-            "controversy": -1.5,
-            "crisis": -2.0,
-            "opposition": -0.5,
-
-            # Telugu political terms (transliterated)
-            "manchidi": 2.0,  # Good
-            "chedda": -2.0,   # Bad
-        }
-
-        self.vader.lexicon.update(political_words)
+        # The VADER analyzer is built on first use, so cold starts that never score text skip it
+        self._vader: Optional[SentimentIntensityAnalyzer] = None
+        self._vader_lock = threading.Lock()
+
+    @property
+    def vader(self) -> SentimentIntensityAnalyzer:
+        if self._vader is None:
+            with self._vader_lock:
+                if self._vader is None:
+                    self._vader = build_analyzer()
+        return self._vader
 
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of a single text"""
@@ -209,6 +186,9 @@ class SentimentService:
 
     def extract_key_phrases(self, texts: List[str], top_n: int = 15) -> List[Dict[str, Any]]:
         """Extract key phrases/topics from texts using TextBlob"""
+        # TextBlob pulls in NLTK, which is slow to import - only load it when phrases are requested
+        from textblob import TextBlob
+
         all_phrases = {}
 
         for text in texts:
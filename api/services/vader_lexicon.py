@@ -0,0 +1,102 @@
+"""
+VADER Lexicon
+The political additions to VADER's lexicon, and the prebuilt lexicon file the sentiment service loads
+- Keep POLITICAL_LEXICON in step with backend/services/vader_lexicon.py
+- The file is written only by the build step (it is not committed), never while scoring, so
+  read-only serverless filesystems work: without a current file the analyzer is built in memory
+
+Build with: python -m services.vader_lexicon
+"""
+
+import importlib.metadata
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from config import DATA_DIR
+
+# Political context words added to VADER's lexicon
+POLITICAL_LEXICON = {
+    # Positive political terms
+    "welfare": 2.0,
+    "development": 1.5,
+    "progress": 1.5,
+    "success": 2.0,
+    "achievement": 2.0,
+    "benefit": 1.5,
+    "support": 1.0,
+    "victory": 2.5,
+    "growth": 1.5,
+
+    # Negative political terms
+    "corruption": -2.5,
+    "scam": -3.0,
+    "failure": -2.0,
+    "protest": -1.0,
+    "scandal": -2.5,
+    "controversy": -1.5,
+    "crisis": -2.0,
+    "opposition": -0.5,
+
+    # Telugu political terms (transliterated)
+    "manchidi": 2.0,  # Good
+    "chedda": -2.0,   # Bad
+}
+
+# VADER lexicon with the political additions, prebuilt so workers and cold starts load it in one step
+LEXICON_PATH = os.path.join(DATA_DIR, "vader_lexicon.pkl")
+
+
+def lexicon_version() -> Tuple:
+    """Identifies the prebuilt lexicon contents - a stale file is ignored"""
+    return importlib.metadata.version("vaderSentiment"), sorted(POLITICAL_LEXICON.items())
+
+
+def load_lexicon(path: str = LEXICON_PATH) -> Optional[Tuple[Dict[str, float], Dict[str, str]]]:
+    """(lexicon, emojis) from the prebuilt file, or None if it is missing or stale"""
+    try:
+        with open(path, 'rb') as f:
+            prebuilt = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[Sentiment] Could not load prebuilt lexicon: {e}")
+        return None
+    if prebuilt.get('version') != lexicon_version():
+        return None
+    return prebuilt['lexicon'], prebuilt['emojis']
+
+
+def build_analyzer(path: str = LEXICON_PATH) -> SentimentIntensityAnalyzer:
+    """
+    VADER analyzer with the political lexicon applied
+    Loaded from the prebuilt lexicon when there is one, instead of parsing VADER's lexicon files
+    """
+    prebuilt = load_lexicon(path)
+    if prebuilt is None:
+        analyzer = SentimentIntensityAnalyzer()
+        analyzer.lexicon.update(POLITICAL_LEXICON)
+        return analyzer
+
+    analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+    analyzer.lexicon, analyzer.emojis = prebuilt
+    return analyzer
+
+
+def write_lexicon(path: str = LEXICON_PATH):
+    """Build the lexicon from VADER's files and write it atomically (deploy-time build step)"""
+    analyzer = SentimentIntensityAnalyzer()
+    analyzer.lexicon.update(POLITICAL_LEXICON)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'version': lexicon_version(), 'lexicon': analyzer.lexicon, 'emojis': analyzer.emojis},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    write_lexicon()
+    print(f"Wrote {LEXICON_PATH}")
@@ -3,6 +3,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Local storage for durable service data (resolution tables, article store, ...)
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
 # API Keys (set these in .env file)
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")  # Get free key from newsapi.org
 GNEWS_API_KEY = os.getenv("GNEWS_API_KEY", "")  # Get free key from gnews.io
@@ -32,6 +35,17 @@ TDP_KEYWORDS = [
 YSRCP_HASHTAGS = ["#YSRCP", "#YSJagan", "#Navaratnalu", "#AmmaVodi", "#Jagananna"]
 TDP_HASHTAGS = ["#TDP", "#Chandrababu", "#TeluguDesam", "#NaraLokesh", "#Amaravati"]
 
+# Terms that tie a hashtag to a party (matched inside the tag, without '#')
+YSRCP_TAG_TERMS = ["ysrcp", "ysjagan", "jagan", "jagananna", "jaganmohan", "ysrcongress"]
+TDP_TAG_TERMS = ["tdp", "chandrababu", "naidu", "lokesh", "naralokesh", "telugudesam"]
+
+# Indicators used to decide which party a positive/negative text is about
+YSRCP_CONTEXT_TERMS = ["ysrcp", "jagan", "welfare", "navaratnalu", "amma vodi"]
+TDP_CONTEXT_TERMS = ["tdp", "chandrababu", "naidu", "amaravati"]
+
+# Words that mark a tweet as critical
+NEGATIVE_TERMS = ["fail", "scam", "corrupt", "arrest", "against", "protest", "fraud"]
+
 # Andhra Pradesh Districts
 AP_DISTRICTS = [
     "Visakhapatnam", "Vijayawada", "Guntur", "Tirupati", "Kurnool",
@@ -54,6 +68,26 @@ GOOGLE_NEWS_RSS = {
     "ap_politics": "https://news.google.com/rss/search?q=Andhra+Pradesh+politics+when:7d&hl=en-IN&gl=IN&ceid=IN:en"
 }
 
+# Sentiment backend: "vader" (fast default) or "transformer" (needs torch + transformers)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "vader")
+# Hugging Face model id or local directory for the transformer backend (the benchmark needs a local directory)
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "cardiffnlp/twitter-xlm-roberta-base-sentiment")
+
+# Sliding window for per-party sentiment aggregates (in hours)
+SENTIMENT_WINDOW_HOURS = float(os.getenv("SENTIMENT_WINDOW_HOURS", "168"))
+
+# Default window for news mention counts and sources (in hours)
+NEWS_WINDOW_HOURS = float(os.getenv("NEWS_WINDOW_HOURS", "168"))
+
+# Trending topics: recent mentions and burst score (z-score against the term's own baseline) a term needs
+# to trend; when nothing clears them, the terms most above their baseline are listed instead
+TOPIC_MIN_COUNT = int(os.getenv("TOPIC_MIN_COUNT", "3"))
+TOPIC_MIN_SCORE = float(os.getenv("TOPIC_MIN_SCORE", "6.0"))
+
+# Google Trends: independent pytrends sessions (each with its own cookies) and how many may be in use at once
+TRENDS_SESSIONS = int(os.getenv("TRENDS_SESSIONS", "3"))
+TRENDS_MAX_CONCURRENCY = int(os.getenv("TRENDS_MAX_CONCURRENCY", "2"))
+
 # Cache settings (in seconds)
 CACHE_TTL = {
     "trends": 3600,      # 1 hour
@@ -14,7 +14,9 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
 import uvicorn
+import asyncio
 import os
+import sys
 from pathlib import Path
 
 # Import Mangum for Vercel serverless deployment
@@ -38,8 +40,22 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting YSRCP Dashboard API...")
     print("📊 Services: Google Trends, News, Sentiment, Social Media")
     print("🌐 API Documentation: http://localhost:8000/docs")
+
+    # Warm the persistent Facebook page table in the background
+    from services.facebook_service import facebook_service
+    warm_task = asyncio.create_task(asyncio.to_thread(facebook_service.warm_page_table))
+    # Count stored news and posts into the trending topic baselines, so trends are meaningful from the start
+    from services.topic_trends import topic_trends
+    trends_task = asyncio.create_task(asyncio.to_thread(topic_trends.warm))
+
     yield
     # Shutdown
+    warm_task.cancel()
+    trends_task.cancel()
+    # Close the news feed client, if the news service was ever loaded
+    news_module = sys.modules.get("services.news_service")
+    if news_module is not None:
+        await news_module.news_service.aclose()
     print("👋 Shutting down API server...")
 
 
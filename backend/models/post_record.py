@@ -0,0 +1,81 @@
+"""
+Immutable post records shared by the social media services
+Posts are parsed once into read-only records and cached as-is;
+display fields (formatted counts, time ago, truncated text) are built at serialization
+"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+EMPTY_EXTRA: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True, slots=True)
+class PostRecord:
+    """A single post, tweet or video in one normalized, read-only shape"""
+    id: str
+    platform: str                  # 'twitter', 'instagram', 'facebook' or 'youtube'
+    party: str
+    text: str
+    author: str
+    timestamp: Optional[datetime]
+    likes: int = 0
+    comments: int = 0
+    shares: int = 0
+    views: int = 0
+    engagement: int = 0            # Platform-specific ranking metric
+    url: str = ''
+    thumbnail: str = ''
+    media_type: str = ''
+    extra: Mapping[str, Any] = EMPTY_EXTRA  # Platform-specific fields, frozen
+
+
+def freeze(value: Any) -> Any:
+    """Recursively make dicts and lists read-only so cached records can be shared safely"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Turn frozen values back into plain dicts and lists for JSON responses"""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def to_dict(record: PostRecord) -> Dict[str, Any]:
+    """Serialize a record in the normalized cross-platform shape"""
+    return {
+        'id': record.id,
+        'platform': record.platform,
+        'party': record.party,
+        'text': record.text,
+        'author': record.author,
+        'timestamp': record.timestamp.isoformat() if record.timestamp else None,
+        'likes': record.likes,
+        'comments': record.comments,
+        'shares': record.shares,
+        'views': record.views,
+        'engagement': record.engagement,
+        'url': record.url,
+        'thumbnail': record.thumbnail,
+        'mediaType': record.media_type
+    }
+
+
+def rank(records: Iterable[PostRecord], limit: Optional[int] = None) -> List[PostRecord]:
+    """
+    Order records by engagement (highest first) without touching the source sequence
+    Returns a new list of references to the same records, never copies
+    """
+    if limit is None:
+        return sorted(records, key=lambda r: r.engagement, reverse=True)
+    return heapq.nlargest(limit, records, key=lambda r: r.engagement)
@@ -3,9 +3,12 @@ API Routes for YSRCP Political Dashboard
 Uses lazy imports for faster startup
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import json
 
 # Lazy import helpers - services are loaded on first use, not at startup
 _services = {}
@@ -40,6 +43,15 @@ def get_service(name):
         elif name == 'stats':
             from services.stats_aggregator import stats_aggregator
             _services[name] = stats_aggregator
+        elif name == 'posts':
+            from services.post_store import post_store
+            _services[name] = post_store
+        elif name == 'post_sentiment':
+            from services.post_sentiment import post_sentiment
+            _services[name] = post_sentiment
+        elif name == 'search':
+            from services.article_store import article_store
+            _services[name] = article_store
     return _services[name]
 
 router = APIRouter(prefix="/api", tags=["Dashboard API"])
@@ -172,7 +184,8 @@ async def get_dashboard_data():
         # Get sentiment from news articles
         ysrcp_texts = [a['title'] + ' ' + a.get('description', '') for a in news_data['ysrcp']['articles']]
         tdp_texts = [a['title'] + ' ' + a.get('description', '') for a in news_data['tdp']['articles']]
-        sentiment_data = get_service('sentiment').get_sentiment_score(ysrcp_texts, tdp_texts)
+        sentiment_data = (get_service('sentiment').get_window_score()
+                          or get_service('sentiment').get_sentiment_score(ysrcp_texts, tdp_texts))
 
         return {
             "overallStats": overall_stats,
@@ -307,10 +320,13 @@ async def get_trending_hashtags():
 
 
 @router.get("/news")
-async def get_news():
-    """Get news articles for both parties"""
+async def get_news(hours: Optional[float] = None):
+    """
+    Get news articles for both parties
+    Mentions and sources cover the last `hours` of stored articles, e.g. /api/news?hours=24
+    """
     try:
-        return await get_service('news').get_all_news()
+        return await get_service('news').get_all_news(hours)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -334,7 +350,20 @@ async def get_sentiment():
         ysrcp_texts = [a['title'] + ' ' + a.get('description', '') for a in news_data['ysrcp']['articles']]
         tdp_texts = [a['title'] + ' ' + a.get('description', '') for a in news_data['tdp']['articles']]
 
-        return get_service('sentiment').get_sentiment_score(ysrcp_texts, tdp_texts)
+        return (get_service('sentiment').get_window_score()
+                or get_service('sentiment').get_sentiment_score(ysrcp_texts, tdp_texts))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/sentiment/posts")
+async def get_post_sentiment():
+    """
+    Get sentiment distributions of social posts (tweets, Instagram, Facebook, YouTube)
+    per platform and per party, scored in the background as posts are ingested
+    """
+    try:
+        return get_service('post_sentiment').get_distributions()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -348,7 +377,7 @@ async def analyze_text(data: Dict[str, Any]):
             raise HTTPException(status_code=400, detail="Text is required")
 
         result = get_service('sentiment').analyze_text(text)
-        party_context = get_service('sentiment').classify_party_sentiment(text)
+        party_context = get_service('sentiment').classify_party_sentiment(text, result)
 
         return {
             "analysis": result,
@@ -358,6 +387,98 @@ async def analyze_text(data: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+MAX_BULK_TEXTS = 10000   # Texts accepted per bulk request
+MAX_BULK_BYTES = 10 * 1024 * 1024  # Body bytes accepted per bulk request
+BULK_CHUNK_SIZE = 500    # Texts scored (and streamed back) per step
+
+
+@router.post("/sentiment/analyze/bulk")
+async def analyze_texts_bulk(request: Request):
+    """
+    Analyze sentiment of many texts in one call, streaming NDJSON results back as they are scored
+    Body: a JSON array, or NDJSON (Content-Type: application/x-ndjson) with one item per line.
+    Items are strings or {"id": ..., "text": ...}; each result line carries the item's index and id.
+    At most MAX_BULK_TEXTS texts and MAX_BULK_BYTES bytes per request. Results are scored one chunk
+    at a time, and the next chunk is only scored once the client has consumed the previous one.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_BULK_BYTES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_BYTES} bytes per request")
+
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = await _read_ndjson(request)
+    else:
+        body = b"".join([chunk async for chunk in _read_body(request)])
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if len(items) > MAX_BULK_TEXTS:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_TEXTS} texts per request")
+
+    return StreamingResponse(_stream_bulk_results(items), media_type="application/x-ndjson")
+
+
+async def _read_body(request: Request):
+    """
+    Body chunks as they arrive, rejecting the request once MAX_BULK_BYTES have been received
+    (Content-Length can be absent with chunked uploads, or wrong)
+    """
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_BULK_BYTES:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_BYTES} bytes per request")
+        yield chunk
+
+
+async def _read_ndjson(request: Request) -> List[Any]:
+    """Parse NDJSON items as the body arrives, rejecting the request as soon as it is too large"""
+    items = []
+    buffer = b""
+    async for chunk in _read_body(request):
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        items.extend(line for line in lines if line.strip())
+        if len(items) > MAX_BULK_TEXTS:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_TEXTS} texts per request")
+    if buffer.strip():
+        items.append(buffer)
+
+    try:
+        return [json.loads(line) for line in items]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid NDJSON: {e}")
+
+
+async def _stream_bulk_results(items: List[Any]):
+    """Score items chunk by chunk and yield one NDJSON line per item"""
+    for start in range(0, len(items), BULK_CHUNK_SIZE):
+        chunk = list(enumerate(items[start:start + BULK_CHUNK_SIZE], start))
+        for line in await run_in_threadpool(_analyze_bulk_chunk, chunk):
+            yield line
+
+
+def _analyze_bulk_chunk(chunk: List[Tuple[int, Any]]) -> List[str]:
+    """Analyze one chunk of (index, item) pairs, scoring every text once"""
+    valid = []
+    lines = {}
+    for index, item in chunk:
+        item_id = item.get("id") if isinstance(item, dict) else None
+        text = item.get("text") if isinstance(item, dict) else item
+        if isinstance(text, str) and text:
+            valid.append((index, item_id, text))
+        else:
+            lines[index] = {"index": index, "id": item_id, "error": "Text is required"}
+
+    results = get_service('sentiment').analyze_texts([text for _, _, text in valid])
+    for (index, item_id, _), result in zip(valid, results):
+        lines[index] = {"index": index, "id": item_id, **result}
+
+    return [json.dumps(lines[index]) + "\n" for index, _ in chunk]
+
+
 @router.get("/alerts")
 async def get_alerts():
     """Get alerts and notifications"""
@@ -538,6 +659,57 @@ async def get_facebook_page_posts(profile_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ==================== UNIFIED POST ENDPOINTS ====================
+
+@router.get("/posts/top")
+async def get_top_posts(party: Optional[str] = None, platform: Optional[str] = None,
+                        author: Optional[str] = None, hours: Optional[float] = None, limit: int = 10):
+    """
+    Get top posts by engagement across all platforms from the unified post store
+    e.g. /api/posts/top?party=tdp&hours=6&limit=10
+    """
+    try:
+        from models.post_record import to_dict
+        since = datetime.now() - timedelta(hours=hours) if hours else None
+        posts = get_service('posts').top(limit, party=party, platform=platform, author=author, since=since)
+        return {"posts": [to_dict(p) for p in posts], "count": len(posts)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ==================== SEARCH ENDPOINTS ====================
+
+@router.get("/search")
+async def search(q: str, party: Optional[str] = None, platform: Optional[str] = None,
+                 hours: Optional[float] = None, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None, limit: int = 20):
+    """
+    Full-text search over stored news articles and social posts, best matches first
+    Served from the local index, so it spends no upstream API quota
+    e.g. /api/search?q=jagan "welfare scheme"&party=ysrcp&platform=twitter&hours=48
+    platform is 'news' or a social platform; since/until are ISO dates
+    """
+    try:
+        start = datetime.now()
+        since_ts = since.timestamp() if since else None
+        if hours:
+            since_ts = max(since_ts or 0, (start - timedelta(hours=hours)).timestamp())
+        results = await run_in_threadpool(
+            get_service('search').search, q, party=party, platform=platform,
+            since=since_ts, until=until.timestamp() if until else None, limit=limit
+        )
+        for result in results:
+            result["publishedAt"] = datetime.fromtimestamp(result["publishedAt"]).isoformat()
+        return {
+            "query": q,
+            "results": results,
+            "count": len(results),
+            "tookMs": round((datetime.now() - start).total_seconds() * 1000, 1)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ==================== INFLUENCER ENDPOINTS ====================
 
 @router.get("/influencers")
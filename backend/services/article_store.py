@@ -0,0 +1,350 @@
+"""
+News Article Store
+Persists every fetched news article in SQLite, keyed by party and link/GUID, with an FTS5
+full-text index over titles and descriptions
+- Each fetch ingests only articles not already stored
+- Mention counts and sources are queries over any time window,
+  not just the latest page of a feed
+- Social posts from the unified post store (tweets, Instagram captions, Facebook messages,
+  YouTube titles) are kept alongside, so search covers their history after the in-memory store evicts them;
+  they are written by a background thread, off the post store's listener loop
+- Articles and posts have separate FTS5 indexes whose BM25 statistics differ, so search ranks each
+  result relative to the best match from its own index
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import DATA_DIR
+from models.post_record import PostRecord
+from services.post_store import PostKey, PostListener, post_store
+
+DB_PATH = os.path.join(DATA_DIR, "articles.db")
+RETENTION_DAYS = 180  # Articles and posts published before this are pruned on ingest
+MAX_SEARCH_RESULTS = 100
+POST_BATCH_SIZE = 2000  # Posts written per transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    party TEXT NOT NULL,
+    key TEXT NOT NULL,
+    story TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT,
+    source TEXT,
+    description TEXT,
+    published_at REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    UNIQUE (party, key)
+);
+CREATE INDEX IF NOT EXISTS articles_party_time ON articles (party, published_at);
+CREATE INDEX IF NOT EXISTS articles_time ON articles (published_at);
+CREATE INDEX IF NOT EXISTS articles_key ON articles (key);
+
+-- Telugu vowel signs are combining marks, so marks count as token characters
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, content='articles', content_rowid='id',
+    tokenize="unicode61 categories 'L* N* Co M*'"
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    party TEXT NOT NULL,
+    text TEXT NOT NULL,
+    author TEXT,
+    url TEXT,
+    engagement INTEGER NOT NULL DEFAULT 0,
+    published_at REAL NOT NULL,
+    UNIQUE (platform, post_id)
+);
+CREATE INDEX IF NOT EXISTS posts_time ON posts (published_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    text, author, content='posts', content_rowid='id',
+    tokenize="unicode61 categories 'L* N* Co M*'"
+);
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, text, author) VALUES (new.id, new.text, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, text, author) VALUES ('delete', old.id, old.text, old.author);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE OF text, author ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, text, author) VALUES ('delete', old.id, old.text, old.author);
+    INSERT INTO posts_fts (rowid, text, author) VALUES (new.id, new.text, new.author);
+END;
+"""
+
+# Quoted phrases or single words of a search query
+_QUERY_TERMS = re.compile(r'"([^"]+)"|(\S+)')
+
+
+
+def fts_phrase(term: str) -> str:
+    """FTS5 query matching a term (or phrase) as a word prefix, e.g. 'farm' matches 'farmers'"""
+    return '"' + term.replace('"', '""') + '"*'
+
+
+def fts_query(query: str) -> str:
+    """
+    FTS5 query matching every word (as a prefix) and quoted phrase of a user query
+    e.g. 'jagan "welfare scheme"' matches texts containing jagan* and the exact phrase
+    User input never reaches FTS5 as syntax, so operators and stray quotes can't break the query
+    """
+    terms = []
+    for phrase, word in _QUERY_TERMS.findall(query):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+        elif word.strip('"'):
+            terms.append(fts_phrase(word.strip('"')))
+    return " ".join(terms)
+
+
+class ArticleStore(PostListener):
+    """SQLite-backed article and post history shared by the news service and search"""
+
+    def __init__(self, path: str = DB_PATH, retention_days: float = RETENTION_DAYS):
+        self.path = path
+        self.retention_seconds = retention_days * 86400
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._post_queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._writer_lock = threading.Lock()
+        self._writer = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (callers hold the lock)"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def ingest(self, party: str, articles: Iterable[Tuple[str, str, Dict[str, Any], Optional[float]]]) -> int:
+        """
+        Store (key, story id, article, published timestamp) entries not already stored for the party,
+        and move already stored ones to the story id given (story clusters merge over time)
+        Returns the number of new articles
+        """
+        now = time.time()
+        rows = [
+            (party, key, story, article.get('title', ''), article.get('link'), article.get('source'),
+             article.get('description', ''), published if published is not None else now, now)
+            for key, story, article, published in articles
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                # rowcount counts inserted rows only; total_changes would include the FTS trigger writes
+                added = conn.executemany(
+                    "INSERT INTO articles (party, key, story, title, link, source, description, published_at, "
+                    "first_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (party, key) DO NOTHING",
+                    rows
+                ).rowcount
+                conn.executemany(
+                    "UPDATE articles SET story = ? WHERE party = ? AND key = ? AND story != ?",
+                    [(row[2], row[0], row[1], row[2]) for row in rows]
+                )
+                conn.execute("DELETE FROM articles WHERE published_at < ?", (now - self.retention_seconds,))
+        return added
+
+    def retag(self, stories: Dict[str, str]):
+        """Move stored articles (of every party) to new story ids, as {key: story id}"""
+        if not stories:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("UPDATE articles SET story = ? WHERE key = ? AND story != ?",
+                                 [(story, key, story) for key, story in stories.items()])
+
+    def posts_added(self, records: List[PostRecord]):
+        """Queue posts to be stored (or their text and engagement refreshed); the writer thread starts on first use"""
+        now = time.time()
+        for record in records:
+            self._post_queue.put((record.platform, record.id, record.party, record.text, record.author, record.url,
+                                  record.engagement, record.timestamp.timestamp() if record.timestamp else now))
+
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run_writer, name="article-store-posts", daemon=True)
+                self._writer.start()
+
+    def _run_writer(self):
+        while True:
+            rows = [self._post_queue.get()]
+            while len(rows) < POST_BATCH_SIZE:
+                try:
+                    rows.append(self._post_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_posts(rows)
+            except Exception as e:
+                print(f"[ArticleStore] Could not store posts: {e}")
+            finally:
+                for _ in rows:
+                    self._post_queue.task_done()
+
+    def _write_posts(self, rows: List[Tuple]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO posts (platform, post_id, party, text, author, url, engagement, published_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (platform, post_id) DO UPDATE SET "
+                    "party = excluded.party, text = excluded.text, author = excluded.author, "
+                    "url = excluded.url, engagement = excluded.engagement",
+                    rows
+                )
+                conn.execute("DELETE FROM posts WHERE published_at < ?", (now - self.retention_seconds,))
+
+    def posts_removed(self, keys: List[PostKey]):
+        """Posts evicted from the in-memory store stay searchable until the retention period ends"""
+
+    def flush(self):
+        """Wait until every queued post has been written"""
+        self._post_queue.join()
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _window(party: Optional[str], since: Optional[float], until: Optional[float]) -> Tuple[str, Tuple]:
+        """WHERE clause (on table alias a) for an optional party and time window"""
+        clauses, params = [], []
+        if party:
+            clauses.append("a.party = ?")
+            params.append(party)
+        if since is not None:
+            clauses.append("a.published_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("a.published_at < ?")
+            params.append(until)
+        return (" AND ".join(clauses) or "1"), tuple(params)
+
+    def mention_count(self, party: str, since: Optional[float] = None, until: Optional[float] = None) -> int:
+        """Distinct stories about a party published in the window"""
+        where, params = self._window(party, since, until)
+        return self._query(f"SELECT COUNT(DISTINCT a.story) FROM articles a WHERE {where}", params)[0][0]
+
+    def sources(self, party: str, since: Optional[float] = None, until: Optional[float] = None,
+                limit: int = 5) -> List[str]:
+        """Outlets that published the most articles about a party in the window"""
+        where, params = self._window(party, since, until)
+        rows = self._query(
+            f"SELECT COALESCE(a.source, 'Unknown') AS s, COUNT(*) AS n FROM articles a WHERE {where} "
+            f"GROUP BY s ORDER BY n DESC, s LIMIT ?",
+            params + (limit,)
+        )
+        return [source for source, _ in rows]
+
+    def articles_since(self, since: float) -> List[Tuple[str, str, str, float]]:
+        """(key, title, description, published timestamp) of articles published since a timestamp, oldest first"""
+        return self._query(
+            "SELECT key, MIN(title), MIN(description), MIN(published_at) AS published FROM articles "
+            "WHERE published_at >= ? GROUP BY key ORDER BY published",
+            (since,)
+        )
+
+    def posts_since(self, since: float) -> List[Tuple[str, str, float]]:
+        """('platform:post_id', text, published timestamp) of posts published since a timestamp, oldest first"""
+        return self._query(
+            "SELECT platform || ':' || post_id, text, published_at FROM posts WHERE published_at >= ? "
+            "ORDER BY published_at",
+            (since,)
+        )
+
+    def search(self, query: str, party: Optional[str] = None, platform: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        News articles and social posts matching a query, best match first (newest first on ties)
+        platform is 'news' for articles only, or a social platform ('twitter', 'instagram', ...)
+        score is a result's BM25 score relative to the best match from the same index (1.0 for the best),
+        since articles and posts are ranked with different corpus statistics
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+        where, params = self._window(party, since, until)
+        results = []
+
+        if platform in (None, "news"):
+            # An article fetched for several parties is stored once per party; return its best row
+            rows = self._query(
+                f"WITH matches AS MATERIALIZED ("
+                f"SELECT a.key, a.party, a.title, a.link, a.source, a.published_at, "
+                f"bm25(articles_fts, 2.0, 1.0) AS score, snippet(articles_fts, -1, '<b>', '</b>', '…', 16) AS snippet "
+                f"FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+                f"WHERE articles_fts MATCH ? AND {where}) "
+                f"SELECT key, party, title, link, source, published_at, MIN(score) AS best, snippet "
+                f"FROM matches GROUP BY key ORDER BY best, published_at DESC LIMIT ?",
+                (match,) + params + (limit,)
+            )
+            results += [{
+                "type": "news", "platform": "news", "id": key, "party": row_party, "text": title,
+                "url": link or "", "author": source or "Unknown", "publishedAt": published,
+                "score": score, "snippet": snippet
+            } for (key, row_party, title, link, source, published, _, snippet), score
+                in zip(rows, self._relative_scores([row[6] for row in rows]))]
+
+        if platform != "news":
+            post_where = where + (" AND a.platform = ?" if platform else "")
+            post_params = params + ((platform,) if platform else ())
+            rows = self._query(
+                f"SELECT a.platform, a.post_id, a.party, a.text, a.url, a.author, a.published_at, a.engagement, "
+                f"bm25(posts_fts, 2.0, 1.0) AS score, snippet(posts_fts, 0, '<b>', '</b>', '…', 16) "
+                f"FROM posts_fts JOIN posts a ON a.id = posts_fts.rowid "
+                f"WHERE posts_fts MATCH ? AND {post_where} ORDER BY score, a.published_at DESC LIMIT ?",
+                (match,) + post_params + (limit,)
+            )
+            results += [{
+                "type": "post", "platform": row_platform, "id": post_id, "party": row_party, "text": text,
+                "url": url or "", "author": author or "", "publishedAt": published, "engagement": engagement,
+                "score": score, "snippet": snippet
+            } for (row_platform, post_id, row_party, text, url, author, published, engagement, _, snippet), score
+                in zip(rows, self._relative_scores([row[8] for row in rows]))]
+
+        results.sort(key=lambda r: (-r["score"], -r["publishedAt"]))
+        return results[:limit]
+
+    @staticmethod
+    def _relative_scores(scores: List[float]) -> List[float]:
+        """BM25 scores (negative, lower is better) as fractions of the best one"""
+        best = min(scores, default=0.0)
+        if best >= 0:
+            return [1.0] * len(scores)
+        return [round(score / best, 4) for score in scores]
+
+    def size(self) -> int:
+        return self._query("SELECT COUNT(*) FROM articles")[0][0]
+
+
+# Singleton instance, fed by the news service and the post store
+article_store = ArticleStore()
+post_store.subscribe(article_store)
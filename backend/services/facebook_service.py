@@ -8,8 +8,13 @@ import urllib.request
 import urllib.parse
 import json
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from config import DATA_DIR
+from models.post_record import PostRecord, freeze, rank
+from services.post_store import post_store
 
 # RapidAPI Configuration - Facebook Scraper 3
 RAPIDAPI_KEY = os.getenv('RAPIDAPI_KEY', '922556e08bmsh465b2b5025c11a5p176967jsn3ca78cdb094c')
@@ -21,6 +26,13 @@ FACEBOOK_PAGE_URLS = {
     'tdp': 'https://www.facebook.com/TDP.Official'
 }
 
+# Durable URL -> page_id/profile table (page IDs never change, so this outlives clear_cache())
+PAGE_TABLE_PATH = os.path.join(DATA_DIR, 'facebook_pages.json')
+
+
+class PageNotFoundError(Exception):
+    """Raised when the API answers 404 for a page, e.g. a stale page_id"""
+
 
 class FacebookService:
     def __init__(self):
@@ -28,10 +40,11 @@ class FacebookService:
         self.host = RAPIDAPI_HOST
         self.cache = {}
         self.cache_duration = timedelta(minutes=30)
-        # Cache for page_ids to avoid repeated lookups
-        self.page_id_cache = {}
+        # Persistent page resolution table, loaded from disk at startup
+        self.page_table_lock = threading.Lock()
+        self.page_table = self._load_page_table()
 
-    def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
+    def _make_request(self, endpoint: str, params: Dict = None, raise_not_found: bool = False) -> Optional[Dict]:
         """Make a GET request to Facebook Scraper 3 API via RapidAPI"""
         try:
             base_url = f"https://{self.host}/{endpoint}"
@@ -51,6 +64,8 @@ class FacebookService:
                 return data
         except urllib.error.HTTPError as e:
             print(f"Facebook API HTTP error: {e.code} - {e.reason}")
+            if raise_not_found and e.code == 404:
+                raise PageNotFoundError(endpoint) from e
             try:
                 error_body = e.read().decode()
                 print(f"Error body: {error_body}")
@@ -95,9 +110,9 @@ class FacebookService:
             'url': results.get('url', page_url)
         }
 
-        # Cache the page_id for quick lookup
+        # Record the page_id in the persistent resolution table
         if page_details['page_id']:
-            self.page_id_cache[page_url] = page_details['page_id']
+            self._store_page(page_url, page_details)
 
         # Cache the result
         self.cache[cache_key] = (page_details, datetime.now())
@@ -105,16 +120,66 @@ class FacebookService:
 
     def get_page_id(self, page_url: str) -> Optional[str]:
         """Get page_id from URL - uses cache or fetches page details"""
-        # Check page_id cache first
-        if page_url in self.page_id_cache:
-            return self.page_id_cache[page_url]
+        page = self._resolve_page(page_url)
+        return page['page_id'] if page else None
+
+    def _resolve_page(self, page_url: str, refresh: bool = False) -> Optional[Dict]:
+        """
+        Resolve a page URL to a shared record of page_id, name and followers
+        Served from the persistent table; page details are only fetched on a miss or refresh
+        """
+        if not refresh and page_url in self.page_table:
+            return self.page_table[page_url]
+
+        if refresh:
+            self.cache.pop(f"fb_page_details_{page_url}", None)
 
-        # Fetch page details to get page_id
         details = self.get_page_details(page_url)
-        if details and details.get('page_id'):
-            return details['page_id']
+        if not details or not details.get('page_id'):
+            return None
 
-        return None
+        return self.page_table.get(page_url)
+
+    def _load_page_table(self) -> Dict[str, Dict]:
+        """Load the URL -> page record table from disk"""
+        try:
+            with open(PAGE_TABLE_PATH, 'r', encoding='utf-8') as f:
+                table = json.load(f)
+            print(f"[Facebook] Loaded {len(table)} page records from {PAGE_TABLE_PATH}")
+            return table
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[Facebook] Could not load page table: {e}")
+            return {}
+
+    def _store_page(self, page_url: str, page_details: Dict):
+        """Add or update a page record and write the table back to disk"""
+        record = {
+            'page_id': page_details['page_id'],
+            'name': page_details.get('name', ''),
+            'followers': page_details.get('followers', 0),
+            'image': page_details.get('image', ''),
+            'verified': page_details.get('verified', False),
+            'resolvedAt': datetime.now().isoformat()
+        }
+
+        with self.page_table_lock:
+            self.page_table[page_url] = record
+            try:
+                os.makedirs(os.path.dirname(PAGE_TABLE_PATH), exist_ok=True)
+                tmp_path = f"{PAGE_TABLE_PATH}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.page_table, f, indent=2)
+                os.replace(tmp_path, PAGE_TABLE_PATH)
+            except Exception as e:
+                print(f"[Facebook] Could not save page table: {e}")
+
+    def warm_page_table(self):
+        """Resolve any tracked page that is not yet in the persistent table"""
+        for page_url in FACEBOOK_PAGE_URLS.values():
+            if page_url not in self.page_table:
+                self._resolve_page(page_url)
 
     def _format_count(self, count: int) -> str:
         """Format large numbers"""
@@ -153,8 +218,8 @@ class FacebookService:
         except:
             return timestamp
 
-    def _parse_post(self, post_data: Dict, party: str = 'unknown', page_name: str = '') -> Optional[Dict]:
-        """Parse a post from the page/posts API response"""
+    def _parse_post(self, post_data: Dict, party: str = 'unknown', page_name: str = '') -> Optional[PostRecord]:
+        """Parse a post from the page/posts API response into an immutable record"""
         try:
             post_id = post_data.get('post_id', '')
             if not post_id:
@@ -178,11 +243,9 @@ class FacebookService:
             # Get timestamp - API returns Unix timestamp as integer
             timestamp_raw = post_data.get('timestamp', 0)
             if isinstance(timestamp_raw, int) and timestamp_raw > 0:
-                timestamp = datetime.fromtimestamp(timestamp_raw).isoformat()
-                time_ago = self._parse_time_ago(timestamp)
+                timestamp = datetime.fromtimestamp(timestamp_raw)
             else:
-                timestamp = ''
-                time_ago = ''
+                timestamp = None
 
             # Get media URLs - image/video are dicts with 'uri' key
             image_url = ''
@@ -200,40 +263,67 @@ class FacebookService:
             if not author_name:
                 author_name = page_name or party.upper()
 
-            return {
-                'id': post_id,
-                'message': message[:200] + '...' if len(message) > 200 else message,
-                'fullMessage': message,
-                'reactions': reactions,
-                'likes': reactions,
-                'reactionsFormatted': self._format_count(reactions),
-                'comments': comments,
-                'commentsFormatted': self._format_count(comments),
-                'shares': shares,
-                'sharesFormatted': self._format_count(shares),
-                'views': views,
-                'viewsFormatted': self._format_count(views),
-                'mediaType': media_type,
-                'imageUrl': image_url,
-                'videoUrl': video_url,
-                'thumbnail': image_url,
-                'hasVideo': bool(video_data),
-                'hasMedia': has_media,
-                'author': author_name,
-                'authorImage': author_image,
-                'isVerified': True,  # Official pages are verified
-                'timestamp': timestamp,
-                'timeAgo': time_ago,
-                'url': post_data.get('url', ''),
-                'party': party
-            }
+            return PostRecord(
+                id=post_id,
+                platform='facebook',
+                party=party,
+                text=message,
+                author=author_name,
+                timestamp=timestamp,
+                likes=reactions,
+                comments=comments,
+                shares=shares,
+                views=views,
+                engagement=reactions + comments + shares,
+                url=post_data.get('url', ''),
+                thumbnail=image_url,
+                media_type=media_type,
+                extra=freeze({
+                    'videoUrl': video_url,
+                    'hasVideo': bool(video_data),
+                    'hasMedia': has_media,
+                    'authorImage': author_image
+                })
+            )
         except Exception as e:
             print(f"Error parsing Facebook post: {e}")
             import traceback
             traceback.print_exc()
             return None
 
-    def get_page_posts(self, page_url: str, party: str = 'unknown') -> List[Dict]:
+    def _serialize_post(self, post: PostRecord) -> Dict:
+        """Build the API/display representation of a post record"""
+        message = post.text
+        timestamp = post.timestamp.isoformat() if post.timestamp else ''
+        return {
+            'id': post.id,
+            'message': message[:200] + '...' if len(message) > 200 else message,
+            'fullMessage': message,
+            'reactions': post.likes,
+            'likes': post.likes,
+            'reactionsFormatted': self._format_count(post.likes),
+            'comments': post.comments,
+            'commentsFormatted': self._format_count(post.comments),
+            'shares': post.shares,
+            'sharesFormatted': self._format_count(post.shares),
+            'views': post.views,
+            'viewsFormatted': self._format_count(post.views),
+            'mediaType': post.media_type,
+            'imageUrl': post.thumbnail,
+            'videoUrl': post.extra['videoUrl'],
+            'thumbnail': post.thumbnail,
+            'hasVideo': post.extra['hasVideo'],
+            'hasMedia': post.extra['hasMedia'],
+            'author': post.author,
+            'authorImage': post.extra['authorImage'],
+            'isVerified': True,  # Official pages are verified
+            'timestamp': timestamp,
+            'timeAgo': self._parse_time_ago(timestamp),
+            'url': post.url,
+            'party': post.party
+        }
+
+    def get_page_posts(self, page_url: str, party: str = 'unknown') -> Tuple[PostRecord, ...]:
         """Get posts from a Facebook page using page_id"""
         cache_key = f"fb_page_posts_{page_url}"
 
@@ -243,25 +333,31 @@ class FacebookService:
             if datetime.now() - cached_time < self.cache_duration:
                 return cached_data
 
-        # First get the page_id
-        page_id = self.get_page_id(page_url)
-        if not page_id:
+        # Resolve page_id and page name (for the author field) in one lookup
+        page = self._resolve_page(page_url)
+        if not page:
             print(f"[Facebook] Could not get page_id for {page_url}")
-            return []
-
-        # Get page name for author field
-        details = self.get_page_details(page_url)
-        page_name = details.get('name', '') if details else ''
+            return ()
+        page_id = page['page_id']
+        page_name = page['name']
 
         # Now fetch posts using page_id
         print(f"[Facebook] Fetching posts for page_id: {page_id}")
-        response = self._make_request('page/posts', {'page_id': page_id})
+        try:
+            response = self._make_request('page/posts', {'page_id': page_id}, raise_not_found=True)
+        except PageNotFoundError:
+            # The stored page_id is stale - resolve the page again and retry once
+            page = self._resolve_page(page_url, refresh=True)
+            if not page:
+                return ()
+            page_id = page['page_id']
+            page_name = page['name']
+            response = self._make_request('page/posts', {'page_id': page_id})
 
         if not response:
             print(f"[Facebook] No response for page posts")
-            return []
+            return ()
 
-        posts = []
         # Get posts from response - could be in 'results' or 'data'
         post_list = response.get('results', []) or response.get('data', [])
 
@@ -271,10 +367,10 @@ class FacebookService:
 
         print(f"[Facebook] Found {len(post_list)} posts for {party}")
 
-        for post_data in post_list:
-            post = self._parse_post(post_data, party, page_name)
-            if post:
-                posts.append(post)
+        posts = tuple(
+            post for post in (self._parse_post(post_data, party, page_name) for post_data in post_list) if post
+        )
+        post_store.add_many(posts)
 
         # Cache results
         if posts:
@@ -293,38 +389,26 @@ class FacebookService:
         }
 
         try:
-            # Fetch YSRCP posts from official page
-            if party in ['all', 'ysrcp']:
-                ysrcp_posts = self.get_page_posts(FACEBOOK_PAGE_URLS['ysrcp'], 'ysrcp')
-
-                if ysrcp_posts:
-                    # Sort by engagement and take top 20
-                    ysrcp_posts.sort(key=lambda x: x['reactions'] + x['comments'] + x['shares'], reverse=True)
-                    result['ysrcp']['posts'] = ysrcp_posts[:20]
-                    result['ysrcp']['totalEngagement'] = sum(
-                        p['reactions'] + p['comments'] + p['shares'] for p in ysrcp_posts[:20]
-                    )
-                    result['isLive'] = True
-                    print(f"[Facebook] YSRCP: {len(ysrcp_posts)} posts, engagement: {result['ysrcp']['totalEngagement']}")
-
-            # Fetch TDP posts from official page
-            if party in ['all', 'tdp']:
-                tdp_posts = self.get_page_posts(FACEBOOK_PAGE_URLS['tdp'], 'tdp')
-
-                if tdp_posts:
-                    # Sort by engagement and take top 20
-                    tdp_posts.sort(key=lambda x: x['reactions'] + x['comments'] + x['shares'], reverse=True)
-                    result['tdp']['posts'] = tdp_posts[:20]
-                    result['tdp']['totalEngagement'] = sum(
-                        p['reactions'] + p['comments'] + p['shares'] for p in tdp_posts[:20]
-                    )
-                    result['isLive'] = True
-                    print(f"[Facebook] TDP: {len(tdp_posts)} posts, engagement: {result['tdp']['totalEngagement']}")
-
-            # Combine and sort by engagement
-            all_posts = result['ysrcp']['posts'] + result['tdp']['posts']
-            all_posts.sort(key=lambda x: x['reactions'] + x['comments'] + x['shares'], reverse=True)
-            result['combined'] = all_posts[:40]
+            # Fetch posts from both official pages concurrently
+            parties = [p for p in ['ysrcp', 'tdp'] if party in ['all', p]]
+            with ThreadPoolExecutor(max_workers=max(1, len(parties))) as pool:
+                fetched = list(pool.map(lambda p: self.get_page_posts(FACEBOOK_PAGE_URLS[p], p), parties))
+
+            top_posts = []
+            for party_key, posts in zip(parties, fetched):
+                if not posts:
+                    continue
+
+                # Rank by engagement and take top 20 (the cached posts are left untouched)
+                ranked = rank(posts, 20)
+                top_posts.extend(ranked)
+                result[party_key]['posts'] = [self._serialize_post(p) for p in ranked]
+                result[party_key]['totalEngagement'] = sum(p.engagement for p in ranked)
+                result['isLive'] = True
+                print(f"[Facebook] {party_key.upper()}: {len(posts)} posts, engagement: {result[party_key]['totalEngagement']}")
+
+            # Combine and rank by engagement
+            result['combined'] = [self._serialize_post(p) for p in rank(top_posts, 40)]
 
         except Exception as e:
             print(f"Error fetching Facebook trending posts: {e}")
@@ -383,9 +467,8 @@ class FacebookService:
 
 
     def clear_cache(self):
-        """Clear all cached data for fresh fetch"""
+        """Clear all cached data for fresh fetch (the page resolution table is kept)"""
         self.cache = {}
-        self.page_id_cache = {}
 
 
 # Singleton instance
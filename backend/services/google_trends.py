@@ -1,31 +1,152 @@
 """
 Google Trends Service using pytrends
 Fetches search interest data for YSRCP vs TDP
+
+Requests are planned per payload: one explore token for (keywords, timeframe, geo) returns the
+widgets for interest over time, interest by region and related queries of every keyword, so each
+payload is built once and serves all the reports planned for it. Payloads are fetched concurrently,
+each on a session checked out of the pytrends session pool; a payload's reports run one after
+another on its session, since a pytrends client is not thread-safe. Raw results are cached per
+payload, and only requests for the same payload wait for each other.
 """
 
-from pytrends.request import TrendReq
 from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set, Tuple
+import threading
 import time
+from services.trends_sessions import TrendsSession, trends_sessions
 
 # Cache for trends data (1 hour TTL)
 trends_cache = TTLCache(maxsize=100, ttl=3600)
+# Raw pytrends results per payload (1 hour TTL), as {report: result}
+payload_cache = TTLCache(maxsize=100, ttl=3600)
+
+KEYWORDS = ('YSRCP', 'TDP')
+GEO = 'IN-AP'  # Andhra Pradesh
+
+# Reports fetched together whenever any of them is needed, per timeframe
+# (the dashboard reads all three, so one cold dashboard build costs 2 token requests instead of 4)
+TRENDS_PLAN = {
+    'today 1-m': ('interest_over_time', 'related_queries'),
+    'today 3-m': ('interest_by_region',)
+}
+
+PayloadKey = Tuple[Tuple[str, ...], str, str]  # (keywords, timeframe, geo)
+
+REPORTS = {
+    'interest_over_time': lambda client: client.interest_over_time(),
+    'interest_by_region': lambda client: client.interest_by_region(resolution='REGION'),
+    'related_queries': lambda client: client.related_queries()
+}
+
 
 class GoogleTrendsService:
     def __init__(self):
-        self.pytrends = TrendReq(hl='en-IN', tz=330)  # India timezone
+        # One lock per payload, held while it is fetched
+        self._fetch_locks: Dict[PayloadKey, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _fetch_lock(self, key: PayloadKey) -> threading.Lock:
+        with self._locks_lock:
+            return self._fetch_locks.setdefault(key, threading.Lock())
 
-    def _get_with_retry(self, func, *args, max_retries=3, **kwargs):
-        """Retry wrapper for pytrends requests"""
+    def _get_with_retry(self, session: TrendsSession, func, *args, max_retries=3, **kwargs):
+        """Retry wrapper for pytrends requests, backing off the session after each failure"""
         for attempt in range(max_retries):
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
+                session.record_success()
+                return result
             except Exception as e:
+                session.record_failure()
                 if attempt == max_retries - 1:
                     raise e
-                time.sleep(2 ** attempt)  # Exponential backoff
+                session.wait_backoff()  # Exponential backoff
+
+    def _report(self, report: str, timeframe: str, keywords: Tuple[str, ...] = KEYWORDS, geo: str = GEO):
+        """
+        Raw pytrends result of one report for a payload
+        On a cache miss, every planned report not yet cached is fetched along with it, except for
+        payloads another request is already fetching
+        """
+        key = (keywords, timeframe, geo)
+        cached = payload_cache.get(key, {})
+        if report in cached:
+            return cached[report]
+
+        with self._fetch_lock(key):
+            # Another request may have fetched it while we waited
+            cached = payload_cache.get(key, {})
+            if report in cached:
+                return cached[report]
+
+            plan: Dict[PayloadKey, Set[str]] = {key: {report}}
+            held = []
+            try:
+                if keywords == KEYWORDS and geo == GEO:
+                    for planned_timeframe, reports in TRENDS_PLAN.items():
+                        planned_key = (keywords, planned_timeframe, geo)
+                        if planned_key != key:
+                            # Never wait for another payload's lock, so two requests can't deadlock
+                            lock = self._fetch_lock(planned_key)
+                            if not lock.acquire(blocking=False):
+                                continue
+                            held.append(lock)
+                        missing = set(reports) - set(payload_cache.get(planned_key, {}))
+                        if missing:
+                            plan.setdefault(planned_key, set()).update(missing)
+
+                errors = self._fetch_plan(plan)
+            finally:
+                for lock in held:
+                    lock.release()
+
+        cached = payload_cache.get(key, {})
+        if report in cached:
+            return cached[report]
+        raise errors[(key, report)]
+
+    def _fetch_payload(self, key: PayloadKey, reports: Set[str]) -> Dict[str, Any]:
+        """
+        Build one payload on a pooled session and run its reports on it one at a time
+        Returns {report: result or exception}
+        """
+        keywords, timeframe, geo = key
+        with trends_sessions.checkout() as session:
+            try:
+                self._get_with_retry(session, session.client.build_payload,
+                                     kw_list=list(keywords), cat=0, timeframe=timeframe, geo=geo, gprop='')
+            except Exception as e:
+                return {report: e for report in reports}
+
+            # The client's HTTP session and the session's backoff state are not thread-safe
+            results = {}
+            for report in reports:
+                try:
+                    results[report] = self._get_with_retry(session, REPORTS[report], session.client)
+                except Exception as e:
+                    results[report] = e
+            return results
+
+    def _fetch_plan(self, plan: Dict[PayloadKey, Set[str]]) -> Dict[Tuple[PayloadKey, str], Exception]:
+        """
+        Fetch every payload of the plan concurrently (up to the session pool's concurrency limit)
+        Results are added to payload_cache; returns the errors of the reports that failed
+        """
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(plan)) as pool:
+            fetches = {key: pool.submit(self._fetch_payload, key, reports) for key, reports in plan.items()}
+        for key, fetch in fetches.items():
+            for report, result in fetch.result().items():
+                if isinstance(result, Exception):
+                    errors[(key, report)] = result
+                else:
+                    payload_cache[key] = {**payload_cache.get(key, {}), report: result}
+        return errors
 
     def get_interest_over_time(self, timeframe: str = 'today 1-m') -> Dict[str, Any]:
         """
@@ -37,59 +158,13 @@ class GoogleTrendsService:
             return trends_cache[cache_key]
 
         try:
-            # Build payload for comparison
-            self.pytrends.build_payload(
-                kw_list=['YSRCP', 'TDP'],
-                cat=0,
-                timeframe=timeframe,
-                geo='IN-AP',  # Andhra Pradesh
-                gprop=''
-            )
-
-            # Get interest over time
-            df = self._get_with_retry(self.pytrends.interest_over_time)
+            # Get interest over time (fetched together with the other reports planned for this timeframe)
+            df = self._report('interest_over_time', timeframe)
 
             if df.empty:
                 return self._get_fallback_data()
 
-            # Process data
-            timeline_data = []
-            for index, row in df.iterrows():
-                timeline_data.append({
-                    "date": index.strftime("%b %d"),
-                    "ysrcp": int(row.get('YSRCP', 0)),
-                    "tdp": int(row.get('TDP', 0))
-                })
-
-            # Calculate averages
-            ysrcp_avg = df['YSRCP'].mean() if 'YSRCP' in df.columns else 50
-            tdp_avg = df['TDP'].mean() if 'TDP' in df.columns else 50
-
-            # Get latest values
-            ysrcp_current = int(df['YSRCP'].iloc[-1]) if 'YSRCP' in df.columns else 50
-            tdp_current = int(df['TDP'].iloc[-1]) if 'TDP' in df.columns else 50
-
-            # Calculate trend (compare last week avg to previous week)
-            if len(df) >= 14:
-                recent_avg = df['YSRCP'].tail(7).mean()
-                previous_avg = df['YSRCP'].iloc[-14:-7].mean()
-                trend_pct = ((recent_avg - previous_avg) / previous_avg * 100) if previous_avg > 0 else 0
-            else:
-                trend_pct = 0
-
-            result = {
-                "searchInterest": {
-                    "ysrcp": ysrcp_current,
-                    "tdp": tdp_current,
-                    "trend": f"+{trend_pct:.1f}%" if trend_pct >= 0 else f"{trend_pct:.1f}%"
-                },
-                "searchTimeline": timeline_data[-30:],  # Last 30 data points
-                "averages": {
-                    "ysrcp": round(ysrcp_avg, 1),
-                    "tdp": round(tdp_avg, 1)
-                }
-            }
-
+            result = self._timeline_from_frame(df)
             trends_cache[cache_key] = result
             return result
 
@@ -104,49 +179,75 @@ class GoogleTrendsService:
             return trends_cache[cache_key]
 
         try:
-            self.pytrends.build_payload(
-                kw_list=['YSRCP', 'TDP'],
-                cat=0,
-                timeframe='today 3-m',
-                geo='IN-AP',
-                gprop=''
-            )
-
-            df = self._get_with_retry(self.pytrends.interest_by_region, resolution='REGION')
+            df = self._report('interest_by_region', 'today 3-m')
 
             if df.empty:
                 return self._get_fallback_regional()
 
-            regional_data = []
-            for region, row in df.iterrows():
-                ysrcp_val = int(row.get('YSRCP', 0))
-                tdp_val = int(row.get('TDP', 0))
-
-                # Normalize to 100
-                total = ysrcp_val + tdp_val
-                if total > 0:
-                    ysrcp_norm = int((ysrcp_val / total) * 100)
-                    tdp_norm = 100 - ysrcp_norm
-                else:
-                    ysrcp_norm = 50
-                    tdp_norm = 50
-
-                regional_data.append({
-                    "district": region,
-                    "ysrcp": ysrcp_norm,
-                    "tdp": tdp_norm
-                })
-
-            # Sort by YSRCP interest
-            regional_data.sort(key=lambda x: x['ysrcp'], reverse=True)
+            regional_data = self._regional_from_frame(df)
 
-            trends_cache[cache_key] = regional_data[:15]  # Top 15 regions
-            return regional_data[:15]
+            trends_cache[cache_key] = regional_data
+            return regional_data
 
         except Exception as e:
             print(f"Error fetching regional interest: {e}")
             return self._get_fallback_regional()
 
+    @staticmethod
+    def _timeline_from_frame(df: pd.DataFrame) -> Dict[str, Any]:
+        """Interest-over-time payload from a pytrends frame, computed column-wise"""
+        ysrcp = df['YSRCP'].to_numpy() if 'YSRCP' in df.columns else None
+        tdp = df['TDP'].to_numpy() if 'TDP' in df.columns else None
+
+        # Only the last 30 data points are returned, so only they are formatted
+        recent = df.tail(30)
+        timeline_data = pd.DataFrame({
+            "date": recent.index.strftime("%b %d"),
+            "ysrcp": recent['YSRCP'].astype(int) if ysrcp is not None else 0,
+            "tdp": recent['TDP'].astype(int) if tdp is not None else 0
+        }).to_dict('records')
+
+        # Calculate trend (compare last week avg to previous week)
+        if len(df) >= 14:
+            recent_avg = ysrcp[-7:].mean()
+            previous_avg = ysrcp[-14:-7].mean()
+            trend_pct = ((recent_avg - previous_avg) / previous_avg * 100) if previous_avg > 0 else 0
+        else:
+            trend_pct = 0
+
+        return {
+            "searchInterest": {
+                "ysrcp": int(ysrcp[-1]) if ysrcp is not None else 50,
+                "tdp": int(tdp[-1]) if tdp is not None else 50,
+                "trend": f"+{trend_pct:.1f}%" if trend_pct >= 0 else f"{trend_pct:.1f}%"
+            },
+            "searchTimeline": timeline_data,
+            "averages": {
+                "ysrcp": round(df['YSRCP'].mean(), 1) if ysrcp is not None else 50,
+                "tdp": round(df['TDP'].mean(), 1) if tdp is not None else 50
+            }
+        }
+
+    @staticmethod
+    def _regional_from_frame(df: pd.DataFrame, limit: int = 15) -> List[Dict[str, Any]]:
+        """Top regions by YSRCP share of the two parties' interest, computed column-wise"""
+        ysrcp = df['YSRCP'].to_numpy().astype(int) if 'YSRCP' in df.columns else np.zeros(len(df), dtype=int)
+        tdp = df['TDP'].to_numpy().astype(int) if 'TDP' in df.columns else np.zeros(len(df), dtype=int)
+
+        # Normalize to 100 (an even split where neither party has interest)
+        total = ysrcp + tdp
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ysrcp_norm = np.where(total > 0, (ysrcp / total * 100).astype(int), 50)
+        tdp_norm = np.where(total > 0, 100 - ysrcp_norm, 50)
+
+        # Sort by YSRCP interest, keeping the frame's order between equal shares
+        order = np.argsort(-ysrcp_norm, kind='stable')[:limit]
+        return pd.DataFrame({
+            "district": df.index[order],
+            "ysrcp": ysrcp_norm[order],
+            "tdp": tdp_norm[order]
+        }).to_dict('records')
+
     def get_related_queries(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get related search queries for both parties"""
         cache_key = "related_queries"
@@ -155,18 +256,15 @@ class GoogleTrendsService:
 
         result = {"ysrcp": [], "tdp": []}
 
+        # One payload carries the related queries of both keywords
+        try:
+            related = self._report('related_queries', 'today 1-m')
+        except Exception as e:
+            print(f"Error fetching related queries: {e}")
+            related = {}
+
         for party, keyword in [("ysrcp", "YSRCP"), ("tdp", "TDP")]:
             try:
-                self.pytrends.build_payload(
-                    kw_list=[keyword],
-                    cat=0,
-                    timeframe='today 1-m',
-                    geo='IN-AP',
-                    gprop=''
-                )
-
-                related = self._get_with_retry(self.pytrends.related_queries)
-
                 if keyword in related and related[keyword]['rising'] is not None:
                     rising_df = related[keyword]['rising']
                     for _, row in rising_df.head(6).iterrows():
@@ -0,0 +1,180 @@
+"""
+HTML to Text
+Visible text of short HTML snippets (RSS summaries), the same as
+BeautifulSoup(html, 'html.parser').get_text()[:limit] without building a tree
+- Streams html.parser events and stops once `limit` characters of text are collected
+- Markup whose text BeautifulSoup treats specially (script/style/template/pre, CDATA,
+  unusual character references) is handed to BeautifulSoup itself
+
+Benchmark with: python -m services.html_text
+"""
+
+from html.entities import name2codepoint
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+# Characters BeautifulSoup treats as whitespace when collapsing whitespace-only strings
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+_ALL_SPACES = str.maketrans('', '', ASCII_SPACES)
+
+# Tags whose text BeautifulSoup keeps verbatim, drops from get_text(), or stores as ruby annotations
+SPECIAL_TAGS = frozenset(['script', 'style', 'template', 'pre', 'textarea', 'rt', 'rp'])
+# Tags BeautifulSoup closes immediately, so their end tags are ignored
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+                       'meta', 'param', 'source', 'spacer', 'track', 'wbr', 'basefont', 'bgsound', 'command',
+                       'frame', 'image', 'isindex', 'nextid'])
+
+
+class _Done(Exception):
+    """Enough text has been collected"""
+
+
+class _Unsupported(Exception):
+    """The snippet needs BeautifulSoup"""
+
+
+class _TextCollector(HTMLParser):
+    """Collects text the way BeautifulSoup's html.parser tree builder splits it into strings"""
+
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=False)
+        self.limit = limit
+        self.strings = []
+        self.length = 0
+        self.pending = []
+
+    def _end_string(self):
+        """A tag or comment ends the current string; whitespace-only strings collapse to one character"""
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        if not text.translate(_ALL_SPACES):
+            text = '\n' if '\n' in text else ' '
+        self.strings.append(text)
+        self.length += len(text)
+        if self.length >= self.limit:
+            raise _Done()
+
+    def handle_data(self, data: str):
+        self.pending.append(data)
+        # A string with visible characters keeps its length, so stop as soon as it reaches the limit
+        if self.length + sum(map(len, self.pending)) >= self.limit and "".join(self.pending).translate(_ALL_SPACES):
+            self._end_string()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SPECIAL_TAGS:
+            raise _Unsupported()
+        self._end_string()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            raise _Unsupported()
+        self._end_string()
+
+    def handle_charref(self, name):
+        try:
+            codepoint = int(name[1:], 16) if name[:1] in ('x', 'X') else int(name)
+        except ValueError:
+            raise _Unsupported()
+        # Control characters, C1 (windows-1252) and out-of-range references are decoded differently per version
+        if not (32 <= codepoint < 127 or 160 <= codepoint < 0xD800 or 0xE000 <= codepoint <= 0x10FFFF):
+            raise _Unsupported()
+        self.handle_data(chr(codepoint))
+
+    def handle_entityref(self, name):
+        codepoint = name2codepoint.get(name)
+        if codepoint is None:
+            raise _Unsupported()
+        self.handle_data(chr(codepoint))
+
+    def handle_comment(self, data):
+        self._end_string()
+
+    def handle_decl(self, decl):
+        self._end_string()
+
+    def handle_pi(self, data):
+        self._end_string()
+
+    def unknown_decl(self, data):
+        raise _Unsupported()
+
+    def text(self) -> str:
+        return "".join(self.strings)[:self.limit]
+
+
+def html_to_text(html_text: str, limit: int = 200) -> str:
+    """First `limit` characters of the snippet's visible text"""
+    if not html_text:
+        return ""
+    if '<' not in html_text and '&' not in html_text:
+        # Plain text is a single string
+        if not html_text.translate(_ALL_SPACES):
+            return '\n' if '\n' in html_text else ' '
+        return html_text[:limit]
+    collector = _TextCollector(limit)
+    try:
+        collector.feed(html_text)
+        collector.close()
+        collector._end_string()
+    except _Done:
+        pass
+    except Exception:
+        return BeautifulSoup(html_text, 'html.parser').get_text()[:limit]
+    return collector.text()
+
+
+def _fixtures():
+    """Google News style summaries plus markup edge cases"""
+    import random
+
+    fixtures = [
+        '<a href="https://news.google.com/rss/articles/CBMi?oc=5" target="_blank">YS Jagan slams TDP govt &amp; '
+        'Naidu over welfare delays</a>&nbsp;&nbsp;<font color="#6f6f6f">The Hindu</font>',
+        '<ol><li><a href="x">Naidu&#39;s Amaravati plan</a>&nbsp;&nbsp;<font>NDTV</font></li>'
+        '<li><a href="y">YSRCP protest</a></li></ol>',
+        'plain text summary with no markup at all &mdash; just entities &hellip;',
+        'a<br>  </br>  b', '<p>  </p><p>\n  </p>x', '&nbsp;x&nbsp', '&amp &foo; &#65;&#x42;&#150;&#0;',
+        '<pre>  </pre>', '<script>s</script>t', '<![CDATA[x]]>y', '<!DOCTYPE html>z', '<?pi?>w', 'a<!--c-->b',
+        '<p>unclosed <b>bold <i>both</p> after', 'x < y and y > z', '<a href="&amp;">link</a>', '</p>stray end',
+        'text <b', '&#x1F600; &#128512; &#xD800;', '<img src=x/>after<br/>line', '<div>\t\r\n</div><div> \x0c</div>',
+        '&lt;b&gt;escaped&lt;/b&gt; &apos;&quot;'
+    ]
+    pieces = ['Jagan', ' ', '  ', '\n', '&nbsp;', '&amp;', '&#8217;', '<b>', '</b>', '<br>', '<p>', '</p>',
+              '<a href="u">', '</a>', '<!-- c -->', 'é', 'జగన్', '&lt;', '<', '>', '&', 'x' * 60]
+    rng = random.Random(43)
+    fixtures += ["".join(rng.choice(pieces) for _ in range(rng.randint(1, 40))) for _ in range(5000)]
+    return fixtures
+
+
+def _benchmark():
+    import time
+
+    fixtures = _fixtures()
+    for html_text in fixtures:
+        expected = BeautifulSoup(html_text, 'html.parser').get_text()[:200]
+        assert html_to_text(html_text) == expected, html_text
+
+    summaries = fixtures[:3] * 2000
+    start = time.perf_counter()
+    for html_text in summaries:
+        BeautifulSoup(html_text, 'html.parser').get_text()[:200]
+    soup_rate = len(summaries) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for html_text in summaries:
+        html_to_text(html_text)
+    fast_rate = len(summaries) / (time.perf_counter() - start)
+
+    print(f"identical to BeautifulSoup on {len(fixtures):,} fixtures")
+    print(f"BeautifulSoup: {soup_rate:>9,.0f} summaries/s")
+    print(f"html_to_text:  {fast_rate:>9,.0f} summaries/s ({fast_rate / soup_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    _benchmark()
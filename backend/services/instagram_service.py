@@ -7,8 +7,11 @@ import os
 import urllib.request
 import urllib.parse
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+from models.post_record import PostRecord, freeze, thaw, rank
+from services.post_store import post_store
 
 # RapidAPI Configuration
 RAPIDAPI_KEY = os.getenv('RAPIDAPI_KEY', '922556e08bmsh465b2b5025c11a5p176967jsn3ca78cdb094c')
@@ -26,6 +29,11 @@ INSTAGRAM_HANDLES = {
     }
 }
 
+# Pagination limits for streaming a user's timeline
+ENGAGEMENT_WINDOW = timedelta(days=7)  # How far back party engagement is summed
+MAX_POSTS_PER_STREAM = 120             # Post budget for a single timeline walk
+MAX_PAGES_PER_STREAM = 10              # Hard stop to protect API quota
+
 
 class InstagramService:
     def __init__(self):
@@ -87,8 +95,8 @@ class InstagramService:
         self.cache[cache_key] = (profile, datetime.now())
         return profile
 
-    def _parse_post(self, post_data: Dict, party: str = 'unknown') -> Optional[Dict]:
-        """Parse a post from the API response"""
+    def _parse_post(self, post_data: Dict, party: str = 'unknown') -> Optional[PostRecord]:
+        """Parse a post from the API response into an immutable record"""
         try:
             node = post_data.get('node', {})
 
@@ -135,28 +143,54 @@ class InstagramService:
             taken_at = node.get('taken_at', 0)
             timestamp = datetime.fromtimestamp(taken_at) if taken_at else datetime.now()
 
-            return {
-                'id': post_id,
-                'code': code,
-                'caption': caption[:200] + '...' if len(caption) > 200 else caption,
-                'fullCaption': caption,
-                'likes': likes,
-                'likesFormatted': self._format_count(likes),
-                'comments': comments,
-                'commentsFormatted': self._format_count(comments),
-                'mediaType': media_type,
-                'thumbnail': thumbnail,
-                'videoUrl': video_url,
-                'owner': owner,
-                'timestamp': timestamp.isoformat(),
-                'timeAgo': self._get_time_ago(timestamp),
-                'url': f"https://www.instagram.com/p/{code}/",
-                'party': party
-            }
+            return PostRecord(
+                id=post_id,
+                platform='instagram',
+                party=party,
+                text=caption,
+                author=owner['username'],
+                timestamp=timestamp,
+                likes=likes,
+                comments=comments,
+                engagement=likes + comments,
+                url=f"https://www.instagram.com/p/{code}/",
+                thumbnail=thumbnail,
+                media_type=media_type,
+                extra=freeze({'code': code, 'videoUrl': video_url, 'owner': owner})
+            )
         except Exception as e:
             print(f"Error parsing Instagram post: {e}")
             return None
 
+    def _serialize_post(self, post: PostRecord) -> Dict:
+        """Build the API/display representation of a post record"""
+        caption = post.text
+        return {
+            'id': post.id,
+            'code': post.extra['code'],
+            'caption': caption[:200] + '...' if len(caption) > 200 else caption,
+            'fullCaption': caption,
+            'likes': post.likes,
+            'likesFormatted': self._format_count(post.likes),
+            'comments': post.comments,
+            'commentsFormatted': self._format_count(post.comments),
+            'mediaType': post.media_type,
+            'thumbnail': post.thumbnail,
+            'videoUrl': post.extra['videoUrl'],
+            'owner': thaw(post.extra['owner']),
+            'timestamp': post.timestamp.isoformat(),
+            'timeAgo': self._get_time_ago(post.timestamp),
+            'url': post.url,
+            'party': post.party
+        }
+
+    def _party_for_handle(self, username: str) -> str:
+        """Party that owns an Instagram handle, 'unknown' for other accounts"""
+        for party, handles in INSTAGRAM_HANDLES.items():
+            if handles['party'] == username:
+                return party
+        return 'unknown'
+
     def _format_count(self, count: int) -> str:
         """Format large numbers"""
         if count >= 10000000:
@@ -182,9 +216,9 @@ class InstagramService:
             return f"{minutes}m ago"
         return "Just now"
 
-    def get_user_posts(self, username: str, max_id: str = "") -> List[Dict]:
-        """Get posts from a user"""
-        cache_key = f"posts_{username}"
+    def _fetch_posts_page(self, username: str, max_id: str = "") -> Tuple[Tuple[PostRecord, ...], str]:
+        """Fetch one page of a user's posts, returning the posts and the next max_id cursor"""
+        cache_key = f"posts_{username}_{max_id}"
 
         # Check cache
         if cache_key in self.cache:
@@ -198,21 +232,55 @@ class InstagramService:
         })
 
         if not response or not response.get('success', True) == True:
-            if response and response.get('response_type') == 'private page':
-                return []
-            return []
+            return (), ''
+
+        party = self._party_for_handle(username)
+        result = response.get('result', {})
+        edges = result.get('edges', [])
+        posts = tuple(post for post in (self._parse_post(edge, party) for edge in edges) if post)
+        post_store.add_many(posts)
 
-        posts = []
-        edges = response.get('result', {}).get('edges', [])
+        # Cursor for the next (older) page, empty when the timeline is exhausted
+        page_info = result.get('page_info', {}) or {}
+        next_max_id = (page_info.get('end_cursor') or '') if page_info.get('has_next_page') else ''
 
-        for edge in edges:
-            post = self._parse_post(edge, 'unknown')
-            if post:
-                posts.append(post)
+        # Cache each page under its own cursor
+        self.cache[cache_key] = ((posts, next_max_id), datetime.now())
+        return posts, next_max_id
 
-        # Cache results
-        self.cache[cache_key] = (posts, datetime.now())
-        return posts
+    def get_user_posts(self, username: str, max_id: str = "") -> List[Dict]:
+        """Get a single page of posts from a user, starting at the max_id cursor"""
+        posts, _ = self._fetch_posts_page(username, max_id)
+        return [self._serialize_post(p) for p in posts]
+
+    def iter_user_posts(self, username: str, since: Optional[datetime] = None,
+                        max_posts: int = MAX_POSTS_PER_STREAM) -> Iterator[Tuple[PostRecord, ...]]:
+        """
+        Stream a user's posts page by page, following max_id cursors
+        Stops once posts are older than `since`, the post budget is spent or the timeline ends
+        """
+        max_id = ''
+        remaining = max_posts
+
+        for _ in range(MAX_PAGES_PER_STREAM):
+            posts, next_max_id = self._fetch_posts_page(username, max_id)
+            if not posts:
+                return
+
+            # Posts are newest first (pinned posts aside), so drop anything outside the window
+            in_window = posts
+            if since:
+                in_window = tuple(p for p in posts if p.timestamp >= since)
+
+            page = in_window[:remaining]
+            if page:
+                yield page
+            remaining -= len(page)
+
+            reached_window_end = since is not None and posts[-1].timestamp < since
+            if remaining <= 0 or reached_window_end or not next_max_id:
+                return
+            max_id = next_max_id
 
     def get_trending_posts(self, party: str = 'all') -> Dict[str, Any]:
         """Get trending posts for YSRCP, TDP, or both"""
@@ -225,34 +293,21 @@ class InstagramService:
         }
 
         try:
-            # Fetch YSRCP posts
-            if party in ['all', 'ysrcp']:
-                ysrcp_handle = INSTAGRAM_HANDLES['ysrcp']['party']
-                if ysrcp_handle:
-                    ysrcp_posts = self.get_user_posts(ysrcp_handle)
-                    for post in ysrcp_posts:
-                        post['party'] = 'ysrcp'
-                    result['ysrcp']['posts'] = ysrcp_posts
-                    result['ysrcp']['totalEngagement'] = sum(
-                        p['likes'] + p['comments'] for p in ysrcp_posts
-                    )
-
-            # Fetch TDP posts
-            if party in ['all', 'tdp']:
-                tdp_handle = INSTAGRAM_HANDLES['tdp']['party']
-                if tdp_handle:
-                    tdp_posts = self.get_user_posts(tdp_handle)
-                    for post in tdp_posts:
-                        post['party'] = 'tdp'
-                    result['tdp']['posts'] = tdp_posts
-                    result['tdp']['totalEngagement'] = sum(
-                        p['likes'] + p['comments'] for p in tdp_posts
-                    )
-
-            # Combine and sort by engagement
-            all_posts = result['ysrcp']['posts'] + result['tdp']['posts']
-            all_posts.sort(key=lambda x: x['likes'] + x['comments'], reverse=True)
-            result['combined'] = all_posts[:40]
+            # Fetch the party accounts concurrently
+            parties = [p for p in ['ysrcp', 'tdp']
+                       if party in ['all', p] and INSTAGRAM_HANDLES[p]['party']]
+            with ThreadPoolExecutor(max_workers=max(1, len(parties))) as pool:
+                fetched = list(pool.map(
+                    lambda p: self._fetch_posts_page(INSTAGRAM_HANDLES[p]['party'])[0], parties
+                ))
+
+            for party_key, posts in zip(parties, fetched):
+                result[party_key]['posts'] = [self._serialize_post(p) for p in posts]
+                result[party_key]['totalEngagement'] = sum(p.engagement for p in posts)
+
+            # Combine and rank by engagement
+            all_posts = [p for posts in fetched for p in posts]
+            result['combined'] = [self._serialize_post(p) for p in rank(all_posts, 40)]
 
         except Exception as e:
             print(f"Error fetching Instagram trending posts: {e}")
@@ -299,9 +354,8 @@ class InstagramService:
                         'type': 'party'
                     })
 
-                # Get engagement from posts
-                ysrcp_posts = self.get_user_posts(ysrcp_handle)
-                result['ysrcp']['engagement'] = sum(p['likes'] + p['comments'] for p in ysrcp_posts)
+                # Get engagement from the last week of posts
+                result['ysrcp']['engagement'] = self._get_window_engagement(ysrcp_handle)
 
             # TDP stats - get profile with follower count
             tdp_handle = INSTAGRAM_HANDLES['tdp']['party']
@@ -319,9 +373,8 @@ class InstagramService:
                         'type': 'party'
                     })
 
-                # Get engagement from posts
-                tdp_posts = self.get_user_posts(tdp_handle)
-                result['tdp']['engagement'] = sum(p['likes'] + p['comments'] for p in tdp_posts)
+                # Get engagement from the last week of posts
+                result['tdp']['engagement'] = self._get_window_engagement(tdp_handle)
 
         except Exception as e:
             print(f"Error fetching Instagram stats: {e}")
@@ -330,6 +383,14 @@ class InstagramService:
 
         return result
 
+    def _get_window_engagement(self, username: str) -> int:
+        """Sum likes and comments over the engagement window, one page at a time"""
+        since = datetime.now() - ENGAGEMENT_WINDOW
+        return sum(
+            p.engagement
+            for page in self.iter_user_posts(username, since=since)
+            for p in page
+        )
 
     def clear_cache(self):
         """Clear all cached data for fresh fetch"""
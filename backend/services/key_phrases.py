@@ -0,0 +1,168 @@
+"""
+Key Phrase Extraction
+Counts 2-3 word phrases (runs of non-stopword tokens) across texts, replacing per-text TextBlob parsing
+- Each text is tokenized with one regex pass; its phrases are cached by content hash
+- Counts are updated incrementally as texts are added and aged out
+
+Benchmark with: python -m services.key_phrases
+"""
+
+import heapq
+import re
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from services.sentiment_engine import text_key
+
+PHRASE_CACHE_SIZE = 50000   # Texts whose extracted phrases are remembered
+MAX_TRACKED_TEXTS = 20000   # Texts counted by a running counter before the oldest age out
+MIN_PHRASE_LENGTH = 4       # Shorter phrases are dropped
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself yourselves
+says said say new news today live watch video via amp rt get got one two like us may much many
+""".split())
+
+# URLs, mentions and HTML entities are removed; hashtags keep their word
+_NOISE = re.compile(r"https?://\S+|www\.\S+|@\w+|&\w+;")
+# Words (including Telugu script), or any punctuation that ends a phrase
+_TOKENS = re.compile(r"[\w\u0C00-\u0C7F]+(?:['\-][\w\u0C00-\u0C7F]+)*|[^\s\w#'\-\u0C00-\u0C7F]+")
+
+
+def extract_phrases(text: str, ngrams: Tuple[int, ...] = (2, 3)) -> Tuple[str, ...]:
+    """All candidate phrases in one text, in order, with repeats"""
+    phrases = []
+    run: List[str] = []
+
+    def flush():
+        for n in ngrams:
+            for i in range(len(run) - n + 1):
+                phrase = " ".join(run[i:i + n])
+                if len(phrase) >= MIN_PHRASE_LENGTH:
+                    phrases.append(phrase)
+        run.clear()
+
+    for token in _TOKENS.findall(_NOISE.sub(" ", text.lower())):
+        if not token[0].isalnum() or token in STOPWORDS or token.isdigit():
+            flush()
+        else:
+            run.append(token)
+    flush()
+    return tuple(phrases)
+
+
+class KeyPhraseCounter:
+    """
+    Running phrase counts over a stream of texts
+    Texts are counted once by content; past max_texts, the least recently added texts age out
+    """
+
+    def __init__(self, max_texts: int = MAX_TRACKED_TEXTS):
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._texts = _CountedTexts(max_texts, self.counts)
+
+    def add(self, texts: Iterable[str]):
+        """Count the phrases of texts not already counted"""
+        with self._lock:
+            for text in texts:
+                if not text:
+                    continue
+                key = text_key(text)
+                if key in self._texts:
+                    self._texts[key]  # Refresh recency
+                    continue
+                phrases = phrase_cache.get(text, key)
+                self._texts[key] = phrases
+                self.counts.update(phrases)
+
+    def top(self, n: int = 15) -> List[Tuple[str, int]]:
+        """Most frequent phrases as (phrase, count), highest first"""
+        with self._lock:
+            return heapq.nlargest(n, ((p, c) for p, c in self.counts.items() if c > 0), key=lambda pc: pc[1])
+
+
+class _CountedTexts(LRUCache):
+    """LRU of counted texts that takes a text's phrases back out of the counts when it is evicted"""
+
+    def __init__(self, maxsize: int, counts: Counter):
+        super().__init__(maxsize=maxsize)
+        self.counts = counts
+
+    def popitem(self):
+        key, phrases = super().popitem()
+        self.counts.subtract(phrases)
+        for phrase in set(phrases):
+            if self.counts[phrase] <= 0:
+                del self.counts[phrase]
+        return key, phrases
+
+
+class PhraseCache:
+    """Per-text phrase memo keyed by content hash, shared by every counter"""
+
+    def __init__(self, maxsize: int = PHRASE_CACHE_SIZE):
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, text: str, key: Optional[bytes] = None) -> Tuple[str, ...]:
+        key = key or text_key(text)
+        with self._lock:
+            phrases = self._cache.get(key)
+        if phrases is None:
+            phrases = extract_phrases(text)
+            with self._lock:
+                self._cache[key] = phrases
+        return phrases
+
+
+# Singleton instances
+phrase_cache = PhraseCache()
+trending_phrases = KeyPhraseCounter()
+
+
+def _benchmark():
+    import random
+    import time
+
+    from textblob import TextBlob
+    from textblob.exceptions import MissingCorpusError
+
+    words = ("Jagan welfare scheme success for farmers", "Naidu slams corruption scandal in Amaravati",
+             "TDP rally in Vijayawada today", "YSRCP govt failure on roads, people protest",
+             "great victory for the people of Andhra", "opposition raises crisis over Polavaram project")
+    rng = random.Random(7)
+    texts = [f"{rng.choice(words)}. {rng.choice(words)} #{i % 500}" for i in range(20_000)]
+
+    try:
+        start = time.perf_counter()
+        for text in texts[:500]:
+            TextBlob(text).noun_phrases
+        blob_rate = f"{500 / (time.perf_counter() - start):>9,.0f} texts/s"
+    except MissingCorpusError:
+        blob_rate = "skipped (run python -m textblob.download_corpora)"
+
+    counter = KeyPhraseCounter()
+    start = time.perf_counter()
+    counter.add(texts)
+    cold_rate = len(texts) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    KeyPhraseCounter().add(texts)
+    warm_rate = len(texts) / (time.perf_counter() - start)
+
+    print(f"TextBlob noun phrases: {blob_rate}")
+    print(f"n-gram extractor:      {cold_rate:>9,.0f} texts/s (cold)   {warm_rate:>9,.0f} texts/s (cached)")
+    print("top phrases:", counter.top(5))
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,76 @@
+"""
+Keyword Matching
+Compiles every party keyword, hashtag term and topic term into one regex at import,
+so a text is scanned once for all of them instead of once per keyword list
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable
+
+from config import (
+    YSRCP_KEYWORDS, TDP_KEYWORDS,
+    YSRCP_TAG_TERMS, TDP_TAG_TERMS,
+    YSRCP_CONTEXT_TERMS, TDP_CONTEXT_TERMS,
+    NEGATIVE_TERMS
+)
+
+
+class KeywordMatches:
+    """All keyword hits in one text"""
+
+    def __init__(self, terms: Counter, term_groups: Dict[str, frozenset]):
+        self.terms = terms  # term -> number of occurrences
+        self.groups = Counter(group for term in terms for group in term_groups[term])
+
+    def count(self, group: str) -> int:
+        """Number of distinct terms from a group found in the text"""
+        return self.groups[group]
+
+    def has(self, group: str) -> bool:
+        """Whether any term from a group was found in the text"""
+        return self.groups[group] > 0
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matcher for named groups of terms
+    A term is found whenever `term.lower() in text.lower()` would be, overlapping matches included
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        term_groups: Dict[str, set] = {}
+        for group, terms in groups.items():
+            for term in terms:
+                term_groups.setdefault(term.lower(), set()).add(group)
+        self.term_groups = {term: frozenset(g) for term, g in term_groups.items()}
+
+        # Longest first, so at each position the regex picks the longest term;
+        # shorter terms starting at the same position are its prefixes
+        terms = sorted(self.term_groups, key=len, reverse=True)
+        self.prefixes = {term: [t for t in terms if t != term and term.startswith(t)] for term in terms}
+
+        # Zero-width lookahead so a match can start at every position, including inside another match
+        self.pattern = re.compile("(?=(" + "|".join(re.escape(t) for t in terms) + "))")
+
+    def match(self, text: str) -> KeywordMatches:
+        """Find every term in the text in a single pass"""
+        counts = Counter()
+        for m in self.pattern.finditer((text or "").lower()):
+            term = m.group(1)
+            counts[term] += 1
+            for prefix in self.prefixes[term]:
+                counts[prefix] += 1
+        return KeywordMatches(counts, self.term_groups)
+
+
+# Shared matcher for party keywords, hashtag terms and topic terms
+party_keywords = KeywordMatcher({
+    "ysrcp": YSRCP_KEYWORDS,
+    "tdp": TDP_KEYWORDS,
+    "ysrcp_tag": YSRCP_TAG_TERMS,
+    "tdp_tag": TDP_TAG_TERMS,
+    "ysrcp_context": YSRCP_CONTEXT_TERMS,
+    "tdp_context": TDP_CONTEXT_TERMS,
+    "negative": NEGATIVE_TERMS,
+})
@@ -0,0 +1,244 @@
+"""
+Near-Duplicate News Clustering
+Groups syndicated stories (the same report carried by several outlets with slightly different
+headlines) using MinHash signatures over word shingles and LSH banding
+- A new article is compared only with the articles sharing one of its LSH buckets,
+  not with the whole index; if it matches several clusters, they are merged
+- The index is rolling: past MAX_INDEXED_ARTICLES, the oldest articles age out
+- A cluster's size is the story's reach (how many distinct articles carried it)
+
+Benchmark with: python -m services.news_clusters
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+import numpy as np
+
+MAX_INDEXED_ARTICLES = 5000    # Articles kept in the rolling index
+BANDS = 20                     # LSH bands...
+ROWS = 3                       # ...of 3 MinHash values each: pairs at 0.5 Jaccard share a band 93% of the time
+NUM_PERMUTATIONS = BANDS * ROWS
+SIMILARITY_THRESHOLD = 0.5     # Shingle-set Jaccard similarity for two articles to be the same story
+
+_rng = np.random.default_rng(44)
+# Multiply-shift hash family: h(x) = ((a * x + b) mod 2^64) >> 32, with odd a
+_A = _rng.integers(1, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_PERMUTATIONS, dtype=np.uint64)
+
+_WORDS = re.compile(r"[\wఀ-౿]+")
+# Google News appends " - Outlet Name" to every headline
+_SOURCE_SUFFIX = re.compile(r"\s+-\s+[^-]+$")
+
+
+def shingles(text: str) -> FrozenSet[int]:
+    """
+    Hashed words and word bigrams of a text
+    Headlines are short, so words keep a one-word rewording from breaking most of the shingles
+    """
+    words = _WORDS.findall(text.lower())
+    grams = words + [f"{words[i]} {words[i + 1]}" for i in range(len(words) - 1)]
+    return frozenset(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+
+
+def story_text(article: Dict) -> str:
+    """
+    Headline (without the outlet suffix) and description of an article
+    Google News descriptions just repeat the headline and outlet, so those are left out
+    """
+    title = _SOURCE_SUFFIX.sub("", article.get('title', ''))
+    description = article.get('description', '')
+    if description.startswith(title):
+        return title
+    return f"{title} {description}"
+
+
+def minhash(shingle_set: FrozenSet[int]) -> np.ndarray:
+    """MinHash signature of a non-empty shingle set"""
+    values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+    with np.errstate(over='ignore'):
+        hashed = (values[:, None] * _A + _B) >> np.uint64(32)
+    return hashed.min(axis=0)
+
+
+class _Article:
+    __slots__ = ("shingles", "bands", "cluster")
+
+    def __init__(self, shingle_set: FrozenSet[int], bands: Tuple[bytes, ...], cluster: str):
+        self.shingles = shingle_set
+        self.bands = bands
+        self.cluster = cluster
+
+
+class StoryIndex:
+    """Rolling MinHash-LSH index assigning each article to a story cluster"""
+
+    def __init__(self, max_articles: int = MAX_INDEXED_ARTICLES, threshold: float = SIMILARITY_THRESHOLD):
+        self.max_articles = max_articles
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._articles: "OrderedDict[str, _Article]" = OrderedDict()
+        self._buckets = [dict() for _ in range(BANDS)]  # band -> band signature -> article keys
+        self._members: Dict[str, Set[str]] = {}         # cluster id -> article keys in the index
+
+    def add(self, key: str, text: str) -> str:
+        """
+        Index an article and return its story cluster id
+        Re-adding a key returns its current cluster
+        """
+        return self.index(key, text)[0]
+
+    def index(self, key: str, text: str) -> Tuple[str, List[str]]:
+        """
+        Index an article; returns its story cluster id and the keys of already indexed articles
+        that a merge moved into that cluster (their stored cluster ids are now stale)
+        """
+        with self._lock:
+            article = self._articles.get(key)
+            if article is not None:
+                return article.cluster, []
+
+            shingle_set = shingles(text)
+            bands: Tuple[bytes, ...] = ()
+            matches: Set[str] = set()
+            if shingle_set:
+                signature = minhash(shingle_set)
+                bands = tuple(signature[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS))
+                matches = self._matching_clusters(shingle_set, bands)
+
+            # Join the largest matching cluster, folding the others into it
+            cluster = max(matches, key=lambda c: len(self._members[c]), default=key)
+            moved = []
+            for other in matches - {cluster}:
+                moved += self._merge(other, cluster)
+
+            self._insert(key, _Article(shingle_set, bands, cluster))
+            return cluster, moved
+
+    def _matching_clusters(self, shingle_set: FrozenSet[int], bands: Tuple[bytes, ...]) -> Set[str]:
+        """Clusters with an article similar enough to be the same story"""
+        candidates: Set[str] = set()
+        for band, value in enumerate(bands):
+            candidates.update(self._buckets[band].get(value, ()))
+
+        matches = set()
+        for candidate in candidates:
+            other = self._articles[candidate]
+            if other.cluster in matches:
+                continue
+            if len(shingle_set & other.shingles) >= self.threshold * len(shingle_set | other.shingles):
+                matches.add(other.cluster)
+        return matches
+
+    def _merge(self, source: str, target: str) -> List[str]:
+        """Move a cluster's articles into another cluster; returns the moved keys"""
+        moved = list(self._members.pop(source))
+        for key in moved:
+            self._articles[key].cluster = target
+            self._members[target].add(key)
+        return moved
+
+    def _insert(self, key: str, article: _Article):
+        self._articles[key] = article
+        for band, value in enumerate(article.bands):
+            self._buckets[band].setdefault(value, set()).add(key)
+        self._members.setdefault(article.cluster, set()).add(key)
+
+        while len(self._articles) > self.max_articles:
+            self._evict()
+
+    def _evict(self):
+        key, article = self._articles.popitem(last=False)
+        for band, value in enumerate(article.bands):
+            bucket = self._buckets[band][value]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band][value]
+        members = self._members[article.cluster]
+        members.discard(key)
+        if not members:
+            del self._members[article.cluster]
+
+    def cluster(self, key: str) -> Optional[str]:
+        """Current story cluster of an indexed article (clusters can merge as articles arrive)"""
+        with self._lock:
+            article = self._articles.get(key)
+            return article.cluster if article else None
+
+    def reach(self, cluster: str) -> int:
+        """Number of indexed articles in a story cluster"""
+        with self._lock:
+            return len(self._members.get(cluster, ()))
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._articles)
+
+
+# Singleton instance shared by all news feeds
+story_index = StoryIndex()
+
+
+def _synthetic_articles(count: int, stories: int, seed: int = 44) -> Tuple[list, list]:
+    """(key, story text) of syndicated copies of random stories, and the story each copies"""
+    import random
+
+    rng = random.Random(seed)
+    outlets = ["The Hindu", "Deccan Chronicle", "Times of India", "NDTV", "The New Indian Express", "Eenadu"]
+    subjects = ["YS Jagan", "Chandrababu Naidu", "Pawan Kalyan", "Nara Lokesh", "YSRCP", "TDP", "AP govt"]
+    actions = ["slams", "praises", "announces", "reviews", "launches", "questions", "defends"]
+    topics = ["welfare scheme", "Polavaram project", "Amaravati capital", "liquor policy", "farm loans",
+              "mega DSC", "sand policy", "pension hike", "Visakhapatnam steel plant", "volunteer system"]
+
+    vocabulary = [f"w{i}" for i in range(3000)]  # Story-specific words
+    headlines = [f"{rng.choice(subjects)} {rng.choice(actions)} {rng.choice(topics)} "
+                 f"{' '.join(rng.sample(vocabulary, 5))}" for _ in range(stories)]
+
+    articles, truth = [], []
+    for i in range(count):
+        story = rng.randrange(len(headlines))
+        words = headlines[story].split()
+        if rng.random() < 0.5:  # Outlets rephrase: drop or add a word
+            words.pop(rng.randrange(len(words)))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(["amid", "row", "today", "again"]))
+        title = " ".join(words) + f" - {rng.choice(outlets)}"
+        articles.append((f"link{i}", story_text({'title': title, 'description': title})))
+        truth.append(story)
+    return articles, truth
+
+
+def _pair_agreement(clusters: list, truth: list) -> Tuple[float, float]:
+    """Pairwise precision and recall of clusters against the generating stories"""
+    def pairs(labels) -> int:
+        counts: Dict = {}
+        for label in labels:
+            counts[label] = counts.get(label, 0) + 1
+        return sum(c * (c - 1) // 2 for c in counts.values())
+
+    same_pred, same_true, both = pairs(clusters), pairs(truth), pairs(zip(clusters, truth))
+    return both / max(same_pred, 1), both / max(same_true, 1)
+
+
+def _benchmark():
+    import time
+
+    articles, truth = _synthetic_articles(6000, 2000)
+    index = StoryIndex(max_articles=len(articles))
+    start = time.perf_counter()
+    for key, text in articles:
+        index.add(key, text)
+    elapsed = time.perf_counter() - start
+    clusters = [index.cluster(key) for key, _ in articles]
+    precision, recall = _pair_agreement(clusters, truth)
+
+    print(f"{len(articles):,} articles in {elapsed * 1000:.0f} ms ({elapsed / len(articles) * 1e6:.0f} us/article), "
+          f"{len(set(clusters)):,} clusters for {len(set(truth)):,} stories")
+    print(f"pair precision {precision:.1%}   pair recall {recall:.1%}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -2,37 +2,105 @@
 News Service - Fetches news from multiple free sources
 - Google News RSS (FREE, unlimited)
 - NewsAPI.org (FREE tier: 100 requests/day)
+
+RSS feeds are fetched concurrently through one pooled HTTP client, with conditional
+requests (ETag / Last-Modified) so an unchanged feed is answered with a 304 and not re-parsed
+Fetched articles accumulate in the article store; mentions and sources are counted
+over a time window of stored articles, trending topics are the terms currently spiking
 """
 
 import feedparser
 import httpx
-from bs4 import BeautifulSoup
-from cachetools import TTLCache
+from cachetools import LRUCache, TTLCache
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 import asyncio
 import re
-from config import NEWS_API_KEY, GOOGLE_NEWS_RSS, YSRCP_KEYWORDS, TDP_KEYWORDS
+import threading
+from config import NEWS_API_KEY, GOOGLE_NEWS_RSS, YSRCP_KEYWORDS, TDP_KEYWORDS, NEWS_WINDOW_HOURS
+from services.article_store import article_store
+from services.feed_parser import parse_feed
+from services.html_text import html_to_text
+from services.keywords import party_keywords
+from services.news_clusters import story_index, story_text
+from services.sentiment_service import sentiment_service
+from services.topic_trends import topic_trends
 
 # Cache for news (30 minutes TTL)
 news_cache = TTLCache(maxsize=100, ttl=1800)
+# Cleaned summaries by entry GUID, as (summary html, text)
+summary_cache = LRUCache(maxsize=5000)
+
+RSS_ENTRY_LIMIT = 20  # Articles kept per feed
 
 
 class NewsService:
     def __init__(self):
         self.news_api_key = NEWS_API_KEY
         self.rss_feeds = GOOGLE_NEWS_RSS
+        # Per-feed validators and the articles parsed from the last full response
+        self._feed_state: Dict[str, Dict[str, Any]] = {}
+        # One keep-alive client per event loop: a client's connections belong to the loop that opened them
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._clients_lock = threading.Lock()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for the running event loop, created on first use in that loop"""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None:
+                # Clients of loops that have since closed can no longer be closed; drop them
+                for old_loop in [l for l in self._clients if l.is_closed()]:
+                    del self._clients[old_loop]
+                client = self._clients[loop] = httpx.AsyncClient(
+                    timeout=15,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                    headers={"User-Agent": feedparser.USER_AGENT}
+                )
+        return client
+
+    async def aclose(self):
+        """Close the pooled HTTP clients: this loop's directly, other running loops' on their own loop"""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            clients, self._clients = self._clients, {}
+        for client_loop, client in clients.items():
+            if client_loop is loop:
+                await client.aclose()
+            elif client_loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+
+    async def get_all_news(self, hours: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get combined news from all sources
+        Mentions and sources cover the last `hours` (NEWS_WINDOW_HOURS by default); the feeds are
+        fetched once per cache period whatever the window, and only the window counts are per request
+        """
+        feeds = news_cache.get("all_news")
+        if feeds is None:
+            feeds = await self._fetch_all_news()
+            news_cache["all_news"] = feeds
+
+        # Mentions and sources over the window of stored articles
+        since = datetime.now().timestamp() - (hours or NEWS_WINDOW_HOURS) * 3600
+        window = await asyncio.to_thread(self._window_counts, since)
+        return {
+            "ysrcp": {"articles": feeds["ysrcp"], **window["ysrcp"]},
+            "tdp": {"articles": feeds["tdp"], **window["tdp"]},
+            "trending": feeds["trending"],
+            "lastUpdated": feeds["lastUpdated"]
+        }
 
-    async def get_all_news(self) -> Dict[str, Any]:
-        """Get combined news from all sources"""
-        cache_key = "all_news"
-        if cache_key in news_cache:
-            return news_cache[cache_key]
-
-        # Fetch from Google News RSS (always free)
-        ysrcp_news = await self._fetch_rss_news('ysrcp')
-        tdp_news = await self._fetch_rss_news('tdp')
-        general_news = await self._fetch_rss_news('ap_politics')
+    async def _fetch_all_news(self) -> Dict[str, Any]:
+        """Fetch all feeds, store and index their articles, and return each party's top stories"""
+        # Fetch from Google News RSS (always free), all feeds at once
+        ysrcp_news, tdp_news, general_news = await asyncio.gather(
+            self._fetch_rss_news('ysrcp'),
+            self._fetch_rss_news('tdp'),
+            self._fetch_rss_news('ap_politics')
+        )
 
         # Try NewsAPI if key is available
         if self.news_api_key:
@@ -47,53 +115,118 @@ class NewsService:
         ysrcp_news = self._deduplicate_news(ysrcp_news)
         tdp_news = self._deduplicate_news(tdp_news)
 
-        # Calculate mentions and sentiment distribution
-        result = {
-            "ysrcp": {
-                "articles": ysrcp_news[:10],
-                "totalMentions": len(ysrcp_news),
-                "sources": list(set([n.get('source', 'Unknown') for n in ysrcp_news]))[:5]
-            },
-            "tdp": {
-                "articles": tdp_news[:10],
-                "totalMentions": len(tdp_news),
-                "sources": list(set([n.get('source', 'Unknown') for n in tdp_news]))[:5]
-            },
-            "trending": self._get_trending_topics(ysrcp_news + tdp_news + general_news),
+        # Clustering, sentiment scoring, SQLite writes and term counting all stay off the event loop
+        ysrcp_stories, tdp_stories = await asyncio.to_thread(
+            self._process_news, {"ysrcp": ysrcp_news, "tdp": tdp_news, "general": general_news}
+        )
+
+        return {
+            "ysrcp": ysrcp_stories[:10],
+            "tdp": tdp_stories[:10],
+            "trending": self._get_trending_topics(),
             "lastUpdated": datetime.now().isoformat()
         }
 
-        news_cache[cache_key] = result
-        return result
+    def _process_news(self, news: Dict[str, List[Dict[str, Any]]]) -> Tuple[List[Dict], List[Dict]]:
+        """Cluster, score and store one fetch's articles; returns the ysrcp and tdp stories"""
+        # Collapse syndicated copies of the same story
+        ysrcp_stories, ysrcp_moved = self._cluster_stories(news["ysrcp"])
+        tdp_stories, tdp_moved = self._cluster_stories(news["tdp"])
+
+        # Feed the per-party sentiment window (articles seen before are skipped)
+        for party, articles in (("ysrcp", ysrcp_stories), ("tdp", tdp_stories)):
+            sentiment_service.ingest(party, [
+                (self._article_key(a), a['title'] + ' ' + a.get('description', ''),
+                 self._to_timestamp(a.get('publishedAt', '')))
+                for a in articles
+            ])
+
+        self._store_articles(news, ysrcp_moved | tdp_moved)
+        return ysrcp_stories, tdp_stories
+
+    def _store_articles(self, news: Dict[str, List[Dict[str, Any]]], moved: Set[str]):
+        """
+        Add new articles to the store, tagged with their story cluster, and to the topic burst detector
+        Stored articles that clustering merged into another story (`moved`) are re-tagged, so a merged
+        story is counted once
+        """
+        for party, articles in news.items():
+            article_store.ingest(party, [
+                (key, story_index.cluster(key) or key, a, self._to_timestamp(a.get('publishedAt', '')))
+                for key, a in ((self._article_key(a), a) for a in articles)
+            ])
+        clusters = {key: story_index.cluster(key) for key in moved}
+        article_store.retag({key: cluster for key, cluster in clusters.items() if cluster is not None})
+
+        topic_trends.add(
+            (self._article_key(a), story_text(a), self._to_timestamp(a.get('publishedAt', '')))
+            for articles in news.values() for a in articles
+        )
+
+    def _window_counts(self, since: float) -> Dict[str, Dict[str, Any]]:
+        """Each party's distinct stories and top outlets published since a timestamp"""
+        return {
+            party: {
+                "totalMentions": article_store.mention_count(party, since),
+                "sources": article_store.sources(party, since)
+            }
+            for party in ("ysrcp", "tdp")
+        }
 
     async def _fetch_rss_news(self, feed_type: str) -> List[Dict[str, Any]]:
-        """Fetch news from Google News RSS"""
+        """Fetch news from Google News RSS, reusing the last parse when the feed is unchanged"""
         try:
             url = self.rss_feeds.get(feed_type)
             if not url:
                 return []
 
-            feed = feedparser.parse(url)
-            articles = []
-
-            for entry in feed.entries[:20]:
-                # Parse the entry
-                article = {
-                    "title": entry.get('title', ''),
-                    "link": entry.get('link', ''),
-                    "source": self._extract_source(entry),
-                    "publishedAt": self._parse_date(entry.get('published', '')),
-                    "description": self._clean_html(entry.get('summary', '')),
-                    "party": self._classify_party(entry.get('title', '') + ' ' + entry.get('summary', ''))
-                }
-                articles.append(article)
-
-            return articles
+            state = self._feed_state.get(url)
+            headers = {}
+            if state:
+                if state.get('etag'):
+                    headers['If-None-Match'] = state['etag']
+                if state.get('lastModified'):
+                    headers['If-Modified-Since'] = state['lastModified']
+
+            response = await self._get_client().get(url, headers=headers)
+            if response.status_code == 304 and state:
+                return list(state['articles'])
+            response.raise_for_status()
+
+            # Parsing is CPU-bound - keep it off the event loop so the other feeds keep downloading
+            entries = await asyncio.to_thread(parse_feed, response.content, RSS_ENTRY_LIMIT,
+                                              dict(response.headers))
+            articles = self._parse_entries(entries)
+
+            self._feed_state[url] = {
+                'etag': response.headers.get('ETag'),
+                'lastModified': response.headers.get('Last-Modified'),
+                'articles': articles
+            }
+            return list(articles)
 
         except Exception as e:
             print(f"RSS fetch error for {feed_type}: {e}")
             return []
 
+    def _parse_entries(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert parsed RSS entries to article dicts"""
+        articles = []
+
+        for entry in entries:
+            # Parse the entry
+            article = {
+                "title": entry.get('title', ''),
+                "link": entry.get('link', ''),
+                "source": self._extract_source(entry),
+                "publishedAt": self._parse_date(entry.get('published', '')),
+                "description": self._clean_html(entry.get('summary', ''), entry.get('id') or entry.get('link')),
+                "party": self._classify_party(entry.get('title', '') + ' ' + entry.get('summary', ''))
+            }
+            articles.append(article)
+
+        return articles
+
     async def _fetch_newsapi(self) -> Dict[str, List[Dict[str, Any]]]:
         """Fetch from NewsAPI.org (if key available)"""
         if not self.news_api_key:
@@ -101,33 +234,33 @@ class NewsService:
 
         result = {"ysrcp": [], "tdp": []}
 
-        async with httpx.AsyncClient() as client:
-            for party, keywords in [("ysrcp", YSRCP_KEYWORDS[:3]), ("tdp", TDP_KEYWORDS[:3])]:
-                try:
-                    query = " OR ".join(keywords)
-                    url = f"https://newsapi.org/v2/everything"
-                    params = {
-                        "q": query,
-                        "language": "en",
-                        "sortBy": "publishedAt",
-                        "pageSize": 10,
-                        "apiKey": self.news_api_key
-                    }
-
-                    response = await client.get(url, params=params)
-                    if response.status_code == 200:
-                        data = response.json()
-                        for article in data.get('articles', []):
-                            result[party].append({
-                                "title": article.get('title', ''),
-                                "link": article.get('url', ''),
-                                "source": article.get('source', {}).get('name', 'Unknown'),
-                                "publishedAt": article.get('publishedAt', ''),
-                                "description": article.get('description', ''),
-                                "party": party
-                            })
-                except Exception as e:
-                    print(f"NewsAPI error for {party}: {e}")
+        client = self._get_client()
+        for party, keywords in [("ysrcp", YSRCP_KEYWORDS[:3]), ("tdp", TDP_KEYWORDS[:3])]:
+            try:
+                query = " OR ".join(keywords)
+                url = f"https://newsapi.org/v2/everything"
+                params = {
+                    "q": query,
+                    "language": "en",
+                    "sortBy": "publishedAt",
+                    "pageSize": 10,
+                    "apiKey": self.news_api_key
+                }
+
+                response = await client.get(url, params=params)
+                if response.status_code == 200:
+                    data = response.json()
+                    for article in data.get('articles', []):
+                        result[party].append({
+                            "title": article.get('title', ''),
+                            "link": article.get('url', ''),
+                            "source": article.get('source', {}).get('name', 'Unknown'),
+                            "publishedAt": article.get('publishedAt', ''),
+                            "description": article.get('description', ''),
+                            "party": party
+                        })
+            except Exception as e:
+                print(f"NewsAPI error for {party}: {e}")
 
         return result
 
@@ -139,8 +272,8 @@ class NewsService:
             return title.split(' - ')[-1].strip()
 
         # Try source tag
-        if hasattr(entry, 'source'):
-            return entry.source.get('title', 'Unknown')
+        if entry.get('source') is not None:
+            return entry['source'].get('title', 'Unknown')
 
         return 'Google News'
 
@@ -153,19 +286,31 @@ class NewsService:
         except:
             return datetime.now().isoformat()
 
-    def _clean_html(self, html_text: str) -> str:
-        """Remove HTML tags from text"""
+    def _to_timestamp(self, iso_date: str) -> Optional[float]:
+        """Convert an ISO date string to a Unix timestamp (None if unparseable)"""
+        try:
+            return datetime.fromisoformat(iso_date).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+    def _clean_html(self, html_text: str, guid: Optional[str] = None) -> str:
+        """Remove HTML tags from text (memoized per entry GUID)"""
         if not html_text:
             return ""
-        soup = BeautifulSoup(html_text, 'html.parser')
-        return soup.get_text()[:200]
+        cached = summary_cache.get(guid) if guid else None
+        if cached is not None and cached[0] == html_text:
+            return cached[1]
+        text = html_to_text(html_text, 200)
+        if guid:
+            summary_cache[guid] = (html_text, text)
+        return text
 
     def _classify_party(self, text: str) -> str:
         """Classify which party the article is about"""
-        text_lower = text.lower()
+        matches = party_keywords.match(text)
 
-        ysrcp_count = sum(1 for kw in YSRCP_KEYWORDS if kw.lower() in text_lower)
-        tdp_count = sum(1 for kw in TDP_KEYWORDS if kw.lower() in text_lower)
+        ysrcp_count = matches.count('ysrcp')
+        tdp_count = matches.count('tdp')
 
         if ysrcp_count > tdp_count:
             return "ysrcp"
@@ -189,26 +334,30 @@ class NewsService:
         unique.sort(key=lambda x: x.get('publishedAt', ''), reverse=True)
         return unique
 
-    def _get_trending_topics(self, articles: List[Dict]) -> List[Dict[str, Any]]:
-        """Extract trending topics from news articles"""
-        # Keywords frequency
-        keywords = {}
-        topic_keywords = [
-            "welfare", "development", "election", "rally", "scheme",
-            "Amaravati", "capital", "agriculture", "farmers", "education",
-            "healthcare", "jobs", "employment", "corruption", "alliance"
-        ]
-
-        for article in articles:
-            text = (article.get('title', '') + ' ' + article.get('description', '')).lower()
-            for keyword in topic_keywords:
-                if keyword.lower() in text:
-                    keywords[keyword] = keywords.get(keyword, 0) + 1
-
-        # Sort by frequency
-        sorted_topics = sorted(keywords.items(), key=lambda x: x[1], reverse=True)
-
-        return [{"topic": topic, "count": count} for topic, count in sorted_topics[:10]]
+    def _article_key(self, article: Dict) -> str:
+        """Stable identity of an article across fetches"""
+        return article.get('link') or article['title']
+
+    def _cluster_stories(self, articles: List[Dict]) -> Tuple[List[Dict], Set[str]]:
+        """
+        Keep the newest article of each near-duplicate story cluster, with the story's reach
+        (articles carrying it across all feeds in the rolling story index) as storyReach
+        Also returns the keys of indexed articles whose cluster changed because clusters merged
+        """
+        keys = [self._article_key(article) for article in articles]
+        moved: Set[str] = set()
+        for key, article in zip(keys, articles):
+            moved.update(story_index.index(key, story_text(article))[1])
+
+        stories = {}
+        for key, article in zip(keys, articles):
+            stories.setdefault(story_index.cluster(key) or key, article)
+
+        return [dict(article, storyReach=story_index.reach(cluster)) for cluster, article in stories.items()], moved
+
+    def _get_trending_topics(self) -> List[Dict[str, Any]]:
+        """Topics spiking in recent news and posts, highest burst score first"""
+        return topic_trends.top(10)
 
     async def get_news_stats(self) -> Dict[str, Any]:
         """Get news statistics for dashboard"""
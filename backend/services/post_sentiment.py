@@ -0,0 +1,125 @@
+"""
+Post Sentiment Pipeline
+Scores every post ingested into the unified post store (tweets, Instagram captions,
+Facebook messages, YouTube titles) in the background with the batch sentiment engine
+- Scores are cached by post ID; a post is rescored only when its text changes
+- Running per-platform, per-party aggregates make distribution queries O(1)
+"""
+
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.post_record import PostRecord
+from services.post_store import PostKey, PostListener, post_store
+from services.sentiment_engine import sentiment_engine, text_key
+from services.sentiment_window import PartyAggregate
+
+BATCH_SIZE = 2000  # Posts scored per engine call
+
+
+class PostSentiment(PostListener):
+    """Background scorer for post store records, with per-platform, per-party aggregates"""
+
+    def __init__(self, batch_size: int = BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[PostRecord]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._scores: Dict[PostKey, Tuple[str, bytes, float]] = {}  # key -> (party, text key, compound)
+        self._aggregates: Dict[Tuple[str, str], PartyAggregate] = {}  # (platform, party) -> aggregate
+        self._worker = None
+
+    def posts_added(self, records: List[PostRecord]):
+        """Queue posts for scoring; the worker thread starts on first use"""
+        for record in records:
+            self._queue.put(record)
+
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="post-sentiment", daemon=True)
+                self._worker.start()
+
+    def posts_removed(self, keys: List[PostKey]):
+        """Drop evicted posts from the aggregates"""
+        with self._lock:
+            for key in keys:
+                previous = self._scores.pop(key, None)
+                if previous is not None:
+                    self._aggregates[(key[0], previous[0])].add(previous[2], sign=-1)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._score(batch)
+            except Exception as e:
+                print(f"Post sentiment scoring error: {e}")
+
+    def _score(self, records: List[PostRecord]):
+        """Score the records whose text is new or changed and fold them into the aggregates"""
+        pending = {}
+        with self._lock:
+            for record in records:
+                key = (record.platform, record.id)
+                tkey = text_key(record.text) if record.text else b""
+                previous = self._scores.get(key)
+                if previous is None or previous[:2] != (record.party, tkey):
+                    pending[key] = (record, tkey)
+
+        if not pending:
+            return
+
+        compound = sentiment_engine.score([record.text for record, _ in pending.values()]).compound
+
+        with self._lock:
+            for (key, (record, tkey)), score in zip(pending.items(), compound.tolist()):
+                # Skip posts the store evicted while they were being scored
+                if post_store.get(*key) is None:
+                    continue
+                previous = self._scores.get(key)
+                if previous is not None:
+                    self._aggregates[(key[0], previous[0])].add(previous[2], sign=-1)
+                self._scores[key] = (record.party, tkey, score)
+                self._aggregates.setdefault((record.platform, record.party), PartyAggregate()).add(score)
+
+    def get_score(self, platform: str, post_id: str) -> Optional[float]:
+        """Cached compound score of one post, or None if it hasn't been scored yet"""
+        with self._lock:
+            scored = self._scores.get((platform, post_id))
+        return scored[2] if scored else None
+
+    def party_snapshot(self, party: str) -> Dict[str, Any]:
+        """Sentiment aggregate for a party across every platform"""
+        combined = PartyAggregate()
+        with self._lock:
+            for (_, agg_party), aggregate in self._aggregates.items():
+                if agg_party == party:
+                    combined.merge(aggregate)
+        return combined.snapshot()
+
+    def get_distributions(self) -> Dict[str, Any]:
+        """Per-platform, per-party sentiment distributions of all scored posts"""
+        with self._lock:
+            platforms: Dict[str, Dict[str, Any]] = {}
+            for (platform, party), aggregate in sorted(self._aggregates.items()):
+                platforms.setdefault(platform, {})[party] = aggregate.snapshot()
+            parties = {party for _, party in self._aggregates}
+            scored = len(self._scores)
+
+        return {
+            "platforms": platforms,
+            "parties": {party: self.party_snapshot(party) for party in sorted(parties)},
+            "totalScored": scored,
+            "pending": self._queue.qsize()
+        }
+
+
+# Singleton instance, fed by the post store
+post_sentiment = PostSentiment()
+post_store.subscribe(post_sentiment)
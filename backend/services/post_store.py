@@ -0,0 +1,230 @@
+"""
+Unified Post Store
+Keeps the post records ingested by the Twitter, Instagram, Facebook and YouTube services
+in one normalized in-memory store, with secondary indexes for fast cross-platform queries
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models.post_record import PostRecord
+
+BUCKET_SECONDS = 3600            # Timestamp index granularity (1 hour)
+RETENTION_SECONDS = 7 * 86400    # Posts older than a week are evicted
+MAX_POSTS = 50000                # Upper bound on stored records
+
+PostKey = Tuple[str, str]        # (platform, id)
+
+
+class PostListener:
+    """Pipeline stage fed by the store (e.g. background sentiment scoring)"""
+
+    def posts_added(self, records: List[PostRecord]):
+        pass
+
+    def posts_removed(self, keys: List[PostKey]):
+        pass
+
+
+class PostStore:
+    """
+    In-memory store of PostRecords indexed by party, platform, author,
+    hourly timestamp bucket and engagement rank
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._posts: Dict[PostKey, PostRecord] = {}
+        self._times: Dict[PostKey, float] = {}
+        self._by_party: Dict[str, Set[PostKey]] = defaultdict(set)
+        self._by_platform: Dict[str, Set[PostKey]] = defaultdict(set)
+        self._by_author: Dict[str, Set[PostKey]] = defaultdict(set)
+        self._by_bucket: Dict[int, Set[PostKey]] = defaultdict(set)
+        # Sorted keys of _by_bucket - time range queries and eviction bisect into it
+        self._bucket_keys: List[int] = []
+        # Sorted (-engagement, key) pairs - position is the engagement rank
+        self._ranked: List[Tuple[int, PostKey]] = []
+        # Downstream pipeline stages notified of ingested and evicted posts
+        self._listeners: List[PostListener] = []
+
+    def subscribe(self, listener: PostListener):
+        """Register a pipeline stage; it is first handed every post already stored"""
+        with self._lock:
+            self._listeners.append(listener)
+            existing = list(self._posts.values())
+        if existing:
+            listener.posts_added(existing)
+
+    def add_many(self, records: Iterable[PostRecord]):
+        """Insert or update records; re-ingesting a post refreshes its metrics"""
+        records = list(records)
+        with self._lock:
+            new_keys = set()
+            for record in records:
+                key = (record.platform, record.id)
+                if key in self._posts:
+                    self._unindex(key)
+                else:
+                    new_keys.add(key)
+                self._index(key, record)
+            # Posts ingested and evicted in this same call were never announced, so are not removals
+            evicted = [key for key in self._evict() if key not in new_keys]
+            added = [r for r in records if (r.platform, r.id) in self._posts]
+            listeners = list(self._listeners)
+
+        # Listeners run outside the lock so they can query the store
+        for listener in listeners:
+            if evicted:
+                listener.posts_removed(evicted)
+            if added:
+                listener.posts_added(added)
+
+    def _index(self, key: PostKey, record: PostRecord):
+        """Add a record to the primary map and every secondary index"""
+        # Posts without a timestamp (e.g. YouTube search results) are bucketed at ingestion time
+        ts = record.timestamp.timestamp() if record.timestamp else time.time()
+
+        self._posts[key] = record
+        self._times[key] = ts
+        self._by_party[record.party].add(key)
+        self._by_platform[record.platform].add(key)
+        self._by_author[record.author.lower()].add(key)
+        bucket = int(ts // BUCKET_SECONDS)
+        if bucket not in self._by_bucket:
+            bisect.insort(self._bucket_keys, bucket)
+        self._by_bucket[bucket].add(key)
+        bisect.insort(self._ranked, (-record.engagement, key))
+
+    def _unindex(self, key: PostKey):
+        """Remove a record from the primary map and every secondary index"""
+        record = self._posts.pop(key)
+        ts = self._times.pop(key)
+
+        self._discard(self._by_party, record.party, key)
+        self._discard(self._by_platform, record.platform, key)
+        self._discard(self._by_author, record.author.lower(), key)
+        bucket = int(ts // BUCKET_SECONDS)
+        self._discard(self._by_bucket, bucket, key)
+        if bucket not in self._by_bucket:
+            pos = bisect.bisect_left(self._bucket_keys, bucket)
+            if pos < len(self._bucket_keys) and self._bucket_keys[pos] == bucket:
+                del self._bucket_keys[pos]
+
+        entry = (-record.engagement, key)
+        pos = bisect.bisect_left(self._ranked, entry)
+        if pos < len(self._ranked) and self._ranked[pos] == entry:
+            del self._ranked[pos]
+
+    def _discard(self, index: Dict, value, key: PostKey):
+        """Drop a key from one index entry, removing the entry once it is empty"""
+        keys = index.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[value]
+
+    def _evict(self) -> List[PostKey]:
+        """
+        Drop buckets older than the retention window, then the lowest ranked posts above MAX_POSTS
+        Returns the evicted keys
+        """
+        evicted = []
+        oldest_bucket = int((time.time() - RETENTION_SECONDS) // BUCKET_SECONDS)
+        for bucket in self._bucket_keys[:bisect.bisect_left(self._bucket_keys, oldest_bucket)]:
+            for key in list(self._by_bucket.get(bucket, ())):
+                self._unindex(key)
+                evicted.append(key)
+
+        while len(self._posts) > MAX_POSTS:
+            key = self._ranked[-1][1]
+            self._unindex(key)
+            evicted.append(key)
+        return evicted
+
+    def get(self, platform: str, post_id: str) -> Optional[PostRecord]:
+        """A stored record by platform and id"""
+        with self._lock:
+            return self._posts.get((platform, post_id))
+
+    def top(self, limit: int = 10, party: Optional[str] = None, platform: Optional[str] = None,
+            author: Optional[str] = None, since: Optional[datetime] = None) -> List[PostRecord]:
+        """
+        Top posts by engagement matching all given filters
+        e.g. top(10, party='tdp', since=now - 6h) across every platform
+        """
+        with self._lock:
+            candidates = self._candidates(party, platform, author, since)
+            since_ts = since.timestamp() if since else None
+
+            if candidates is not None and len(candidates) * 8 < len(self._ranked):
+                # Selective filter - rank the few candidates directly
+                keys = sorted(candidates, key=lambda k: -self._posts[k].engagement)
+            else:
+                # Broad filter - walk the engagement index and stop once we have enough
+                keys = (key for _, key in self._ranked if candidates is None or key in candidates)
+
+            result = []
+            for key in keys:
+                if since_ts is not None and self._times[key] < since_ts:
+                    continue
+                result.append(self._posts[key])
+                if len(result) >= limit:
+                    break
+            return result
+
+    def count(self, party: Optional[str] = None, platform: Optional[str] = None,
+              author: Optional[str] = None, since: Optional[datetime] = None) -> int:
+        """Number of stored posts matching all given filters"""
+        with self._lock:
+            candidates = self._candidates(party, platform, author, since)
+            keys = candidates if candidates is not None else self._posts.keys()
+            if since is None:
+                return len(keys)
+            since_ts = since.timestamp()
+            return sum(1 for key in keys if self._times[key] >= since_ts)
+
+    def _candidates(self, party: Optional[str], platform: Optional[str],
+                    author: Optional[str], since: Optional[datetime]) -> Optional[Set[PostKey]]:
+        """Intersect the secondary indexes for the given filters (None means no filter)"""
+        sets = []
+        if party:
+            sets.append(self._by_party.get(party, set()))
+        if platform:
+            sets.append(self._by_platform.get(platform, set()))
+        if author:
+            sets.append(self._by_author.get(author.lower(), set()))
+
+        if since:
+            # Only the buckets at or after since are walked
+            first_bucket = int(since.timestamp() // BUCKET_SECONDS)
+            recent = [self._by_bucket[b]
+                      for b in self._bucket_keys[bisect.bisect_left(self._bucket_keys, first_bucket):]]
+            if sets and len(min(sets, key=len)) < sum(len(keys) for keys in recent):
+                # The other filters are narrower - check their keys' times instead of unioning buckets
+                start = first_bucket * BUCKET_SECONDS
+                sets.sort(key=len)
+                return {key for key in sets[0].intersection(*sets[1:]) if self._times[key] >= start}
+            sets.append(set().union(*recent))
+
+        if not sets:
+            return None
+
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def stats(self) -> Dict[str, int]:
+        """Store size per platform and party"""
+        with self._lock:
+            return {
+                'total': len(self._posts),
+                **{f"platform:{k}": len(v) for k, v in self._by_platform.items()},
+                **{f"party:{k}": len(v) for k, v in self._by_party.items()}
+            }
+
+
+# Singleton instance
+post_store = PostStore()
@@ -0,0 +1,378 @@
+"""
+Sentiment Backends
+Pluggable scorers behind the batch sentiment engine
+- vader: lexicon-based, pure Python, fast default
+- transformer: CPU-only, dynamically quantized sequence classifier for Telugu and code-mixed text
+  (optional - needs torch and transformers installed, and SENTIMENT_MODEL to point at a model)
+
+Benchmark with: python -m services.sentiment_backends
+(offline - the transformer is benchmarked only when SENTIMENT_MODEL is a local model directory)
+"""
+
+import importlib.util
+import math
+import os
+import string
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from vaderSentiment.vaderSentiment import BOOSTER_DICT, NEGATE, SPECIAL_CASES, SentimentIntensityAnalyzer, normalize
+
+from config import SENTIMENT_MODEL
+from services.vader_lexicon import POLITICAL_LEXICON, build_analyzer
+
+NEUTRAL_SCORES = (0.0, 0.0, 0.0, 1.0)  # compound, pos, neg, neu for empty texts
+
+SHORT_TEXT_TOKENS = 10       # Texts up to this many tokens try the VADER fast path
+MAX_CACHED_TOKENS = 200000   # Distinct tokens whose fast-path lookups are remembered
+
+# Words that trigger one of VADER's contextual rules (boosters, negation, "no", "least", "but",
+# "kind of"/"sort of"/"just enough", and the "this" emphasis in its negation check)
+_CONTEXT_WORDS = frozenset(
+    [w for w in BOOSTER_DICT if " " not in w] + [w.lower() for w in NEGATE] +
+    ["no", "least", "but", "this", "kind", "sort", "just"]
+)
+
+TRANSFORMERS_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ("torch", "transformers"))
+
+
+class SentimentBackend(ABC):
+    """Scores a batch of texts into an (n, 4) array of compound, pos, neg, neu"""
+
+    name = ""
+    parallel = False  # Whether the engine should shard large batches across processes
+
+    @abstractmethod
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Scores aligned with the input; empty texts score NEUTRAL_SCORES"""
+
+
+class ShortTextScorer:
+    """
+    Scores short texts straight from VADER's lexicon when none of its contextual rules apply
+    (no boosters, negations, "but", special-case idioms, emoji or mixed ALL CAPS), and returns
+    None otherwise. When it returns scores they are identical to polarity_scores.
+    """
+
+    def __init__(self, analyzer: SentimentIntensityAnalyzer, max_tokens: int = SHORT_TEXT_TOKENS):
+        self.max_tokens = max_tokens
+        self.emojis = analyzer.emojis
+        # Precomputed per-token results: raw token -> (ALL CAPS, lowercased token, valence),
+        # or None if the token needs full VADER
+        self._tokens: Dict[str, Optional[Tuple[bool, str, float]]] = {}
+        self._lexicon = analyzer.lexicon
+
+    def _token(self, word: str) -> Optional[Tuple[bool, str, float]]:
+        entry = self._tokens.get(word, False)
+        if entry is False:
+            # Same punctuation stripping as VADER's SentiText
+            stripped = word.strip(string.punctuation)
+            token = stripped if len(stripped) > 2 else word
+            lowered = token.lower()
+            if lowered in _CONTEXT_WORDS or "n't" in lowered:
+                entry = None
+            else:
+                entry = (token.isupper(), lowered, self._lexicon.get(lowered, 0))
+            if len(self._tokens) < MAX_CACHED_TOKENS:
+                self._tokens[word] = entry
+        return entry
+
+    def score(self, text: str) -> Optional[Tuple[float, float, float, float]]:
+        """(compound, pos, neg, neu) for a short plain text, or None if full VADER is needed"""
+        if not text.isascii() and any(ch in self.emojis for ch in text):
+            return None
+
+        words = text.split()
+        if len(words) > self.max_tokens:
+            return None
+
+        allcaps = 0
+        tokens = []
+        sentiments = []
+        for word in words:
+            entry = self._token(word)
+            if entry is None:
+                return None
+            allcaps += entry[0]
+            tokens.append(entry[1])
+            sentiments.append(entry[2])
+
+        # Some but not all words in ALL CAPS boosts the capitalized ones
+        if 0 < len(words) - allcaps < len(words):
+            return None
+
+        # Special-case idioms ("the shit", "kiss of death", ...) span adjacent tokens
+        for i in range(len(tokens) - 1):
+            if f"{tokens[i]} {tokens[i + 1]}" in SPECIAL_CASES or \
+                    (i + 2 < len(tokens) and f"{tokens[i]} {tokens[i + 1]} {tokens[i + 2]}" in SPECIAL_CASES):
+                return None
+
+        return self._score_valence(sentiments, text.strip())
+
+    @staticmethod
+    def _score_valence(sentiments: List[float], text: str) -> Tuple[float, float, float, float]:
+        """SentimentIntensityAnalyzer.score_valence, step for step"""
+        if not sentiments:
+            return 0.0, 0.0, 0.0, 0.0
+
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+
+        sum_s = float(sum(sentiments))
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+        compound = normalize(sum_s)
+
+        pos_sum, neg_sum, neu_count = 0.0, 0.0, 0
+        for sentiment_score in sentiments:
+            if sentiment_score > 0:
+                pos_sum += (float(sentiment_score) + 1)
+            if sentiment_score < 0:
+                neg_sum += (float(sentiment_score) - 1)
+            if sentiment_score == 0:
+                neu_count += 1
+
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += punct_emph_amplifier
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= punct_emph_amplifier
+
+        total = pos_sum + math.fabs(neg_sum) + neu_count
+        return (round(compound, 4), round(math.fabs(pos_sum / total), 3),
+                round(math.fabs(neg_sum / total), 3), round(math.fabs(neu_count / total), 3))
+
+
+class VaderBackend(SentimentBackend):
+    """
+    VADER with the political lexicon - GIL-bound, so large batches go to the process pool
+    Short plain texts (hashtags, key phrases) take the lexicon-only fast path
+    """
+
+    name = "vader"
+    parallel = True
+
+    def __init__(self):
+        self.analyzer = build_analyzer()
+        self.short_text = ShortTextScorer(self.analyzer)
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        scores = np.tile(NEUTRAL_SCORES, (len(texts), 1))
+
+        polarity_scores = self.analyzer.polarity_scores
+        fast_score = self.short_text.score
+        for i, text in enumerate(texts):
+            if text:
+                row = fast_score(text)
+                if row is None:
+                    s = polarity_scores(text)
+                    row = (s['compound'], s['pos'], s['neg'], s['neu'])
+                scores[i] = row
+        return scores
+
+
+class TransformerBackend(SentimentBackend):
+    """
+    Multilingual 3-class (negative/neutral/positive) classifier, int8-quantized for CPU
+    - Texts are tokenized once without padding, sorted by length and packed into batches
+      under a token budget, so each batch is padded only to its own longest text
+    - The model is loaded and warmed once per process; torch parallelizes each batch itself
+    Compound is P(positive) - P(negative), matching VADER's [-1, 1] range
+    """
+
+    name = "transformer"
+    parallel = False
+
+    def __init__(self, model_name: str = SENTIMENT_MODEL, max_length: int = 128,
+                 max_batch_tokens: int = 4096):
+        if not TRANSFORMERS_AVAILABLE:
+            raise ImportError("The transformer sentiment backend needs torch and transformers installed")
+
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self.torch = torch
+        self.max_length = max_length
+        self.max_batch_tokens = max_batch_tokens
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        self.model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        # Map the model's labels to (negative, neutral, positive) columns; unnamed labels are assumed in that order
+        labels = {label.lower(): index for index, label in model.config.id2label.items()}
+        self.columns = [labels.get(name, i) for i, name in enumerate(("negative", "neutral", "positive"))]
+
+        self.score_batch(["warm up"])
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        scores = np.tile(NEUTRAL_SCORES, (len(texts), 1))
+        positions = [i for i, text in enumerate(texts) if text]
+        if not positions:
+            return scores
+
+        input_ids = self.tokenizer([texts[i] for i in positions], truncation=True,
+                                   max_length=self.max_length)["input_ids"]
+
+        # Length-bucketed dynamic batches: shortest first, cut when the padded size exceeds the budget
+        order = sorted(range(len(positions)), key=lambda j: len(input_ids[j]))
+        batch: List[int] = []
+        for j in order:
+            if batch and (len(batch) + 1) * len(input_ids[j]) > self.max_batch_tokens:
+                self._run_batch(batch, input_ids, positions, scores)
+                batch = []
+            batch.append(j)
+        self._run_batch(batch, input_ids, positions, scores)
+        return scores
+
+    def _run_batch(self, batch: List[int], input_ids: List[List[int]], positions: List[int], scores: np.ndarray):
+        encoded = self.tokenizer.pad({"input_ids": [input_ids[j] for j in batch]}, return_tensors="pt")
+        with self.torch.inference_mode():
+            probs = self.torch.softmax(self.model(**encoded).logits, dim=-1).numpy()
+
+        neg, neu, pos = (probs[:, c] for c in self.columns)
+        rows = np.column_stack((pos - neg, pos, neg, neu))
+        scores[[positions[j] for j in batch]] = rows
+
+
+BACKENDS = {
+    VaderBackend.name: VaderBackend,
+    TransformerBackend.name: TransformerBackend,
+}
+
+# Backends are built once per process and reused
+_backends: Dict[str, SentimentBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: str) -> SentimentBackend:
+    """Shared, warm instance of a backend by name"""
+    with _backends_lock:
+        if name not in _backends:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown sentiment backend: {name}")
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+# Labeled fixtures for the accuracy comparison, including Telugu and code-mixed text
+FIXTURES = [
+    ("Jagan government's welfare schemes are a huge success for farmers", "positive"),
+    ("Massive victory for TDP in the municipal elections, cadre celebrates", "positive"),
+    ("Chandrababu Naidu's vision for Amaravati brings growth and jobs", "positive"),
+    ("Amma Vodi benefit reached every mother in the district, great work", "positive"),
+    ("Nara Lokesh's padayatra received a warm welcome in Kuppam", "positive"),
+    ("Jagan anna paalana chala manchidi, prajalu santhoshanga unnaru", "positive"),
+    ("Babu garu super, Amaravati development chala baagundi", "positive"),
+    ("జగన్ ప్రభుత్వం పథకాలు చాలా బాగున్నాయి", "positive"),
+    ("చంద్రబాబు నాయకత్వంలో అభివృద్ధి వేగంగా జరుగుతోంది", "positive"),
+    ("Corruption scandal exposes ministers, opposition demands resignation", "negative"),
+    ("Farmers protest against the failure of the irrigation project", "negative"),
+    ("Liquor scam probe widens, former officials arrested", "negative"),
+    ("Roads are terrible and the government is doing nothing", "negative"),
+    ("TDP leaders accuse YSRCP of rigging and violence at polling booths", "negative"),
+    ("Ee government chala chedda, prajalaki em cheyyaledu", "negative"),
+    ("Jobs levu, roads levu, anta waste paalana", "negative"),
+    ("ఈ ప్రభుత్వం పూర్తిగా విఫలమైంది", "negative"),
+    ("అవినీతి ఆరోపణలతో మంత్రి రాజీనామా", "negative"),
+    ("Chief Minister to visit Visakhapatnam on Monday", "neutral"),
+    ("YSRCP releases list of candidates for the upcoming by-election", "neutral"),
+    ("TDP state committee meeting scheduled in Mangalagiri", "neutral"),
+    ("Assembly session to begin on the 15th of next month", "neutral"),
+    ("Election Commission announces polling dates for Andhra Pradesh", "neutral"),
+    ("Repu Vijayawada lo meeting undi", "neutral"),
+    ("ముఖ్యమంత్రి రేపు విశాఖపట్నం పర్యటన", "neutral"),
+]
+
+
+def _benchmark():
+    import time
+
+    from services.sentiment_engine import label_sentiment
+
+    texts = [text for text, _ in FIXTURES]
+    expected = np.array([label for _, label in FIXTURES])
+    corpus = texts * 40  # ~1k texts for throughput
+
+    # The benchmark never downloads a model - a Hugging Face id is skipped rather than fetched
+    local_model = TRANSFORMERS_AVAILABLE and os.path.isdir(SENTIMENT_MODEL)
+    names = [VaderBackend.name] + ([TransformerBackend.name] if local_model else [])
+    for name in names:
+        start = time.perf_counter()
+        backend = get_backend(name)
+        load_time = time.perf_counter() - start
+
+        accuracy = float(np.mean(label_sentiment(backend.score_batch(texts)[:, 0]) == expected))
+
+        start = time.perf_counter()
+        backend.score_batch(corpus)
+        rate = len(corpus) / (time.perf_counter() - start)
+
+        print(f"{name:>12}: {rate:>9,.0f} texts/s   accuracy {accuracy:.0%} on {len(texts)} fixtures   "
+              f"(load {load_time:.1f}s)")
+
+    if not TRANSFORMERS_AVAILABLE:
+        print("transformer: skipped (install torch and transformers, and set SENTIMENT_MODEL)")
+    elif not local_model:
+        print(f"transformer: skipped ({SENTIMENT_MODEL!r} is not a local directory - set SENTIMENT_MODEL "
+              f"to a downloaded model to benchmark it offline)")
+
+    _check_short_text()
+
+
+def _fuzz_texts(count: int, seed: int = 39) -> List[str]:
+    """Random short texts mixing sentiment words, VADER's contextual triggers, emoji and Telugu"""
+    import random
+
+    vocabulary = (["good", "GOOD", "bad", "BAD", "welfare", "scam!", "great", "Victory", "corruption,", "jobs",
+                   "roads", "farmers", "Jagan", "Naidu", "TDP", "YSRCP", "#Amaravati", ":)", ":(", "lol",
+                   "not", "very", "no", "but", "kind", "of", "the", "shit", "yeah", "right", "isn't", "least",
+                   "so", "this", "never", "without", "doubt", "!!", "??", "?", "kiss", "death", "😀", "చాలా"] +
+                  list(POLITICAL_LEXICON))
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12))) + rng.choice(["", "!", "!!!", "?"])
+            for _ in range(count)]
+
+
+def _check_short_text():
+    """Fast path must match polarity_scores exactly; also reports its speedup on short texts"""
+    import random
+    import time
+
+    analyzer = build_analyzer()
+    scorer = ShortTextScorer(analyzer)
+    rng = random.Random(39)
+    texts = _fuzz_texts(50_000)
+
+    fast = 0
+    for text in texts:
+        row = scorer.score(text)
+        if row is not None:
+            fast += 1
+            s = analyzer.polarity_scores(text)
+            assert row == (s['compound'], s['pos'], s['neg'], s['neu']), text
+
+    hashtags = [f"{rng.choice(list(POLITICAL_LEXICON))} {rng.choice(['Jagan', 'Naidu', 'AP'])}" for _ in range(20_000)]
+    start = time.perf_counter()
+    for text in hashtags:
+        analyzer.polarity_scores(text)
+    full_rate = len(hashtags) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for text in hashtags:
+        scorer.score(text)
+    fast_rate = len(hashtags) / (time.perf_counter() - start)
+
+    print(f"short-text fast path: identical on {fast:,} of {len(texts):,} fuzzed texts it accepted;   "
+          f"{fast_rate:>9,.0f} vs {full_rate:>9,.0f} texts/s ({fast_rate / full_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,201 @@
+"""
+Batch Sentiment Engine
+Scores large lists of texts with the configured sentiment backend and returns the scores as NumPy arrays
+- VADER is pure Python and GIL-bound, so big batches are sharded across a process pool
+- Small batches are scored in-process to avoid the pool overhead
+- Scores are memoized per text by content hash, so repeated titles and tweets are scored once
+
+Benchmark with: python -m services.sentiment_engine
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from config import SENTIMENT_BACKEND
+from services.sentiment_backends import NEUTRAL_SCORES, SentimentBackend, get_backend
+
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+PARALLEL_THRESHOLD = 5000   # Batches smaller than this are scored in-process
+CHUNK_SIZE = 2000           # Texts per worker task
+MEMO_SIZE = 50000           # Texts whose scores are remembered
+
+
+class BatchScores(NamedTuple):
+    """Sentiment scores for a batch, one float64 array per component"""
+    compound: np.ndarray
+    positive: np.ndarray
+    negative: np.ndarray
+    neutral: np.ndarray
+
+
+def text_key(text: str) -> bytes:
+    """
+    Stable content hash of a text, ignoring differences in whitespace
+    VADER splits on whitespace and subword tokenizers collapse it, so texts with the same key score the same
+    """
+    return hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=16).digest()
+
+
+def label_sentiment(compound: np.ndarray) -> np.ndarray:
+    """Classify compound scores as 'positive', 'negative' or 'neutral'"""
+    return np.where(compound >= POSITIVE_THRESHOLD, "positive",
+                    np.where(compound <= NEGATIVE_THRESHOLD, "negative", "neutral"))
+
+
+# Per-process backend, built once by the pool initializer
+_worker_backend: Optional[SentimentBackend] = None
+
+
+def _init_worker(backend_name: str):
+    global _worker_backend
+    _worker_backend = get_backend(backend_name)
+
+
+def _score_chunk(texts: Sequence[str]) -> np.ndarray:
+    """Score a chunk of texts in a pool worker"""
+    return _worker_backend.score_batch(texts)
+
+
+class SentimentEngine:
+    """
+    Scores text batches in-process or across a lazily started process pool
+    Only texts missing from the per-text memo are actually scored
+    The backend (VADER lexicon or transformer model) is loaded on first use, not at import
+    """
+
+    def __init__(self, backend: str = SENTIMENT_BACKEND, workers: Optional[int] = None,
+                 parallel_threshold: int = PARALLEL_THRESHOLD, chunk_size: int = CHUNK_SIZE,
+                 memo_size: int = MEMO_SIZE):
+        self._backend_name = backend
+        self._backend: Optional[SentimentBackend] = None
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._memo: LRUCache = LRUCache(maxsize=memo_size)
+        self._memo_lock = threading.Lock()
+
+    @property
+    def backend(self) -> SentimentBackend:
+        if self._backend is None:
+            self._backend = get_backend(self._backend_name)
+        return self._backend
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn rather than fork - the API server process runs threads
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"),
+                                                 initializer=_init_worker, initargs=(self.backend.name,))
+            return self._pool
+
+    def score(self, texts: Sequence[str]) -> BatchScores:
+        """Score every text, returning arrays aligned with the input order"""
+        scores = np.empty((len(texts), 4))
+        keys = [text_key(text) if text else None for text in texts]
+        missing: Dict[bytes, List[int]] = {}
+
+        with self._memo_lock:
+            for i, key in enumerate(keys):
+                row = self._memo.get(key) if key else NEUTRAL_SCORES
+                if row is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    scores[i] = row
+
+        if missing:
+            # Score each unseen text once, even if it repeats within the batch
+            fresh = self._score_uncached([texts[positions[0]] for positions in missing.values()])
+            with self._memo_lock:
+                for (key, positions), row in zip(missing.items(), fresh):
+                    self._memo[key] = tuple(row.tolist())
+                    scores[positions] = row
+
+        return BatchScores(*scores.T)
+
+    def score_text(self, text: str) -> Tuple[float, float, float, float]:
+        """Memoized (compound, pos, neg, neu) scores for a single text"""
+        if not text:
+            return NEUTRAL_SCORES
+        key = text_key(text)
+        with self._memo_lock:
+            row = self._memo.get(key)
+        if row is None:
+            row = tuple(self.backend.score_batch([text])[0].tolist())
+            with self._memo_lock:
+                self._memo[key] = row
+        return row
+
+    def _score_uncached(self, texts: Sequence[str]) -> np.ndarray:
+        """Score texts without the memo, sharding large batches across the pool"""
+        if not self.backend.parallel or len(texts) < self.parallel_threshold or self.workers < 2:
+            return self.backend.score_batch(texts)
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        return np.concatenate(list(self._get_pool().map(_score_chunk, chunks)))
+
+    def set_backend(self, name: str):
+        """Switch backends; memoized scores and pool workers belong to the old one and are dropped"""
+        backend = get_backend(name)
+        self.shutdown()
+        with self._memo_lock:
+            self._backend_name = name
+            self._backend = backend
+            self._memo.clear()
+
+    def shutdown(self):
+        """Stop the worker pool if one was started"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+# Singleton instance
+sentiment_engine = SentimentEngine()
+
+
+def _benchmark():
+    import random
+    import time
+
+    words = ("jagan welfare scheme success for farmers", "naidu slams corruption scandal in amaravati",
+             "tdp rally in vijayawada today", "ysrcp govt failure on roads, people protest",
+             "great victory for the people of andhra", "opposition raises crisis over polavaram")
+    rng = random.Random(42)
+
+    for n in (1_000, 10_000, 100_000):
+        texts = [f"{rng.choice(words)} {rng.choice(words)} #{i}" for i in range(n)]
+
+        start = time.perf_counter()
+        serial = sentiment_engine.backend.score_batch(texts)
+        serial_time = time.perf_counter() - start
+
+        engine = SentimentEngine(memo_size=2 * n)
+        engine._score_uncached(texts[:engine.parallel_threshold])  # Warm the pool
+        start = time.perf_counter()
+        batch = engine.score(texts)
+        batch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.score(texts)
+        memo_time = time.perf_counter() - start
+        engine.shutdown()
+
+        assert np.allclose(serial[:, 0], batch.compound)
+        print(f"{n:>7} texts: serial {n / serial_time:>9,.0f}/s   "
+              f"engine {n / batch_time:>9,.0f}/s ({engine.workers} workers)   "
+              f"memoized {n / memo_time:>11,.0f}/s")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -5,11 +5,16 @@ Uses VADER (Valence Aware Dictionary and sEntiment Reasoner)
 - Works well for social media text
 """
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
+import hashlib
+import heapq
+import numpy as np
+from collections import Counter
 from cachetools import TTLCache
-from typing import Dict, List, Any, Optional
-from config import YSRCP_KEYWORDS, TDP_KEYWORDS
+from typing import Dict, List, Any, Optional, Tuple
+from services.sentiment_engine import sentiment_engine, text_key, label_sentiment
+from services.key_phrases import phrase_cache, trending_phrases
+from services.keywords import party_keywords, KeywordMatches
+from services.sentiment_window import sentiment_window
 
 # Cache for sentiment results
 sentiment_cache = TTLCache(maxsize=500, ttl=3600)
@@ -17,52 +22,30 @@ sentiment_cache = TTLCache(maxsize=500, ttl=3600)
 
 class SentimentService:
     def __init__(self):
-        self.vader = SentimentIntensityAnalyzer()
-
-        # Add political context words to VADER
-        self._add_political_lexicon()
-
-    def _add_political_lexicon(self):
-        """Add political terms to VADER's lexicon"""
-        political_words = {
-            # Positive political terms
-            "welfare": 2.0,
-            "development": 1.5,
-            "progress": 1.5,
-            "success": 2.0,
-            "achievement": 2.0,
-            "benefit": 1.5,
-            "support": 1.0,
-            "victory": 2.5,
-            "growth": 1.5,
-
-            # Negative political terms
-            "corruption": -2.5,
-            "scam": -3.0,
-            "failure": -2.0,
-            "protest": -1.0,
-            "scandal": -2.5,
-            "controversy": -1.5,
-            "crisis": -2.0,
-            "opposition": -0.5,
-
-            # Telugu political terms (transliterated)
-            "manchidi": 2.0,  # Good
-            "chedda": -2.0,   # Bad
-        }
+        # Scoring goes through the batch engine and its configured backend (VADER by default)
+        self.engine = sentiment_engine
+
+    @property
+    def backend(self) -> str:
+        """Name of the active sentiment backend"""
+        return self.engine.backend.name
 
-        self.vader.lexicon.update(political_words)
+    def set_backend(self, name: str):
+        """Switch the sentiment backend ('vader' or 'transformer'); cached scores are dropped"""
+        self.engine.set_backend(name)
+        sentiment_cache.clear()
 
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of a single text"""
         if not text:
             return {"compound": 0, "positive": 0, "negative": 0, "neutral": 1}
 
-        # Use VADER for sentiment scores
-        scores = self.vader.polarity_scores(text)
+        # Use VADER for sentiment scores (memoized per text)
+        return self._build_analysis(*sentiment_engine.score_text(text))
 
+    def _build_analysis(self, compound: float, positive: float, negative: float, neutral: float) -> Dict[str, Any]:
+        """Single-text result from its compound, pos, neg and neu scores"""
         # Classify sentiment
-        compound = scores['compound']
         if compound >= 0.05:
             sentiment = "positive"
         elif compound <= -0.05:
@@ -73,12 +56,27 @@ class SentimentService:
         return {
             "sentiment": sentiment,
             "compound": compound,
-            "positive": scores['pos'],
-            "negative": scores['neg'],
-            "neutral": scores['neu'],
+            "positive": positive,
+            "negative": negative,
+            "neutral": neutral,
             "confidence": abs(compound)
         }
 
+    def analyze_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        analyze_text plus classify_party_sentiment for many non-empty texts,
+        scoring every text once in a single engine batch
+        """
+        scores = sentiment_engine.score(texts)
+        results = []
+        for text, row in zip(texts, zip(*(component.tolist() for component in scores))):
+            analysis = self._build_analysis(*row)
+            results.append({
+                "analysis": analysis,
+                "partyContext": self.classify_party_sentiment(text, analysis)
+            })
+        return results
+
     def analyze_batch(self, texts: List[str]) -> Dict[str, Any]:
         """Analyze sentiment of multiple texts"""
         if not texts:
@@ -88,16 +86,16 @@ class SentimentService:
                 "averageScore": 0
             }
 
-        results = [self.analyze_text(text) for text in texts]
+        compound = sentiment_engine.score(texts).compound
+        total = len(compound)
 
         # Calculate distribution
-        positive_count = sum(1 for r in results if r['sentiment'] == 'positive')
-        negative_count = sum(1 for r in results if r['sentiment'] == 'negative')
-        neutral_count = sum(1 for r in results if r['sentiment'] == 'neutral')
-        total = len(results)
+        positive_count = np.count_nonzero(compound >= 0.05)
+        negative_count = np.count_nonzero(compound <= -0.05)
+        neutral_count = total - positive_count - negative_count
 
         # Calculate average compound score
-        avg_compound = sum(r['compound'] for r in results) / total if total > 0 else 0
+        avg_compound = float(compound.mean())
 
         # Overall sentiment
         if avg_compound >= 0.05:
@@ -118,15 +116,18 @@ class SentimentService:
             "totalAnalyzed": total
         }
 
-    def classify_party_sentiment(self, text: str) -> Dict[str, Any]:
-        """Classify sentiment specifically for YSRCP vs TDP"""
-        text_lower = text.lower()
-
+    def classify_party_sentiment(self, text: str, sentiment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Classify sentiment specifically for YSRCP vs TDP
+        Pass the text's analyze_text result as sentiment to avoid scoring it again
+        """
         # Check which party is mentioned
-        ysrcp_mentioned = any(kw.lower() in text_lower for kw in YSRCP_KEYWORDS)
-        tdp_mentioned = any(kw.lower() in text_lower for kw in TDP_KEYWORDS)
+        matches = party_keywords.match(text)
+        ysrcp_mentioned = matches.has('ysrcp')
+        tdp_mentioned = matches.has('tdp')
 
-        sentiment = self.analyze_text(text)
+        if sentiment is None:
+            sentiment = self.analyze_text(text)
 
         return {
             "text": text[:100] + "..." if len(text) > 100 else text,
@@ -134,16 +135,13 @@ class SentimentService:
             "score": sentiment['compound'],
             "ysrcp_mentioned": ysrcp_mentioned,
             "tdp_mentioned": tdp_mentioned,
-            "party_context": self._determine_party_context(text_lower, sentiment['sentiment'])
+            "party_context": self._determine_party_context(matches, sentiment['sentiment'])
         }
 
-    def _determine_party_context(self, text: str, sentiment: str) -> str:
+    def _determine_party_context(self, matches: KeywordMatches, sentiment: str) -> str:
         """Determine if sentiment is pro-YSRCP, pro-TDP, or neutral"""
-        ysrcp_positive_indicators = ["ysrcp", "jagan", "welfare", "navaratnalu", "amma vodi"]
-        tdp_positive_indicators = ["tdp", "chandrababu", "naidu", "amaravati"]
-
-        ysrcp_score = sum(1 for ind in ysrcp_positive_indicators if ind in text)
-        tdp_score = sum(1 for ind in tdp_positive_indicators if ind in text)
+        ysrcp_score = matches.count('ysrcp_context')
+        tdp_score = matches.count('tdp_context')
 
         if sentiment == "positive":
             if ysrcp_score > tdp_score:
@@ -163,19 +161,55 @@ class SentimentService:
         Calculate overall sentiment scores for both parties
         Returns scores on 0-100 scale for dashboard
         """
-        cache_key = f"sentiment_score_{hash(str(ysrcp_texts[:5]))}"
+        # Key on every text of both parties so any changed article invalidates the result
+        digest = hashlib.blake2b(digest_size=16)
+        for texts in (ysrcp_texts, tdp_texts):
+            for text in texts:
+                digest.update(text_key(text or ""))
+            digest.update(b"|")
+        cache_key = f"sentiment_score_{digest.hexdigest()}"
         if cache_key in sentiment_cache:
             return sentiment_cache[cache_key]
 
         ysrcp_sentiment = self.analyze_batch(ysrcp_texts)
         tdp_sentiment = self.analyze_batch(tdp_texts)
 
+        result = self._build_score_result(ysrcp_sentiment, tdp_sentiment)
+        sentiment_cache[cache_key] = result
+        return result
+
+    def ingest(self, party: str, items: List[Tuple[str, str, Optional[float]]]):
+        """
+        Score (id, text, timestamp) items and add them to the party's sliding-window aggregate
+        Items already in the window with the same score are skipped
+        """
+        if not items:
+            return
+
+        texts = [text for _, text, _ in items]
+        compound = sentiment_engine.score(texts).compound
+        trending_phrases.add(texts)
+        for (item_id, _, timestamp), score in zip(items, compound.tolist()):
+            sentiment_window.add(party, item_id, score, timestamp)
+
+    def get_window_score(self) -> Optional[Dict[str, Any]]:
+        """
+        Party scores from the sliding-window aggregates, in the get_sentiment_score shape
+        Returns None until something has been ingested
+        """
+        if sentiment_window.size() == 0:
+            return None
+
+        return self._build_score_result(sentiment_window.snapshot('ysrcp'), sentiment_window.snapshot('tdp'))
+
+    def _build_score_result(self, ysrcp_sentiment: Dict, tdp_sentiment: Dict) -> Dict[str, Any]:
+        """Combine both parties' aggregates into the dashboard score payload"""
         # Convert compound score (-1 to 1) to 0-100 scale
         # Formula: (compound + 1) / 2 * 100, then weighted by positive%
-        ysrcp_score = self._calculate_party_score(ysrcp_sentiment)
-        tdp_score = self._calculate_party_score(tdp_sentiment)
+        ysrcp_score = self.party_score(ysrcp_sentiment)
+        tdp_score = self.party_score(tdp_sentiment)
 
-        result = {
+        return {
             "ysrcp": {
                 "score": ysrcp_score,
                 "sentiment": ysrcp_sentiment['distribution'],
@@ -192,11 +226,8 @@ class SentimentService:
             }
         }
 
-        sentiment_cache[cache_key] = result
-        return result
-
-    def _calculate_party_score(self, sentiment_data: Dict) -> int:
-        """Calculate a 0-100 score based on sentiment distribution"""
+    def party_score(self, sentiment_data: Dict) -> int:
+        """0-100 score from a sentiment aggregate's distribution (analyze_batch or window snapshot shape)"""
         pos = sentiment_data['distribution']['positive']
         neg = sentiment_data['distribution']['negative']
 
@@ -208,26 +239,27 @@ class SentimentService:
         return max(0, min(100, int(score)))
 
     def extract_key_phrases(self, texts: List[str], top_n: int = 15) -> List[Dict[str, Any]]:
-        """Extract key phrases/topics from texts using TextBlob"""
-        all_phrases = {}
-
+        """Extract key phrases/topics from texts (2-3 word phrases, cached per text)"""
+        all_phrases = Counter()
         for text in texts:
-            try:
-                blob = TextBlob(text)
-                # Extract noun phrases
-                for phrase in blob.noun_phrases:
-                    phrase_lower = phrase.lower()
-                    if len(phrase_lower) > 3:  # Filter short phrases
-                        all_phrases[phrase_lower] = all_phrases.get(phrase_lower, 0) + 1
-            except:
-                continue
-
-        # Sort by frequency
-        sorted_phrases = sorted(all_phrases.items(), key=lambda x: x[1], reverse=True)
+            if text:
+                all_phrases.update(phrase_cache.get(text))
+
+        return self._label_phrases(heapq.nlargest(top_n, all_phrases.items(), key=lambda x: x[1]))
+
+    def get_trending_phrases(self, top_n: int = 15) -> List[Dict[str, Any]]:
+        """Top key phrases across everything ingested, updated incrementally"""
+        return self._label_phrases(trending_phrases.top(top_n))
+
+    def _label_phrases(self, phrases: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+        """Attach a sentiment label to each (phrase, count), scoring all phrases in one batch"""
+        if not phrases:
+            return []
 
+        labels = label_sentiment(sentiment_engine.score([phrase for phrase, _ in phrases]).compound)
         return [
-            {"phrase": phrase, "count": count, "sentiment": self.analyze_text(phrase)['sentiment']}
-            for phrase, count in sorted_phrases[:top_n]
+            {"phrase": phrase, "count": count, "sentiment": str(label)}
+            for (phrase, count), label in zip(phrases, labels)
         ]
 
 
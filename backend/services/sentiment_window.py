@@ -0,0 +1,138 @@
+"""
+Sliding-Window Sentiment Aggregates
+Keeps running per-party sentiment totals over items ingested in the last SENTIMENT_WINDOW_HOURS
+- Items are added as they are ingested and evicted as they age out of the window
+- Reading a party's current score never walks the items it holds
+"""
+
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import SENTIMENT_WINDOW_HOURS
+from services.sentiment_engine import POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+
+HISTOGRAM_BINS = 10  # Equal-width bins over the compound range [-1, 1]
+
+ItemKey = Tuple[str, str]  # (party, item id)
+
+
+def _label(compound: float) -> str:
+    if compound >= POSITIVE_THRESHOLD:
+        return "positive"
+    if compound <= NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def _bin(compound: float) -> int:
+    return min(int((compound + 1) / 2 * HISTOGRAM_BINS), HISTOGRAM_BINS - 1)
+
+
+class PartyAggregate:
+    """Running label counts, compound sum and compound histogram for one party"""
+
+    def __init__(self):
+        self.counts = {"positive": 0, "negative": 0, "neutral": 0}
+        self.total = 0
+        self.compound_sum = 0.0
+        self.histogram = [0] * HISTOGRAM_BINS
+
+    def add(self, compound: float, sign: int = 1):
+        """Add an item's score (sign=-1 removes it)"""
+        self.counts[_label(compound)] += sign
+        self.total += sign
+        self.compound_sum += sign * compound
+        self.histogram[_bin(compound)] += sign
+
+    def merge(self, other: 'PartyAggregate'):
+        """Fold another aggregate's totals into this one"""
+        for label, count in other.counts.items():
+            self.counts[label] += count
+        self.total += other.total
+        self.compound_sum += other.compound_sum
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current aggregate in the same shape as SentimentService.analyze_batch"""
+        total = self.total
+        if total == 0:
+            return {
+                "overall": "neutral",
+                "distribution": {"positive": 33, "negative": 33, "neutral": 34},
+                "averageScore": 0,
+                "totalAnalyzed": 0,
+                "histogram": list(self.histogram)
+            }
+
+        avg_compound = self.compound_sum / total
+        return {
+            "overall": _label(avg_compound),
+            "distribution": {label: round((count / total) * 100) for label, count in self.counts.items()},
+            "averageScore": round(avg_compound, 3),
+            "totalAnalyzed": total,
+            "histogram": list(self.histogram)
+        }
+
+
+class SentimentWindow:
+    """Per-party sentiment aggregates over a sliding time window, keyed by (party, item id)"""
+
+    def __init__(self, window_hours: float = SENTIMENT_WINDOW_HOURS):
+        self.window_seconds = window_hours * 3600
+        self._lock = threading.Lock()
+        self._parties: Dict[str, PartyAggregate] = {}
+        self._items: Dict[ItemKey, Tuple[float, float]] = {}  # key -> (compound, timestamp)
+        self._expiry: List[Tuple[float, ItemKey]] = []        # min-heap of (timestamp, key)
+
+    def add(self, party: str, item_id: str, compound: float, timestamp: Optional[float] = None):
+        """
+        Ingest one scored item; re-ingesting an id replaces its previous score
+        Items already older than the window are ignored
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if timestamp < time.time() - self.window_seconds:
+                return
+
+            key = (party, item_id)
+            aggregate = self._parties.setdefault(party, PartyAggregate())
+            previous = self._items.get(key)
+            if previous == (compound, timestamp):
+                return
+            if previous is not None:
+                aggregate.add(previous[0], sign=-1)
+
+            self._items[key] = (compound, timestamp)
+            aggregate.add(compound)
+            heapq.heappush(self._expiry, (timestamp, key))
+            # Evict on ingestion too, so the window stays bounded even if nothing reads it
+            self._evict()
+
+    def _evict(self):
+        """Remove items that have aged out of the window (amortized over ingestion)"""
+        cutoff = time.time() - self.window_seconds
+        while self._expiry and self._expiry[0][0] < cutoff:
+            timestamp, key = heapq.heappop(self._expiry)
+            item = self._items.get(key)
+            # Heap entries for replaced items are stale - only evict the live one
+            if item is not None and item[1] == timestamp:
+                del self._items[key]
+                self._parties[key[0]].add(item[0], sign=-1)
+
+    def snapshot(self, party: str) -> Dict[str, Any]:
+        """Current sentiment aggregate for a party"""
+        with self._lock:
+            self._evict()
+            return self._parties.get(party, PartyAggregate()).snapshot()
+
+    def size(self) -> int:
+        """Number of items currently in the window"""
+        with self._lock:
+            self._evict()
+            return len(self._items)
+
+
+# Singleton instance
+sentiment_window = SentimentWindow()
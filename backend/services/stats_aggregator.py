@@ -13,10 +13,15 @@ from services.twitter_service import twitter_service
 from services.youtube_service import youtube_service
 from services.instagram_service import instagram_service
 from services.sentiment_service import sentiment_service
+from services.post_sentiment import post_sentiment
+from services.post_store import post_store
 
 # Cache for 15 minutes to ensure consistency within a session
 stats_cache = TTLCache(maxsize=50, ttl=900)
 
+# Scored social posts needed before post sentiment replaces the engagement-based estimate
+MIN_SCORED_POSTS = 20
+
 
 class StatsAggregator:
     """Aggregates real stats from all integrated platforms"""
@@ -96,7 +101,10 @@ class StatsAggregator:
         # Calculate totals
         total_followers = twitter_followers + facebook_followers
         total_engagement = twitter_engagement + instagram_engagement
-        total_posts = instagram_posts + 10  # Approximate daily posts
+        # Posts from the last day across every ingested platform, estimated until the store has any
+        total_posts = post_store.count(party=party, since=datetime.now() - timedelta(days=1))
+        if not total_posts:
+            total_posts = instagram_posts + 10  # Approximate daily posts
 
         # Estimate reach (typically 10-20% of followers see posts)
         total_reach = int(total_followers * 0.15)
@@ -119,13 +127,18 @@ class StatsAggregator:
 
     def _calculate_sentiment_score(self, party_data: Dict, party: str) -> int:
         """
-        Calculate sentiment score (0-100) based on engagement metrics
+        Calculate sentiment score (0-100)
 
-        Formula considers:
+        Uses the scored sentiment of the party's social posts when enough have been scored,
+        otherwise estimates it from engagement metrics:
         - Engagement rate (higher = more positive public response)
         - Follower growth trend
         - Platform performance comparison
         """
+        posts_sentiment = post_sentiment.party_snapshot(party)
+        if posts_sentiment['totalAnalyzed'] >= MIN_SCORED_POSTS:
+            return sentiment_service.party_score(posts_sentiment)
+
         # Base score starts at 50
         base_score = 50
 
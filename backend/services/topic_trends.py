@@ -0,0 +1,308 @@
+"""
+Trending Topic Detection
+Streams the words and word pairs of news articles and social posts into hourly count-min
+sketches, and reports the terms whose recent frequency spikes above their own baseline
+- Each hour is one fixed-size sketch in a ring, so memory is bounded however many terms arrive
+- Counts use conservative update (only the counters at a term's current minimum are raised), so
+  terms seen once or twice are not inflated into trends by collisions with frequent ones
+- A term's share of the items in the recent window is compared with its share in each
+  earlier window of the same length; the burst score is the z-score against that baseline
+- Heavy-hitter candidates are tracked separately (the sketch can count but not list terms),
+  pruned to the TOP_K most frequent recent terms whenever the set doubles
+- The ring is warmed from the article store at startup, so baselines exist before the first fetch
+- On an ordinary day nothing may clear the burst threshold; the terms most above their baseline
+  are then listed instead, flagged as not bursting
+
+Benchmark with: python -m services.topic_trends
+"""
+
+import math
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from config import TOPIC_MIN_COUNT, TOPIC_MIN_SCORE
+from models.post_record import PostRecord
+from services.article_store import ArticleStore, article_store
+from services.key_phrases import extract_phrases
+from services.news_clusters import story_text
+from services.post_store import PostKey, PostListener, post_store
+
+BUCKET_SECONDS = 3600        # One sketch per hour
+RECENT_BUCKETS = 6           # Recent window: the last 6 hours...
+BASELINE_WINDOWS = 8         # ...compared with the 8 windows of 6 hours before it
+RING_BUCKETS = RECENT_BUCKETS * (BASELINE_WINDOWS + 1)
+SKETCH_DEPTH = 4             # Count-min rows...
+SKETCH_WIDTH = 16384         # ...of 16384 counters, about one per term increment in a busy hour
+                             # (~750 items of ~20 terms); 54 hourly sketches take 14 MB
+TOP_K = 500                  # Candidate terms kept between prunes
+MIN_COUNT = TOPIC_MIN_COUNT  # Items in the recent window before a term can trend
+MIN_SCORE = TOPIC_MIN_SCORE  # Burst score before a term can trend (6 by default): among thousands of
+                             # everyday words, some spike by chance to a score of 4-5.5 every few hours
+FALLBACK_MIN_SCORE = 1.0     # Without a burst, listed terms must still be a deviation above their baseline
+OVERLAP_RATIO = 0.8          # A term sharing a word with a higher scoring topic needs 1/0.8 of its count
+MAX_SEEN_ITEMS = 50000       # Item keys remembered so re-fetched items are counted once
+
+_rng = np.random.default_rng(47)
+# Multiply-shift hash family, one function per sketch row (as in news_clusters)
+_A = _rng.integers(1, 2 ** 63, SKETCH_DEPTH, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, SKETCH_DEPTH, dtype=np.uint64)
+_WIDTH_SHIFT = np.uint64(64 - int(math.log2(SKETCH_WIDTH)))
+
+
+def topic_terms(text: str) -> Tuple[str, ...]:
+    """Distinct non-stopword words and word pairs of a text"""
+    return tuple(dict.fromkeys(extract_phrases(text, ngrams=(1, 2))))
+
+
+def _columns(hashes: np.ndarray) -> np.ndarray:
+    """Sketch column of each term hash in each row, shape (depth, terms)"""
+    with np.errstate(over='ignore'):
+        return ((hashes[None, :] * _A[:, None] + _B[:, None]) >> _WIDTH_SHIFT).astype(np.intp)
+
+
+class TopicTrends(PostListener):
+    """Burst detector over a stream of timestamped texts"""
+
+    def __init__(self, top_k: int = TOP_K, min_count: int = MIN_COUNT, min_score: float = MIN_SCORE):
+        self.top_k = top_k
+        self.min_count = min_count
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._sketches = np.zeros((RING_BUCKETS, SKETCH_DEPTH, SKETCH_WIDTH), dtype=np.uint32)
+        self._items = np.zeros(RING_BUCKETS, dtype=np.int64)        # Items counted per bucket
+        self._bucket_ids = np.full(RING_BUCKETS, -1, dtype=np.int64)  # Hour held by each ring slot
+        self._candidates: Dict[str, int] = {}                         # term -> hash
+        self._seen: LRUCache = LRUCache(maxsize=MAX_SEEN_ITEMS)
+
+    def add(self, items: Iterable[Tuple[str, str, Optional[float]]], now: Optional[float] = None) -> int:
+        """
+        Count the terms of (key, text, timestamp) items not already counted
+        Items without a timestamp count as now; items older than the ring are skipped
+        Returns the number of items counted
+        """
+        now = now if now is not None else time.time()
+        current = int(now // BUCKET_SECONDS)
+        slots, hashes, counted = [], [], 0
+
+        with self._lock:
+            for key, text, ts in items:
+                if key in self._seen:
+                    continue
+                self._seen[key] = True
+                bucket = min(int((ts if ts is not None else now) // BUCKET_SECONDS), current)
+                slot = self._slot(bucket, current)
+                if slot is None:
+                    continue
+                counted += 1
+                self._items[slot] += 1
+                for term in topic_terms(text):
+                    term_hash = self._candidates.get(term)
+                    if term_hash is None:
+                        term_hash = zlib.crc32(term.encode("utf-8"))
+                        self._candidates[term] = term_hash
+                    slots.append(slot)
+                    hashes.append(term_hash)
+
+            if hashes:
+                self._increment(np.array(slots, dtype=np.uint64), np.array(hashes, dtype=np.uint64))
+            if len(self._candidates) > 2 * self.top_k:
+                self._prune(current)
+        return counted
+
+    def _increment(self, slots: np.ndarray, hashes: np.ndarray):
+        """
+        Conservative update: each distinct (slot, term) raises its counters only up to its current
+        estimate plus its count in the batch, never past what it needs
+        """
+        pairs, counts = np.unique((slots << np.uint64(32)) | hashes, return_counts=True)
+        pair_slots = (pairs >> np.uint64(32)).astype(np.intp)
+        columns = _columns(pairs & np.uint64(0xFFFFFFFF))
+        rows = np.broadcast_to(np.arange(SKETCH_DEPTH)[:, None], columns.shape)
+        pair_slots = np.broadcast_to(pair_slots, columns.shape)
+        targets = self._sketches[pair_slots, rows, columns].min(axis=0) + counts.astype(np.uint32)
+        np.maximum.at(self._sketches, (pair_slots, rows, columns), np.broadcast_to(targets, columns.shape))
+
+    def warm(self, store: ArticleStore = article_store, now: Optional[float] = None) -> int:
+        """
+        Count the stored articles and posts published within the ring, so recent terms are compared
+        with a baseline from the start instead of trending on their raw counts
+        Returns the number of items counted
+        """
+        now = now if now is not None else time.time()
+        since = (int(now // BUCKET_SECONDS) - RING_BUCKETS + 1) * BUCKET_SECONDS
+        articles = store.articles_since(since)
+        posts = store.posts_since(since)
+        return (self.add(((key, story_text({'title': title, 'description': description}), published)
+                          for key, title, description, published in articles), now=now) +
+                self.add(posts, now=now))
+
+    def posts_added(self, records: List[PostRecord]):
+        self.add((f"{r.platform}:{r.id}", r.text, r.timestamp.timestamp() if r.timestamp else None)
+                 for r in records)
+
+    def posts_removed(self, keys: List[PostKey]):
+        """Counts age out with their hourly buckets, not with the post store"""
+
+    def _slot(self, bucket: int, current: int) -> Optional[int]:
+        """Ring slot for an hour, reset if it still holds an older hour (None if the hour has left the ring)"""
+        if bucket <= current - RING_BUCKETS:
+            return None
+        slot = bucket % RING_BUCKETS
+        if self._bucket_ids[slot] != bucket:
+            if self._bucket_ids[slot] > bucket:
+                return None
+            self._sketches[slot] = 0
+            self._items[slot] = 0
+            self._bucket_ids[slot] = bucket
+        return slot
+
+    def _window_counts(self, hashes: np.ndarray, current: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Estimated term counts and item totals per window, oldest window first
+        Shapes (BASELINE_WINDOWS + 1, terms) and (BASELINE_WINDOWS + 1,); the last window is the recent one
+        """
+        order = np.arange(current - RING_BUCKETS + 1, current + 1)
+        slots = order % RING_BUCKETS
+        valid = self._bucket_ids[slots] == order
+
+        columns = _columns(hashes)
+        rows = np.arange(SKETCH_DEPTH)[:, None]
+        counts = self._sketches[slots[:, None, None], rows[None], columns[None]].min(axis=1).astype(np.float64)
+        counts[~valid] = 0
+        items = np.where(valid, self._items[slots], 0).astype(np.float64)
+
+        windows = BASELINE_WINDOWS + 1
+        return (counts.reshape(windows, RECENT_BUCKETS, -1).sum(axis=1),
+                items.reshape(windows, RECENT_BUCKETS).sum(axis=1))
+
+    def _prune(self, current: int):
+        """Keep the TOP_K candidates most frequent in the recent window"""
+        terms = list(self._candidates)
+        hashes = np.fromiter(self._candidates.values(), dtype=np.uint64, count=len(terms))
+        recent = self._window_counts(hashes, current)[0][-1]
+        keep = np.argsort(-recent, kind="stable")[:self.top_k]
+        self._candidates = {terms[i]: self._candidates[terms[i]] for i in keep}
+
+    def top(self, n: int = 10, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Terms spiking in the recent window as {"topic", "count", "score", "burst"}, highest burst score first
+        count is the number of recent items mentioning the term, score its z-score against the baseline;
+        burst is False for the fallback list returned when no term clears min_score
+        """
+        now = now if now is not None else time.time()
+        current = int(now // BUCKET_SECONDS)
+        with self._lock:
+            if not self._candidates:
+                return []
+            terms = list(self._candidates)
+            hashes = np.fromiter(self._candidates.values(), dtype=np.uint64, count=len(terms))
+            counts, items = self._window_counts(hashes, current)
+
+        recent, recent_items = counts[-1], items[-1]
+        baseline = items[:-1] > 0
+        if baseline.any():
+            # Share of each baseline window's items mentioning the term, scaled to the recent volume
+            rates = counts[:-1][baseline] / items[:-1][baseline][:, None]
+            expected = rates.mean(axis=0) * recent_items
+            spread = rates.std(axis=0) * recent_items
+        else:
+            expected = spread = np.zeros(len(terms))
+        # Poisson noise on the expected count keeps rare terms from scoring off a near-zero spread
+        scores = (recent - expected) / np.sqrt(spread ** 2 + expected + 1)
+
+        # Highest score first, then most mentioned, then pairs before single words
+        lengths = np.fromiter((term.count(" ") for term in terms), dtype=np.int64, count=len(terms))
+        order = np.lexsort((-lengths, -recent, -scores))
+        topics = self._select(order, terms, recent, scores, n, self.min_score)
+        if not topics:
+            # Nothing is bursting (an ordinary hour): list the terms most above their baseline instead
+            topics = self._select(order, terms, recent, scores, n, min(FALLBACK_MIN_SCORE, self.min_score))
+        return topics
+
+    def _select(self, order: np.ndarray, terms: List[str], recent: np.ndarray, scores: np.ndarray,
+                n: int, min_score: float) -> List[Dict[str, Any]]:
+        """Up to n topics in the given order, scoring at least min_score and mentioned min_count times"""
+        topics: List[Dict[str, Any]] = []
+        for i in order:
+            if len(topics) >= n or scores[i] < min_score:
+                break
+            if recent[i] < self.min_count:
+                continue
+            # A word and a pair containing it usually spike together; keep the higher scoring one
+            # unless the other is mentioned clearly more often on its own
+            words = set(terms[i].split())
+            if any(words & set(t["topic"].split()) and t["count"] >= OVERLAP_RATIO * recent[i] for t in topics):
+                continue
+            topics.append({"topic": terms[i], "count": int(recent[i]), "score": round(float(scores[i]), 2),
+                           "burst": bool(scores[i] >= self.min_score)})
+        return topics
+
+    def size(self) -> int:
+        """Candidate terms currently tracked"""
+        with self._lock:
+            return len(self._candidates)
+
+
+# Singleton instance, fed by the news service and the post store
+topic_trends = TopicTrends()
+post_store.subscribe(topic_trends)
+
+
+def _synthetic_items(count: int, now: float, seed: int = 47, burst: bool = True) -> List[Tuple[str, str, float]]:
+    """
+    (key, text, timestamp) items spread over the ring: everyday topics with random filler words,
+    plus (with burst) a "Polavaram flood relief" story that only appears in the last 4 hours
+    """
+    import random
+
+    rng = random.Random(seed)
+    subjects = ["YS Jagan", "Chandrababu Naidu", "Pawan Kalyan", "Nara Lokesh", "YSRCP", "TDP", "AP govt"]
+    actions = ["slams", "praises", "announces", "reviews", "launches", "questions", "defends"]
+    topics = ["welfare scheme", "Amaravati capital", "liquor policy", "farm loans", "mega DSC",
+              "sand policy", "pension hike", "Visakhapatnam steel plant", "volunteer system"]
+    filler = [f"w{i}" for i in range(5000)]
+
+    start_ts = now - RING_BUCKETS * BUCKET_SECONDS
+    items = []
+    for i in range(count):
+        ts = start_ts + rng.random() * RING_BUCKETS * BUCKET_SECONDS
+        topic = rng.choice(topics)
+        # Polavaram floods: a story that only appears in the last few hours
+        if burst and ts > now - 4 * BUCKET_SECONDS and rng.random() < 0.15:
+            topic = "Polavaram flood relief"
+        text = f"{rng.choice(subjects)} {rng.choice(actions)} {topic} {' '.join(rng.sample(filler, 4))}"
+        items.append((f"item{i}", text, ts))
+    return items
+
+
+def _benchmark():
+    now = time.time()
+    items = _synthetic_items(40000, now)
+
+    trends = TopicTrends()
+    start = time.perf_counter()
+    for i in range(0, len(items), 500):
+        trends.add(items[i:i + 500], now=now)
+    add_rate = len(items) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    top = trends.top(10, now=now)
+    top_ms = (time.perf_counter() - start) * 1000
+
+    memory = trends._sketches.nbytes + trends._items.nbytes + trends._bucket_ids.nbytes
+    print(f"{len(items):,} items: {add_rate:,.0f} items/s, top() in {top_ms:.1f} ms, "
+          f"{trends.size()} candidates, sketches {memory / 2 ** 20:.1f} MB")
+    for topic in top:
+        print(f"  {topic['topic']:<28} count {topic['count']:>5}   score {topic['score']:>6}")
+    assert top and ("polavaram" in top[0]["topic"] or "flood" in top[0]["topic"])
+    # Filler words and pairs are noise: none of them may trend
+    assert not [t for t in top if set(t["topic"].split()) - {"polavaram", "flood", "relief"}], top
+
+
+if __name__ == "__main__":
+    _benchmark()
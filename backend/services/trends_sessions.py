@@ -0,0 +1,103 @@
+"""
+Google Trends Session Pool
+Independent pytrends clients checked out one request at a time
+- A TrendReq keeps the widgets of the payload it last built, so a session is never shared by two callers
+- Each session has its own Google cookies and its own backoff: a 429 on one session delays
+  only that session, and checkouts prefer sessions that are not backing off
+- A semaphore caps the sessions in use at once, so parallel callers can't flood Google
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from pytrends.request import TrendReq
+
+from config import TRENDS_SESSIONS, TRENDS_MAX_CONCURRENCY
+
+BACKOFF_BASE_SECONDS = 1.0    # Delay after a session's first failure, doubling per consecutive failure
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TrendsSession:
+    """One pytrends client and its backoff state"""
+
+    def __init__(self):
+        self.client = TrendReq(hl='en-IN', tz=330)  # India timezone
+        self.failures = 0
+        self.backoff_until = 0.0
+
+    def record_success(self):
+        self.failures = 0
+        self.backoff_until = 0.0
+
+    def record_failure(self):
+        """Back off exponentially from this session's consecutive failures"""
+        self.failures += 1
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** (self.failures - 1), BACKOFF_MAX_SECONDS)
+        self.backoff_until = time.monotonic() + delay
+
+    def wait_backoff(self):
+        """Sleep until the session's backoff has passed"""
+        delay = self.backoff_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TrendsSessionPool:
+    """Lazily created pytrends sessions with a limit on how many are checked out at once"""
+
+    def __init__(self, size: int = TRENDS_SESSIONS, max_concurrency: int = TRENDS_MAX_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        # Every checkout must find a session, so the pool is at least as large as the limit
+        self.size = max(size, self.max_concurrency)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._idle: List[TrendsSession] = []
+        self._created = 0
+
+    @contextmanager
+    def checkout(self) -> Iterator[TrendsSession]:
+        """
+        Exclusive use of a session, waiting for a free slot and for the session's backoff
+        The least recently failed idle session is used; a new one is created while the pool isn't full
+        """
+        with self._semaphore:
+            session = self._acquire()
+            try:
+                session.wait_backoff()
+                yield session
+            finally:
+                with self._lock:
+                    self._idle.append(session)
+
+    def _acquire(self) -> TrendsSession:
+        with self._lock:
+            now = time.monotonic()
+            ready = [s for s in self._idle if s.backoff_until <= now]
+            if ready or self._created >= self.size:
+                session = min(ready or self._idle, key=lambda s: s.backoff_until)
+                self._idle.remove(session)
+                return session
+            self._created += 1
+
+        # A new session fetches its own cookies, outside the lock
+        try:
+            return TrendsSession()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": self._created,
+                "idle": len(self._idle),
+                "backingOff": sum(1 for s in self._idle if s.backoff_until > time.monotonic())
+            }
+
+
+# Singleton instance
+trends_sessions = TrendsSessionPool()
@@ -8,16 +8,15 @@ import urllib.request
 import urllib.parse
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from models.post_record import PostRecord, freeze, thaw, rank
+from services.post_store import post_store
+from services.keywords import party_keywords
 
 # RapidAPI Configuration
 RAPIDAPI_KEY = os.getenv('RAPIDAPI_KEY', '922556e08bmsh465b2b5025c11a5p176967jsn3ca78cdb094c')
 RAPIDAPI_HOST = 'twitter241.p.rapidapi.com'
 
-# Search keywords
-YSRCP_KEYWORDS = ['YSRCP', 'YS Jagan', 'Jagan Mohan Reddy']
-TDP_KEYWORDS = ['TDP', 'Chandrababu Naidu', 'Chandrababu']
-
 # Official Twitter handles for stats
 TWITTER_HANDLES = {
     'ysrcp': {
@@ -58,8 +57,8 @@ class TwitterService:
             print(f"Twitter API error: {e}")
             return None
 
-    def _parse_tweet(self, tweet_data: Dict, party: str = 'unknown') -> Optional[Dict]:
-        """Parse a tweet from the API response"""
+    def _parse_tweet(self, tweet_data: Dict, party: str = 'unknown') -> Optional[PostRecord]:
+        """Parse a tweet from the API response into an immutable record"""
         try:
             # Handle different tweet structures
             result = tweet_data.get('tweet_results', {}).get('result', {})
@@ -134,32 +133,64 @@ class TwitterService:
                     timestamp = datetime.now()
 
             # Determine party affiliation from content
-            text_lower = text.lower()
-            if any(kw.lower() in text_lower for kw in YSRCP_KEYWORDS):
+            matches = party_keywords.match(text)
+            if matches.has('ysrcp'):
                 party = 'ysrcp'
-            elif any(kw.lower() in text_lower for kw in TDP_KEYWORDS):
+            elif matches.has('tdp'):
                 party = 'tdp'
             else:
                 party = 'general'
 
-            return {
-                'id': tweet_id,
-                'text': text,
-                'user': user,
-                'engagement': engagement,
-                'media': media,
-                'hasMedia': len(media) > 0,
-                'hasVideo': any(m['type'] == 'video' for m in media),
-                'timestamp': timestamp.isoformat() if timestamp else None,
-                'timeAgo': self._get_time_ago(timestamp) if timestamp else '',
-                'url': f"https://twitter.com/{user['handle']}/status/{tweet_id}",
-                'party': party,
-                'lang': legacy.get('lang', 'en')
-            }
+            return PostRecord(
+                id=tweet_id,
+                platform='twitter',
+                party=party,
+                text=text,
+                author=user['handle'],
+                timestamp=timestamp,
+                likes=engagement['likes'],
+                comments=engagement['replies'],
+                shares=engagement['retweets'],
+                views=engagement['views'],
+                engagement=engagement['likes'] + engagement['retweets'],
+                url=f"https://twitter.com/{user['handle']}/status/{tweet_id}",
+                thumbnail=media[0]['thumbnail'] if media else '',
+                media_type=media[0]['type'] if media else 'text',
+                extra=freeze({
+                    'user': user,
+                    'quotes': engagement['quotes'],
+                    'media': media,
+                    'lang': legacy.get('lang', 'en')
+                })
+            )
         except Exception as e:
             print(f"Error parsing tweet: {e}")
             return None
 
+    def _serialize_tweet(self, tweet: PostRecord) -> Dict:
+        """Build the API/display representation of a tweet record"""
+        media = thaw(tweet.extra['media'])
+        return {
+            'id': tweet.id,
+            'text': tweet.text,
+            'user': thaw(tweet.extra['user']),
+            'engagement': {
+                'likes': tweet.likes,
+                'retweets': tweet.shares,
+                'replies': tweet.comments,
+                'quotes': tweet.extra['quotes'],
+                'views': tweet.views
+            },
+            'media': media,
+            'hasMedia': len(media) > 0,
+            'hasVideo': any(m['type'] == 'video' for m in media),
+            'timestamp': tweet.timestamp.isoformat() if tweet.timestamp else None,
+            'timeAgo': self._get_time_ago(tweet.timestamp) if tweet.timestamp else '',
+            'url': tweet.url,
+            'party': tweet.party,
+            'lang': tweet.extra['lang']
+        }
+
     def _get_time_ago(self, timestamp: datetime) -> str:
         """Get human-readable time ago string"""
         now = datetime.now(timestamp.tzinfo) if timestamp.tzinfo else datetime.now()
@@ -177,6 +208,10 @@ class TwitterService:
 
     def search_tweets(self, query: str, count: int = 20, search_type: str = 'Latest') -> List[Dict]:
         """Search for tweets by query"""
+        return [self._serialize_tweet(t) for t in self._search_records(query, count, search_type)]
+
+    def _search_records(self, query: str, count: int = 20, search_type: str = 'Latest') -> Tuple[PostRecord, ...]:
+        """Search for tweets by query, returning cached immutable records"""
         cache_key = f"search_{query}_{count}_{search_type}"
 
         # Check cache
@@ -193,7 +228,7 @@ class TwitterService:
 
         response = self._make_request('search', params)
         if not response:
-            return []
+            return ()
 
         tweets = []
         try:
@@ -213,6 +248,8 @@ class TwitterService:
             print(f"Error parsing search results: {e}")
 
         # Cache results
+        tweets = tuple(tweets)
+        post_store.add_many(tweets)
         self.cache[cache_key] = (tweets, datetime.now())
         return tweets
 
@@ -228,27 +265,22 @@ class TwitterService:
 
         try:
             # Fetch YSRCP tweets
+            ysrcp_tweets = ()
             if party in ['all', 'ysrcp']:
-                ysrcp_tweets = self.search_tweets('YSRCP', count=25)
-                result['ysrcp']['tweets'] = ysrcp_tweets[:20]
-                result['ysrcp']['totalEngagement'] = sum(
-                    t['engagement']['likes'] + t['engagement']['retweets']
-                    for t in ysrcp_tweets
-                )
+                ysrcp_tweets = self._search_records('YSRCP', count=25)
+                result['ysrcp']['tweets'] = [self._serialize_tweet(t) for t in ysrcp_tweets[:20]]
+                result['ysrcp']['totalEngagement'] = sum(t.engagement for t in ysrcp_tweets)
 
             # Fetch TDP tweets
+            tdp_tweets = ()
             if party in ['all', 'tdp']:
-                tdp_tweets = self.search_tweets('TDP Chandrababu', count=25)
-                result['tdp']['tweets'] = tdp_tweets[:20]
-                result['tdp']['totalEngagement'] = sum(
-                    t['engagement']['likes'] + t['engagement']['retweets']
-                    for t in tdp_tweets
-                )
-
-            # Combine and sort by engagement
-            all_tweets = result['ysrcp']['tweets'] + result['tdp']['tweets']
-            all_tweets.sort(key=lambda x: x['engagement']['likes'] + x['engagement']['retweets'], reverse=True)
-            result['combined'] = all_tweets[:40]
+                tdp_tweets = self._search_records('TDP Chandrababu', count=25)
+                result['tdp']['tweets'] = [self._serialize_tweet(t) for t in tdp_tweets[:20]]
+                result['tdp']['totalEngagement'] = sum(t.engagement for t in tdp_tweets)
+
+            # Combine and rank by engagement
+            all_tweets = ysrcp_tweets[:20] + tdp_tweets[:20]
+            result['combined'] = [self._serialize_tweet(t) for t in rank(all_tweets, 40)]
 
         except Exception as e:
             print(f"Error fetching trending tweets: {e}")
@@ -268,20 +300,19 @@ class TwitterService:
                 return cached_data
 
         # Fetch recent tweets for both parties
-        ysrcp_tweets = self.search_tweets('YSRCP', count=50)
-        tdp_tweets = self.search_tweets('TDP Chandrababu', count=50)
+        ysrcp_tweets = self._search_records('YSRCP', count=50)
+        tdp_tweets = self._search_records('TDP Chandrababu', count=50)
 
         all_tweets = ysrcp_tweets + tdp_tweets
 
         # Extract hashtags with sentiment tracking
         hashtag_counts = {}
         for tweet in all_tweets:
-            text = tweet.get('text', '')
+            text = tweet.text
+            is_negative = party_keywords.match(text).has('negative')
             words = text.split()
-            party = tweet.get('party', 'general')
-            engagement = tweet.get('engagement', {})
-            likes = engagement.get('likes', 0)
-            retweets = engagement.get('retweets', 0)
+            likes = tweet.likes
+            retweets = tweet.shares
 
             for word in words:
                 if word.startswith('#') and len(word) > 1:
@@ -291,14 +322,11 @@ class TwitterService:
 
                     if tag_lower not in hashtag_counts:
                         # Determine party from hashtag content itself
-                        ysrcp_tags = ['ysrcp', 'ysjagan', 'jagan', 'jagananna', 'jaganmohan', 'ysrcongress']
-                        tdp_tags = ['tdp', 'chandrababu', 'naidu', 'lokesh', 'naralokesh', 'telugudesam']
-
                         tag_party = 'general'
-                        tag_clean_lower = tag_lower.replace('#', '')
-                        if any(yt in tag_clean_lower for yt in ysrcp_tags):
+                        tag_matches = party_keywords.match(tag_lower.replace('#', ''))
+                        if tag_matches.has('ysrcp_tag'):
                             tag_party = 'ysrcp'
-                        elif any(tt in tag_clean_lower for tt in tdp_tags):
+                        elif tag_matches.has('tdp_tag'):
                             tag_party = 'tdp'
 
                         hashtag_counts[tag_lower] = {
@@ -318,9 +346,7 @@ class TwitterService:
                         hashtag_counts[tag_lower]['positive_engagement'] += 1
 
                     # Check for negative keywords in tweet text
-                    negative_words = ['fail', 'scam', 'corrupt', 'arrest', 'against', 'protest', 'fraud']
-                    text_lower = text.lower()
-                    if any(neg in text_lower for neg in negative_words):
+                    if is_negative:
                         hashtag_counts[tag_lower]['negative_keywords'] += 1
 
         # Process and add sentiment
@@ -455,17 +481,11 @@ class TwitterService:
                 })
 
             # Calculate engagement from recent tweets
-            ysrcp_tweets = self.search_tweets('YSRCP', count=20)
-            tdp_tweets = self.search_tweets('TDP Chandrababu', count=20)
+            ysrcp_tweets = self._search_records('YSRCP', count=20)
+            tdp_tweets = self._search_records('TDP Chandrababu', count=20)
 
-            result['ysrcp']['engagement'] = sum(
-                t['engagement']['likes'] + t['engagement']['retweets']
-                for t in ysrcp_tweets
-            )
-            result['tdp']['engagement'] = sum(
-                t['engagement']['likes'] + t['engagement']['retweets']
-                for t in tdp_tweets
-            )
+            result['ysrcp']['engagement'] = sum(t.engagement for t in ysrcp_tweets)
+            result['tdp']['engagement'] = sum(t.engagement for t in tdp_tweets)
 
         except Exception as e:
             print(f"Error fetching party stats: {e}")
@@ -499,15 +519,15 @@ class TwitterService:
 
         try:
             # Fetch tweets from both parties
-            ysrcp_tweets = self.search_tweets('YSRCP', count=50)
-            tdp_tweets = self.search_tweets('TDP Chandrababu', count=50)
+            ysrcp_tweets = self._search_records('YSRCP', count=50)
+            tdp_tweets = self._search_records('TDP Chandrababu', count=50)
 
             all_tweets = ysrcp_tweets + tdp_tweets
 
             # Extract unique users with their stats
             users = {}
             for tweet in all_tweets:
-                user = tweet.get('user', {})
+                user = tweet.extra['user']
                 user_id = user.get('id', '')
                 if not user_id:
                     continue
@@ -528,10 +548,10 @@ class TwitterService:
                     }
 
                 users[user_id]['recentMentions'] += 1
-                users[user_id]['engagement'] += tweet['engagement']['likes'] + tweet['engagement']['retweets']
+                users[user_id]['engagement'] += tweet.engagement
 
                 # Track party mentions
-                party = tweet.get('party', 'general')
+                party = tweet.party
                 if party == 'ysrcp':
                     users[user_id]['ysrcpMentions'] += 1
                 elif party == 'tdp':
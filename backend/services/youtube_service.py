@@ -5,10 +5,12 @@ Fetches trending videos related to YSRCP and TDP from YouTube using RapidAPI
 
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import urllib.request
 import urllib.parse
 import json
+from models.post_record import PostRecord, freeze, rank
+from services.post_store import post_store
 
 # RapidAPI Configuration
 RAPIDAPI_KEY = os.getenv('RAPIDAPI_KEY', '922556e08bmsh465b2b5025c11a5p176967jsn3ca78cdb094c')
@@ -129,20 +131,14 @@ class YouTubeService:
     def get_trending_videos(self, party: str = 'all') -> Dict[str, Any]:
         """Get trending videos for YSRCP, TDP, or both"""
 
-        # Check cache
+        # Check cache - records are cached and serialized on every read
         cache_key = f"trending_{party}"
         if cache_key in self.cache:
             cached_data, cached_time = self.cache[cache_key]
             if datetime.now() - cached_time < self.cache_duration:
-                return cached_data
+                return self._build_trending_result(cached_data, cached_time)
 
-        result = {
-            'ysrcp': {'videos': [], 'totalViews': 0},
-            'tdp': {'videos': [], 'totalViews': 0},
-            'general': {'videos': [], 'totalViews': 0},
-            'lastUpdated': datetime.now().isoformat(),
-            'isLive': False
-        }
+        videos_by_party = {}
 
         try:
             # Search for YSRCP videos - prioritize official channel
@@ -153,7 +149,7 @@ class YouTubeService:
                 # Then add keyword searches
                 for keyword in YSRCP_KEYWORDS[:2]:
                     ysrcp_videos.extend(self._search_videos(keyword, 8))
-                result['ysrcp'] = self._process_videos(ysrcp_videos, 'ysrcp')
+                videos_by_party['ysrcp'] = self._process_videos(ysrcp_videos, 'ysrcp')
 
             # Search for TDP videos - prioritize official channel
             if party in ['all', 'tdp']:
@@ -163,37 +159,57 @@ class YouTubeService:
                 # Then add keyword searches
                 for keyword in TDP_KEYWORDS[:2]:
                     tdp_videos.extend(self._search_videos(keyword, 8))
-                result['tdp'] = self._process_videos(tdp_videos, 'tdp')
+                videos_by_party['tdp'] = self._process_videos(tdp_videos, 'tdp')
 
             # Search for general AP politics
             if party == 'all':
                 general_videos = self._search_videos('Andhra Pradesh politics news', 5)
-                result['general'] = self._process_videos(general_videos, 'general')
+                videos_by_party['general'] = self._process_videos(general_videos, 'general')
 
             # Check if we got any videos - if not, return fallback
-            has_videos = (
-                len(result['ysrcp'].get('videos', [])) > 0 or
-                len(result['tdp'].get('videos', [])) > 0
-            )
+            has_videos = bool(videos_by_party.get('ysrcp')) or bool(videos_by_party.get('tdp'))
 
             if not has_videos:
                 print("YouTube API returned no videos, using fallback data")
                 return self._get_fallback_data()
 
-            result['isLive'] = True
-            # Cache the result
-            self.cache[cache_key] = (result, datetime.now())
+            # Cache the records
+            fetched_at = datetime.now()
+            self.cache[cache_key] = (videos_by_party, fetched_at)
 
         except Exception as e:
             print(f"Error fetching YouTube data: {e}")
             return self._get_fallback_data()
 
+        return self._build_trending_result(videos_by_party, fetched_at)
+
+    def _build_trending_result(self, videos_by_party: Dict[str, Tuple[PostRecord, ...]],
+                               fetched_at: datetime) -> Dict[str, Any]:
+        """Serialize cached video records into the trending response"""
+        result = {
+            'ysrcp': {'videos': [], 'totalViews': 0},
+            'tdp': {'videos': [], 'totalViews': 0},
+            'general': {'videos': [], 'totalViews': 0},
+            'lastUpdated': fetched_at.isoformat(),
+            'isLive': True
+        }
+
+        for party, videos in videos_by_party.items():
+            if not videos:
+                continue
+            total_views = sum(v.views for v in videos)
+            result[party] = {
+                'videos': [self._serialize_video(v) for v in videos],
+                'totalViews': total_views,
+                'totalViewsFormatted': self._format_count(total_views)
+            }
+
         return result
 
-    def _process_videos(self, videos: List[Dict], party: str) -> Dict:
-        """Process video search results from RapidAPI"""
+    def _process_videos(self, videos: List[Dict], party: str) -> Tuple[PostRecord, ...]:
+        """Parse video search results from RapidAPI into records ranked by views"""
         if not videos:
-            return {'videos': [], 'totalViews': 0}
+            return ()
 
         # Remove duplicates
         seen_ids = set()
@@ -205,7 +221,6 @@ class YouTubeService:
                 unique_videos.append(v)
 
         processed = []
-        total_views = 0
 
         for video in unique_videos[:20]:
             vid_id = video.get('videoId', '')
@@ -231,7 +246,6 @@ class YouTubeService:
             else:
                 view_text = '0'
             views = self._parse_view_count(str(view_text))
-            total_views += views
 
             # Check if live
             is_live = video.get('isLiveNow', False)
@@ -257,33 +271,52 @@ class YouTubeService:
             # Get published time
             published = video.get('publishedTimeText', '')
 
-            processed.append({
-                'id': vid_id,
-                'title': title,
-                'channel': channel,
-                'channelId': channel_id,
-                'thumbnail': thumbnail,
-                'publishedAt': published,
-                'timeAgo': published,
-                'views': views,
-                'viewsFormatted': self._format_count(views) if views > 0 else ('LIVE' if is_live else '0'),
-                'likes': 0,  # Not available in search results
-                'likesFormatted': '0',
-                'comments': 0,
-                'commentsFormatted': '0',
-                'duration': duration,
-                'url': f"https://www.youtube.com/watch?v={vid_id}",
-                'party': party,
-                'isLive': is_live
-            })
-
-        # Sort by views (live videos will have lower view count but still show)
-        processed.sort(key=lambda x: x['views'], reverse=True)
-
+            processed.append(PostRecord(
+                id=vid_id,
+                platform='youtube',
+                party=party,
+                text=title,
+                author=channel,
+                timestamp=None,  # Search results only carry relative times like "2 days ago"
+                views=views,
+                engagement=views,
+                url=f"https://www.youtube.com/watch?v={vid_id}",
+                thumbnail=thumbnail,
+                media_type='video',
+                extra=freeze({
+                    'channelId': channel_id,
+                    'publishedAt': published,
+                    'duration': duration,
+                    'isLive': is_live
+                })
+            ))
+
+        post_store.add_many(processed)
+
+        # Rank by views (live videos will have lower view count but still show)
+        return tuple(rank(processed))
+
+    def _serialize_video(self, video: PostRecord) -> Dict:
+        """Build the API/display representation of a video record"""
+        is_live = video.extra['isLive']
         return {
-            'videos': processed,
-            'totalViews': total_views,
-            'totalViewsFormatted': self._format_count(total_views)
+            'id': video.id,
+            'title': video.text,
+            'channel': video.author,
+            'channelId': video.extra['channelId'],
+            'thumbnail': video.thumbnail,
+            'publishedAt': video.extra['publishedAt'],
+            'timeAgo': video.extra['publishedAt'],
+            'views': video.views,
+            'viewsFormatted': self._format_count(video.views) if video.views > 0 else ('LIVE' if is_live else '0'),
+            'likes': 0,  # Not available in search results
+            'likesFormatted': '0',
+            'comments': 0,
+            'commentsFormatted': '0',
+            'duration': video.extra['duration'],
+            'url': video.url,
+            'party': video.party,
+            'isLive': is_live
         }
 
     def _get_fallback_data(self) -> Dict[str, Any]:
@@ -0,0 +1,11 @@
+"""
+Shared test setup: import the backend packages from the backend directory, and keep
+anything the services persist (article database, caches) out of backend/data
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="dashboard-tests-"))
@@ -0,0 +1,110 @@
+"""Article store: article windows, background post writes and full-text search"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from models.post_record import PostRecord
+from services.article_store import ArticleStore, fts_query
+
+
+@pytest.fixture
+def store():
+    return ArticleStore(":memory:")
+
+
+def article(title, source="The Hindu", description=""):
+    return {"title": title, "link": f"https://example.com/{title}", "source": source, "description": description}
+
+
+def post(post_id, text, platform="twitter", party="ysrcp", engagement=0):
+    return PostRecord(id=post_id, platform=platform, party=party, text=text, author="@ap_news",
+                      timestamp=datetime.now(), engagement=engagement)
+
+
+def test_ingest_and_windows(store):
+    now = time.time()
+    assert store.ingest("ysrcp", [
+        ("a", "s1", article("Jagan slams TDP"), now - 3600),
+        ("b", "s1", article("Jagan slams TDP govt", "NDTV"), now - 1800),
+        ("c", "s2", article("YSRCP rally in Guntur"), now - 86400 * 3),
+    ]) == 3
+    assert store.ingest("ysrcp", [("a", "s1", article("Jagan slams TDP"), now - 3600)]) == 0
+    assert store.mention_count("ysrcp", since=now - 86400) == 1  # Two copies of one story
+    assert store.mention_count("ysrcp") == 2
+    assert store.sources("ysrcp", since=now - 86400) == ["NDTV", "The Hindu"]
+
+
+def test_posts_are_written_in_the_background(store):
+    store.posts_added([post("1", "Polavaram flood relief reaches farmers"), post("2", "Amaravati capital works")])
+    store.flush()
+    assert [r["id"] for r in store.search("polavaram")] == ["1"]
+
+    # Known posts are refreshed, not duplicated
+    store.posts_added([post("1", "Amaravati farmers protest", engagement=5)])
+    store.flush()
+    assert {r["id"] for r in store.search("amaravati")} == {"1", "2"}
+    assert store.search("polavaram") == []
+
+
+def test_writer_survives_errors(store, monkeypatch, capsys):
+    write_posts = store._write_posts
+    calls = []
+
+    def failing_once(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        write_posts(rows)
+
+    monkeypatch.setattr(store, "_write_posts", failing_once)
+    store.posts_added([post("1", "lost post")])
+    store.flush()
+    store.posts_added([post("2", "sand policy debate")])
+    store.flush()
+    assert "disk full" in capsys.readouterr().out
+    assert [r["id"] for r in store.search("sand")] == ["2"]
+
+
+def test_search_ranks_each_index_relative_to_its_best_match(store):
+    now = time.time()
+    store.ingest("ysrcp", [
+        ("a", "a", article("Welfare scheme welfare pensions", description="welfare"), now),
+        ("b", "b", article("Cabinet meeting", description="welfare pensions discussed among many other items"), now),
+    ])
+    store.posts_added([post("1", "welfare welfare welfare"), post("2", "new welfare scheme launched in Kurnool today")])
+    store.flush()
+
+    results = store.search("welfare")
+    assert len(results) == 4
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 < score <= 1 for score in scores)
+    # The best match of each index scores 1.0, whatever its raw BM25 score
+    assert {r["id"] for r in results if r["score"] == 1.0} == {"a", "1"}
+    assert [r["type"] for r in store.search("welfare", platform="news")] == ["news", "news"]
+    assert {r["type"] for r in store.search("welfare", platform="twitter")} == {"post"}
+
+
+def test_fts_query():
+    assert fts_query('jagan "welfare scheme"') == '"jagan"* "welfare scheme"'
+    assert fts_query('OR NOT "') == '"OR"* "NOT"*'
+    assert fts_query("   ") == ""
+
+
+def test_merged_stories_are_counted_once(store):
+    now = time.time()
+    store.ingest("ysrcp", [("a", "a", article("Sand policy row"), now), ("b", "b", article("Sand protests"), now)])
+    store.ingest("tdp", [("a", "a", article("Sand policy row"), now)])
+    assert store.mention_count("ysrcp") == 2
+
+    # Both stories were stored before clustering merged them
+    store.retag({"a": "b"})
+    assert store.mention_count("ysrcp") == 1
+    assert store.mention_count("tdp") == 1
+
+    # Re-ingesting a stored article moves it to the story it is given now
+    assert store.ingest("ysrcp", [("b", "c", article("Sand protests"), now), ("a", "c", article("Sand policy row"), now)]) == 0
+    assert store.mention_count("ysrcp") == 1
+    assert store._query("SELECT DISTINCT story FROM articles WHERE party = 'ysrcp'") == [("c",)]
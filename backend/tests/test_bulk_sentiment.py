@@ -0,0 +1,59 @@
+"""Bulk NDJSON sentiment endpoint: results, item limits and body size limits"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.api as api
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api, "MAX_BULK_BYTES", 1024)
+    monkeypatch.setattr(api, "MAX_BULK_TEXTS", 20)
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+
+def results(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_json_array(client):
+    response = client.post("/api/sentiment/analyze/bulk", json=["great victory", {"id": "x", "text": ""}])
+    assert response.status_code == 200
+    lines = results(response)
+    assert [line["index"] for line in lines] == [0, 1]
+    assert "error" not in lines[0] and lines[1] == {"index": 1, "id": "x", "error": "Text is required"}
+
+
+def test_ndjson(client):
+    body = '"welfare scheme success"\n{"id": 7, "text": "corruption scandal"}\n'
+    response = client.post("/api/sentiment/analyze/bulk", content=body,
+                           headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert [line["id"] for line in results(response)] == [None, 7]
+
+
+def test_too_many_items(client):
+    response = client.post("/api/sentiment/analyze/bulk", json=["a"] * 21)
+    assert response.status_code == 413
+
+
+def test_declared_body_too_large(client):
+    response = client.post("/api/sentiment/analyze/bulk", json=["x" * 2000])
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "application/x-ndjson"])
+def test_streamed_body_too_large(client, content_type):
+    # A chunked upload without Content-Length, with a single line longer than the limit
+    def body():
+        for _ in range(10):
+            yield b"x" * 200
+
+    response = client.post("/api/sentiment/analyze/bulk", content=body(), headers={"content-type": content_type})
+    assert response.status_code == 413
@@ -0,0 +1,98 @@
+"""Streaming feed parser: same entries as feedparser, falling back to it when unsure"""
+
+import html
+import random
+
+import feedparser
+import pytest
+
+from services import feed_parser
+from services.feed_parser import _Fallback, _from_feedparser, _google_news_feed, _stream_entries, parse_feed
+
+ATOM_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>AP Politics</title>
+  <entry>
+    <title>Polavaram project review</title>
+    <link href="https://example.com/polavaram"/>
+    <link rel="edit" href="https://example.com/edit/1"/>
+    <id>tag:example.com,2025:1</id>
+    <published>2025-10-13T10:00:00Z</published>
+    <summary>Chief Minister reviews &amp;amp; inspects the works</summary>
+  </entry>
+  <entry>
+    <title>Amaravati capital works resume</title>
+    <id>https://example.com/amaravati</id>
+    <content>Construction restarts</content>
+  </entry>
+</feed>"""
+
+RSS_ITEM = ('<?xml version="1.0"?><rss version="2.0"><channel><title>News</title>'
+            '<item>{}</item></channel></rss>')
+
+
+def feedparser_entries(content, limit):
+    return [_from_feedparser(e) for e in feedparser.parse(content).entries[:limit]]
+
+
+@pytest.mark.parametrize("limit", [1, 20, 100, 150])
+def test_google_news_matches_feedparser(limit):
+    content = _google_news_feed(100)
+    assert _stream_entries(content, limit) == feedparser_entries(content, limit)
+    assert parse_feed(content, limit) == feedparser_entries(content, limit)
+
+
+def test_atom_matches_feedparser():
+    assert _stream_entries(ATOM_FEED, 10) == feedparser_entries(ATOM_FEED, 10)
+
+
+@pytest.mark.parametrize("item", [
+    '<title>TDP manifesto</title><guid>https://example.com/manifesto</guid>',  # permalink guid as link
+    '<title>YSRCP rally</title><link>https://example.com/rally</link>'
+    '<content:encoded xmlns:content="http://purl.org/rss/1.0/modules/content/">Rally in Guntur</content:encoded>',
+    '<title>Pension hike</title><source url="https://example.com">Example</source>',
+])
+def test_rss_fields_match_feedparser(item):
+    content = RSS_ITEM.format(item).encode()
+    assert _stream_entries(content, 10) == feedparser_entries(content, 10)
+
+
+@pytest.mark.parametrize("content", [
+    RSS_ITEM.format('<title>Jagan &lt;b&gt;speech&lt;/b&gt;</title>'),             # markup in the title
+    RSS_ITEM.format('<description>&lt;script&gt;x()&lt;/script&gt;News</description>'),  # unsafe markup
+    RSS_ITEM.format('<description>&lt;iframe src="https://x.com"&gt;&lt;/iframe&gt;News</description>'),
+    RSS_ITEM.format('<description>&lt;a href="https://x.com" onclick="x()"&gt;News&lt;/a&gt;</description>'),
+    RSS_ITEM.format('<description>&lt;a href=https://x.com&gt;News&lt;/a&gt;</description>'),  # unquoted
+    RSS_ITEM.format('<description>Roads &amp; bridges</description>'),               # bare ampersand
+    RSS_ITEM.format('<title>One</title><title>Two</title>'),                         # repeated field
+    RSS_ITEM.format('<link>https://example.com/?a=1&amp;amp;b=2</link>'),             # entity in link
+    '<?xml version="1.0"?><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" '
+    'xmlns="http://purl.org/rss/1.0/"><item><title>RSS 1.0</title></item></rdf:RDF>',
+    RSS_ITEM.format('<title>Unclosed'),                                             # malformed XML
+])
+def test_falls_back_to_feedparser(content):
+    content = content.encode()
+    with pytest.raises(Exception) as raised:
+        _stream_entries(content, 10)
+    assert isinstance(raised.value, (_Fallback, feed_parser.ET.ParseError))
+    assert parse_feed(content, 10) == feedparser_entries(content, 10)
+
+
+def test_stops_after_limit():
+    content = _google_news_feed(3)
+    # Anything after the requested entries is never parsed
+    truncated = content[:content.index(b"</item>") + len(b"</item>")] + b"<item><title>broken"
+    assert _stream_entries(truncated, 1) == feedparser_entries(content, 1)
+    assert _stream_entries(content, 0) == []
+
+
+def test_summary_markup_matches_feedparser():
+    pieces = ['<a href="https://x.com/a?oc=5" target="_blank">', "</a>", '<font color="#6f6f6f">', "</font>",
+              "<b>", "</B>", "<p>", "<br/>", "<img src=x.png>", '<iframe src="https://x.com">', "</iframe>",
+              '<a href=https://x.com>', '<a  href="https://x.com">', '<a href="/relative">', '<div onclick="x()">',
+              "<a href='https://x.com'>", "<!-- note -->", "<script>x()</script>", "&nbsp;", "a > b", "Jagan", "TDP"]
+    rng = random.Random(42)
+    for _ in range(300):
+        summary = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 6)))
+        content = RSS_ITEM.format(f"<title>News</title><description>{html.escape(summary)}</description>").encode()
+        assert parse_feed(content, 10) == feedparser_entries(content, 10), summary
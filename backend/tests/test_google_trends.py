@@ -0,0 +1,276 @@
+"""
+Google Trends: payload planning, pooled sessions, per-payload fetch locks and frame post-processing
+
+Benchmark the vectorized post-processing with: python -m tests.test_google_trends
+"""
+
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+import services.google_trends as google_trends
+import services.trends_sessions as trends_sessions
+from services.google_trends import KEYWORDS, GoogleTrendsService
+
+
+def timeline_rows(df: pd.DataFrame) -> Dict[str, Any]:
+    """The previous row-by-row interest-over-time loop, the reference for the vectorized one"""
+    timeline_data = []
+    for index, row in df.iterrows():
+        timeline_data.append({
+            "date": index.strftime("%b %d"),
+            "ysrcp": int(row.get('YSRCP', 0)),
+            "tdp": int(row.get('TDP', 0))
+        })
+    ysrcp_avg = df['YSRCP'].mean() if 'YSRCP' in df.columns else 50
+    tdp_avg = df['TDP'].mean() if 'TDP' in df.columns else 50
+    ysrcp_current = int(df['YSRCP'].iloc[-1]) if 'YSRCP' in df.columns else 50
+    tdp_current = int(df['TDP'].iloc[-1]) if 'TDP' in df.columns else 50
+    if len(df) >= 14:
+        recent_avg = df['YSRCP'].tail(7).mean()
+        previous_avg = df['YSRCP'].iloc[-14:-7].mean()
+        trend_pct = ((recent_avg - previous_avg) / previous_avg * 100) if previous_avg > 0 else 0
+    else:
+        trend_pct = 0
+    return {
+        "searchInterest": {
+            "ysrcp": ysrcp_current,
+            "tdp": tdp_current,
+            "trend": f"+{trend_pct:.1f}%" if trend_pct >= 0 else f"{trend_pct:.1f}%"
+        },
+        "searchTimeline": timeline_data[-30:],
+        "averages": {"ysrcp": round(ysrcp_avg, 1), "tdp": round(tdp_avg, 1)}
+    }
+
+
+def regional_rows(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """The previous row-by-row regional loop, the reference for the vectorized one"""
+    regional_data = []
+    for region, row in df.iterrows():
+        ysrcp_val = int(row.get('YSRCP', 0))
+        tdp_val = int(row.get('TDP', 0))
+        total = ysrcp_val + tdp_val
+        if total > 0:
+            ysrcp_norm = int((ysrcp_val / total) * 100)
+            tdp_norm = 100 - ysrcp_norm
+        else:
+            ysrcp_norm = 50
+            tdp_norm = 50
+        regional_data.append({"district": region, "ysrcp": ysrcp_norm, "tdp": tdp_norm})
+    regional_data.sort(key=lambda x: x['ysrcp'], reverse=True)
+    return regional_data[:15]
+
+
+def interest_frame(rng, periods: int, freq: str) -> pd.DataFrame:
+    """Random frame shaped like pytrends interest_over_time(): one int column per keyword plus isPartial"""
+    index = pd.date_range(end='2026-10-18', periods=periods, freq=freq, name='date')
+    return pd.DataFrame({
+        'YSRCP': [rng.randint(0, 100) for _ in range(periods)],
+        'TDP': [rng.randint(0, 100) for _ in range(periods)],
+        'isPartial': [False] * (periods - 1) + [True]
+    }, index=index)
+
+
+def region_frame(rng, regions: int) -> pd.DataFrame:
+    """Random frame shaped like pytrends interest_by_region(), with many regions of no interest"""
+    values = lambda: [rng.choice([0, 0, rng.randint(0, 100)]) for _ in range(regions)]
+    return pd.DataFrame({'YSRCP': values(), 'TDP': values()},
+                        index=pd.Index([f"Region {i}" for i in range(regions)], name='geoName'))
+
+
+class FakeTrendReq:
+    """pytrends stand-in that records calls and flags concurrent use of one client"""
+
+    calls = []
+    overlaps = 0
+    gates = {}  # timeframe -> Event the client waits for before building that payload
+
+    def __init__(self, hl, tz):
+        self.busy = False
+        self.timeframe = None
+
+    def _call(self, name):
+        if self.busy:
+            FakeTrendReq.overlaps += 1
+        self.busy = True
+        FakeTrendReq.calls.append((name, self.timeframe))
+        time.sleep(0.01)
+        self.busy = False
+
+    def build_payload(self, kw_list, cat, timeframe, geo, gprop):
+        gate = FakeTrendReq.gates.get(timeframe)
+        if gate is not None:
+            gate.wait(5)
+        self.timeframe = timeframe
+        self._call("build_payload")
+
+    def interest_over_time(self):
+        self._call("interest_over_time")
+        index = pd.date_range("2026-09-01", periods=30)
+        return pd.DataFrame({"YSRCP": range(30), "TDP": range(30, 60), "isPartial": False}, index=index)
+
+    def interest_by_region(self, resolution):
+        self._call("interest_by_region")
+        return pd.DataFrame({"YSRCP": [10, 80], "TDP": [90, 20]}, index=["Kadapa", "Guntur"])
+
+    def related_queries(self):
+        self._call("related_queries")
+        frame = pd.DataFrame({"query": ["polavaram", "amaravati"], "value": [300, 50]})
+        return {"YSRCP": {"top": frame, "rising": frame}, "TDP": {"top": frame, "rising": None}}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    FakeTrendReq.calls, FakeTrendReq.overlaps, FakeTrendReq.gates = [], 0, {}
+    monkeypatch.setattr(trends_sessions, "TrendReq", FakeTrendReq)
+    monkeypatch.setattr(google_trends, "trends_sessions", trends_sessions.TrendsSessionPool(size=3, max_concurrency=3))
+    google_trends.payload_cache.clear()
+    google_trends.trends_cache.clear()
+    yield GoogleTrendsService()
+    google_trends.payload_cache.clear()
+    google_trends.trends_cache.clear()
+
+
+def test_planned_reports_share_one_payload(service):
+    assert service._report("interest_over_time", "today 1-m") is not None
+    builds = sorted(tf for name, tf in FakeTrendReq.calls if name == "build_payload")
+    assert builds == ["today 1-m", "today 3-m"]
+
+    # Every planned report is now cached
+    FakeTrendReq.calls.clear()
+    service._report("related_queries", "today 1-m")
+    service._report("interest_by_region", "today 3-m")
+    assert FakeTrendReq.calls == []
+
+
+def test_reports_run_one_at_a_time_per_session(service):
+    service._report("interest_over_time", "today 1-m")
+    assert ("related_queries", "today 1-m") in FakeTrendReq.calls
+    assert FakeTrendReq.overlaps == 0
+
+
+def test_requests_for_other_payloads_do_not_wait(service):
+    gate = FakeTrendReq.gates["today 12-m"] = threading.Event()
+    slow = threading.Thread(target=service._report, args=("interest_over_time", "today 12-m"))
+    slow.start()
+    try:
+        time.sleep(0.05)
+        start = time.perf_counter()
+        service._report("interest_over_time", "today 5-y")
+        assert time.perf_counter() - start < 1
+        assert slow.is_alive()
+    finally:
+        gate.set()
+        slow.join()
+    assert ("interest_over_time", "today 12-m") in FakeTrendReq.calls
+
+
+def test_planned_payload_in_flight_is_skipped(service):
+    # Another request is fetching today 3-m: today 1-m is fetched without it, and without waiting
+    in_flight = service._fetch_lock((KEYWORDS, "today 3-m", google_trends.GEO))
+    in_flight.acquire()
+    try:
+        service._report("interest_over_time", "today 1-m")
+    finally:
+        in_flight.release()
+    assert [tf for name, tf in FakeTrendReq.calls if name == "build_payload"] == ["today 1-m"]
+
+
+def test_failures_back_off_the_session(service, monkeypatch):
+    monkeypatch.setattr(trends_sessions, "BACKOFF_BASE_SECONDS", 0.01)
+    failures = [2]
+    interest_over_time = FakeTrendReq.interest_over_time
+
+    def flaky(self):
+        if failures[0]:
+            failures[0] -= 1
+            raise RuntimeError("429 Too Many Requests")
+        return interest_over_time(self)
+
+    monkeypatch.setattr(FakeTrendReq, "interest_over_time", flaky)
+    assert service.get_interest_over_time()["searchInterest"]["ysrcp"] == 29
+    assert google_trends.trends_sessions.stats()["backingOff"] == 0
+
+
+@pytest.mark.parametrize("periods, freq", [(30, "D"), (10, "D"), (261, "W"), (274, "MS"), (1827, "D")])
+def test_timeline_matches_row_loop(periods, freq):
+    df = interest_frame(random.Random(periods), periods, freq)
+    payload = GoogleTrendsService._timeline_from_frame(df)
+    assert payload == timeline_rows(df)
+    assert len(payload["searchTimeline"]) == min(periods, 30)
+    # Native Python types only, so the payload serializes as-is
+    assert json.loads(json.dumps(payload)) == payload
+
+
+def test_timeline_trend():
+    df = interest_frame(random.Random(0), 14, "D")
+    df["YSRCP"] = [10] * 7 + [15] * 7
+    assert GoogleTrendsService._timeline_from_frame(df)["searchInterest"]["trend"] == "+50.0%"
+    df["YSRCP"] = [0] * 14
+    assert GoogleTrendsService._timeline_from_frame(df)["searchInterest"]["trend"] == "+0.0%"
+
+
+@pytest.mark.parametrize("regions", [0, 1, 26, 2000])
+def test_regional_matches_row_loop(regions):
+    df = region_frame(random.Random(regions), regions)
+    payload = GoogleTrendsService._regional_from_frame(df)
+    assert payload == regional_rows(df)
+    assert json.loads(json.dumps(payload)) == payload
+
+
+def test_regional_edge_cases():
+    df = pd.DataFrame({"YSRCP": [0, 30, 60, 30], "TDP": [0, 70, 40, 70]},
+                      index=["Kurnool", "Guntur", "Kadapa", "Nellore"])
+    assert GoogleTrendsService._regional_from_frame(df) == [
+        {"district": "Kadapa", "ysrcp": 60, "tdp": 40},
+        {"district": "Kurnool", "ysrcp": 50, "tdp": 50},  # No interest in either party: an even split
+        {"district": "Guntur", "ysrcp": 30, "tdp": 70},   # Equal shares keep the frame's order
+        {"district": "Nellore", "ysrcp": 30, "tdp": 70},
+    ]
+    only_tdp = df[["TDP"]]
+    assert GoogleTrendsService._regional_from_frame(only_tdp) == regional_rows(only_tdp)
+
+
+def _benchmark():
+    """Vectorized post-processing against the previous row-by-row loops, on multi-year frames"""
+    rng = random.Random(50)
+    frames = {
+        "today 5-y (weekly)": interest_frame(rng, 261, 'W'),
+        "all (monthly, 2004-)": interest_frame(rng, 274, 'MS'),
+        "5 years of daily points": interest_frame(rng, 1827, 'D')
+    }
+    regions = {"AP districts": region_frame(rng, 26), "cities": region_frame(rng, 2000)}
+
+    for df in list(frames.values()) + [interest_frame(rng, 10, 'D'), frames["today 5-y (weekly)"][['TDP']]]:
+        try:
+            expected = timeline_rows(df)
+        except KeyError:
+            continue
+        assert GoogleTrendsService._timeline_from_frame(df) == expected
+    for df in list(regions.values()) + [region_frame(rng, 20)[['TDP']], region_frame(rng, 0)]:
+        assert GoogleTrendsService._regional_from_frame(df) == regional_rows(df)
+
+    def rate(func, df, rounds):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func(df)
+        return (time.perf_counter() - start) / rounds * 1000
+
+    print("identical payloads to the row-by-row loops")
+    for name, df in frames.items():
+        rows_ms, vector_ms = rate(timeline_rows, df, 20), rate(GoogleTrendsService._timeline_from_frame, df, 20)
+        print(f"interest over time, {name:<24} {len(df):>5} rows: iterrows {rows_ms:7.2f} ms   "
+              f"vectorized {vector_ms:6.2f} ms ({rows_ms / vector_ms:.0f}x)")
+    for name, df in regions.items():
+        rows_ms, vector_ms = rate(regional_rows, df, 20), rate(GoogleTrendsService._regional_from_frame, df, 20)
+        print(f"regional interest,  {name:<24} {len(df):>5} rows: iterrows {rows_ms:7.2f} ms   "
+              f"vectorized {vector_ms:6.2f} ms ({rows_ms / vector_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,36 @@
+"""HTML to text: identical to BeautifulSoup's get_text() on RSS summaries and markup edge cases"""
+
+import json
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from services.html_text import _fixtures, html_to_text
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "html_summaries.json")
+
+# Snippets with the text BeautifulSoup(html, 'html.parser').get_text()[:limit] produced for them
+with open(FIXTURES_PATH, encoding="utf-8") as f:
+    FIXTURES = json.load(f)
+
+
+@pytest.mark.parametrize("case", FIXTURES, ids=range(len(FIXTURES)))
+def test_checked_in_fixtures(case):
+    assert html_to_text(case["html"], case["limit"]) == case["text"]
+
+
+def test_matches_installed_beautifulsoup():
+    for html_text in _fixtures():
+        assert html_to_text(html_text) == BeautifulSoup(html_text, 'html.parser').get_text()[:200], html_text
+
+
+@pytest.mark.parametrize("html_text, text", [
+    ("", ""),
+    ("plain summary", "plain summary"),
+    ("   ", " "),
+    (" \n ", "\n"),
+    ("<b>Jagan</b> &amp; <i>Naidu</i>", "Jagan & Naidu"),
+])
+def test_simple_snippets(html_text, text):
+    assert html_to_text(html_text) == text
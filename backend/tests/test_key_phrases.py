@@ -0,0 +1,45 @@
+"""Key phrase extraction and running phrase counts"""
+
+from services.key_phrases import KeyPhraseCounter, PhraseCache, extract_phrases
+
+
+def test_phrases_are_runs_of_non_stopwords():
+    assert extract_phrases("Jagan welfare scheme success for farmers") == (
+        "jagan welfare", "welfare scheme", "scheme success", "jagan welfare scheme", "welfare scheme success"
+    )
+    assert extract_phrases("The TDP rally in Vijayawada today") == ("tdp rally",)
+
+
+def test_noise_is_removed_and_punctuation_breaks_phrases():
+    phrases = extract_phrases("welfare scheme. https://t.co/x @user farmers &amp; #Amaravati capital")
+    assert phrases == ("welfare scheme", "farmers amaravati", "amaravati capital", "farmers amaravati capital")
+
+
+def test_telugu_words_form_phrases():
+    assert extract_phrases("జగన్ సంక్షేమ పథకం, 2024 election") == (
+        "జగన్ సంక్షేమ", "సంక్షేమ పథకం", "జగన్ సంక్షేమ పథకం"
+    )
+
+
+def test_counter_counts_each_text_once():
+    counter = KeyPhraseCounter()
+    counter.add(["welfare scheme launched", "welfare scheme launched", "welfare  scheme launched",
+                 "welfare scheme delayed", ""])
+    top = dict(counter.top(10))
+    assert top["welfare scheme"] == 2
+    assert top["scheme launched"] == 1
+
+
+def test_counter_ages_out_oldest_texts():
+    counter = KeyPhraseCounter(max_texts=2)
+    counter.add(["polavaram project delayed", "amaravati capital works", "liquor policy review"])
+    top = dict(counter.top(10))
+    assert "polavaram project" not in top
+    assert top["amaravati capital"] == 1 and top["liquor policy"] == 1
+
+
+def test_phrase_cache_matches_extraction():
+    cache = PhraseCache(maxsize=10)
+    text = "Naidu slams corruption scandal in Amaravati"
+    assert cache.get(text) == extract_phrases(text)
+    assert cache.get(text) is cache.get(text)
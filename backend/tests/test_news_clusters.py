@@ -0,0 +1,73 @@
+"""Near-duplicate news clustering: story text, MinHash-LSH clusters and the rolling index"""
+
+from services.news_clusters import StoryIndex, _pair_agreement, _synthetic_articles, shingles, story_text
+
+
+def test_story_text():
+    title = "YS Jagan slams TDP over welfare delays - The Hindu"
+    assert story_text({"title": title, "description": title}) == "YS Jagan slams TDP over welfare delays"
+    assert story_text({"title": title, "description": "Protests across districts"}) == \
+        "YS Jagan slams TDP over welfare delays Protests across districts"
+    assert story_text({}) == ""
+
+
+def test_shingles():
+    assert shingles("Jagan slams Naidu") == shingles("JAGAN, slams... Naidu!")
+    assert len(shingles("Jagan slams Naidu")) == 5  # 3 words and 2 bigrams
+    assert shingles("") == frozenset()
+
+
+def test_syndicated_copies_share_a_cluster():
+    index = StoryIndex()
+    first = index.add("a", "Chandrababu Naidu reviews Polavaram project works in West Godavari")
+    assert index.add("b", "Chandrababu Naidu reviews Polavaram project works in West Godavari today") == first
+    assert index.add("c", "Pawan Kalyan launches mega DSC recruitment drive in Guntur") != first
+    assert index.reach(first) == 2
+    # Re-adding an article returns its cluster without counting it again
+    assert index.add("b", "anything") == first and index.reach(first) == 2
+
+
+def test_bridging_article_merges_clusters():
+    index = StoryIndex(threshold=0.5)
+    left = index.add("a", "Nara Lokesh questions sand policy in Nellore district")
+    right = index.add("b", "sand policy in Nellore district sparks protests by farmers")
+    assert left != right
+    merged = index.add("c", "Nara Lokesh questions sand policy in Nellore district sparks protests")
+    assert merged in (left, right)
+    assert index.cluster("a") == index.cluster("b") == merged
+    assert index.reach(merged) == 3
+
+
+def test_empty_text_is_its_own_story():
+    index = StoryIndex()
+    assert index.add("a", "") == "a"
+    assert index.add("b", "") == "b"
+
+
+def test_oldest_articles_age_out():
+    index = StoryIndex(max_articles=2)
+    cluster = index.add("a", "YSRCP defends volunteer system in Kurnool")
+    index.add("b", "YSRCP defends volunteer system in Kurnool again")
+    index.add("c", "TDP announces pension hike for elderly")
+    assert index.size() == 2
+    assert index.cluster("a") is None
+    assert index.reach(cluster) == 1
+
+
+def test_clusters_match_generating_stories():
+    articles, truth = _synthetic_articles(2000, 600)
+    index = StoryIndex(max_articles=len(articles))
+    for key, text in articles:
+        index.add(key, text)
+    precision, recall = _pair_agreement([index.cluster(key) for key, _ in articles], truth)
+    assert precision > 0.98 and recall > 0.95
+
+
+def test_index_reports_articles_moved_by_a_merge():
+    index = StoryIndex(threshold=0.5)
+    index.add("a", "Nara Lokesh questions sand policy in Nellore district")
+    index.add("b", "sand policy in Nellore district sparks protests by farmers")
+    cluster, moved = index.index("c", "Nara Lokesh questions sand policy in Nellore district sparks protests")
+    assert moved in (["a"], ["b"])
+    assert index.cluster(moved[0]) == cluster
+    assert index.index("c", "anything") == (cluster, [])
@@ -0,0 +1,151 @@
+"""News service: pooled HTTP clients, feed caching and mention windows"""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import httpx
+
+from services.article_store import article_store
+from services.news_service import NewsService, news_cache
+from services.sentiment_service import sentiment_service
+
+
+def rss_feed(hours_ago):
+    items = "".join(
+        f'<item><title>{title} - {source}</title><link>https://example.com/{i}</link>'
+        f'<pubDate>{formatdate(time.time() - age * 3600, usegmt=True)}</pubDate></item>'
+        for i, (title, source, age) in enumerate([
+            ("YSRCP chief Jagan slams TDP over Polavaram delays", "The Hindu", hours_ago[0]),
+            ("YSRCP announces candidates for Kadapa by-election", "NDTV", hours_ago[1]),
+        ])
+    )
+    return f'<rss version="2.0"><channel><title>News</title>{items}</channel></rss>'.encode()
+
+
+def test_one_client_per_event_loop():
+    service = NewsService()
+
+    async def use():
+        client = service._get_client()
+        assert service._get_client() is client
+        return client
+
+    first = asyncio.run(use())
+    second = asyncio.run(use())
+    assert first is not second
+    # The first loop has closed, so its client is no longer kept
+    assert list(service._clients.values()) == [second]
+
+
+def test_aclose_closes_clients_of_other_loops():
+    service = NewsService()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def get_client():
+        return service._get_client()
+
+    other = asyncio.run_coroutine_threadsafe(get_client(), loop).result()
+
+    async def close():
+        client = service._get_client()
+        await service.aclose()
+        return client
+
+    own = asyncio.run(close())
+    assert own.is_closed and not service._clients
+
+    async def closed():
+        return other.is_closed
+
+    for _ in range(50):
+        if asyncio.run_coroutine_threadsafe(closed(), loop).result():
+            break
+    assert other.is_closed
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_feeds_are_fetched_once_for_every_window(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url)
+        return httpx.Response(200, content=rss_feed(hours_ago=(0.5, 30)))
+
+    service = NewsService()
+    service.news_api_key = ""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(service, "_get_client", lambda: client)
+    news_cache.clear()
+
+    async def fetch():
+        return await service.get_all_news(), await service.get_all_news(hours=1), await service.get_all_news(hours=48)
+
+    default, last_hour, two_days = asyncio.run(fetch())
+    news_cache.clear()
+
+    assert len(requests) == 3  # One request per feed, shared by all three windows
+    assert default["ysrcp"]["articles"] == last_hour["ysrcp"]["articles"] == two_days["ysrcp"]["articles"]
+    assert last_hour["ysrcp"]["totalMentions"] == 1
+    assert two_days["ysrcp"]["totalMentions"] == 2
+    assert "The Hindu" in last_hour["ysrcp"]["sources"] and "NDTV" not in last_hour["ysrcp"]["sources"]
+
+
+def test_merged_stories_are_counted_once(monkeypatch):
+    def feed(*titles):
+        items = "".join(
+            f'<item><title>{title} - The Hindu</title><link>https://example.com/merge/{abs(hash(title))}</link>'
+            f'<pubDate>{formatdate(time.time() - 600, usegmt=True)}</pubDate></item>'
+            for title in titles
+        )
+        return f'<rss version="2.0"><channel><title>News</title>{items}</channel></rss>'.encode()
+
+    feeds = [feed("Kakinada port workers question dredging tender in Godavari delta",
+                  "dredging tender in Godavari delta sparks strike by fishermen unions")]
+    service = NewsService()
+    service.news_api_key = ""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=feeds[0])))
+    monkeypatch.setattr(service, "_get_client", lambda: client)
+
+    async def fetch():
+        news_cache.clear()
+        return await service.get_all_news(hours=1)
+
+    before = article_store.mention_count("ysrcp", time.time() - 3600)
+    first = asyncio.run(fetch())
+    assert first["ysrcp"]["totalMentions"] == before + 2
+
+    # A later article bridges the two stored stories, merging their clusters
+    feeds[0] = feed("Kakinada port workers question dredging tender in Godavari delta sparks strike by fishermen")
+    second = asyncio.run(fetch())
+    news_cache.clear()
+    assert second["ysrcp"]["totalMentions"] == before + 1
+
+
+def test_clustering_and_sentiment_run_off_the_event_loop(monkeypatch):
+    threads = {}
+    service = NewsService()
+    service.news_api_key = ""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=rss_feed(hours_ago=(0.5,)))))
+    monkeypatch.setattr(service, "_get_client", lambda: client)
+
+    cluster_stories = service._cluster_stories
+    monkeypatch.setattr(service, "_cluster_stories",
+                        lambda articles: threads.setdefault("cluster", threading.get_ident()) and cluster_stories(articles))
+    ingest = sentiment_service.ingest
+    monkeypatch.setattr(sentiment_service, "ingest",
+                        lambda *args: threads.setdefault("ingest", threading.get_ident()) and ingest(*args))
+
+    async def fetch():
+        news_cache.clear()
+        await service.get_all_news()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(fetch())
+    news_cache.clear()
+    assert threads["cluster"] != loop_thread and threads["ingest"] != loop_thread
@@ -0,0 +1,94 @@
+"""Post store: index queries, time range lookups and listener notifications"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import services.post_store as post_store_module
+from models.post_record import PostRecord
+from services.post_store import BUCKET_SECONDS, PostListener, PostStore
+
+
+def record(post_id, party="tdp", platform="twitter", hours_ago=0.0, engagement=0, author="author"):
+    return PostRecord(id=str(post_id), platform=platform, party=party, text="", author=author,
+                      timestamp=datetime.now() - timedelta(hours=hours_ago), engagement=engagement)
+
+
+class Recorder(PostListener):
+    def __init__(self):
+        self.added = []
+        self.removed = []
+
+    def posts_added(self, records):
+        self.added.extend((r.platform, r.id) for r in records)
+
+    def posts_removed(self, keys):
+        self.removed.extend(keys)
+
+
+@pytest.fixture
+def store():
+    store = PostStore()
+    parties, platforms = ["tdp", "ysrcp"], ["twitter", "instagram", "facebook", "youtube"]
+    store.add_many(record(i, parties[i % 2], platforms[i % 4], hours_ago=i % 72, engagement=i)
+                   for i in range(2000))
+    return store
+
+
+def brute_force(store, party=None, platform=None, since=None):
+    return [r for r in sorted(store._posts.values(), key=lambda r: -r.engagement)
+            if (party is None or r.party == party) and (platform is None or r.platform == platform)
+            and (since is None or r.timestamp >= since)]
+
+
+@pytest.mark.parametrize("party, platform", [(None, None), ("tdp", None), ("ysrcp", "instagram"), (None, "youtube")])
+@pytest.mark.parametrize("hours", [None, 0.5, 6, 48, 100])
+def test_queries_match_a_full_scan(store, party, platform, hours):
+    since = datetime.now() - timedelta(hours=hours) if hours is not None else None
+    expected = brute_force(store, party, platform, since)
+
+    assert store.count(party=party, platform=platform, since=since) == len(expected)
+    top = store.top(25, party=party, platform=platform, since=since)
+    assert [r.engagement for r in top] == [r.engagement for r in expected[:25]]
+
+
+def test_bucket_keys_follow_the_bucket_index(store):
+    assert store._bucket_keys == sorted(store._by_bucket)
+
+    for key in list(store._posts)[:500]:
+        store._unindex(key)
+    assert store._bucket_keys == sorted(store._by_bucket)
+
+
+def test_expired_posts_are_evicted_and_announced():
+    store = PostStore()
+    recorder = Recorder()
+    store.subscribe(recorder)
+    store.add_many([record(1, hours_ago=1)])
+
+    # Age the stored post past the retention window, then trigger eviction with a fresh ingest
+    expired = (post_store_module.RETENTION_SECONDS + 2 * BUCKET_SECONDS) / 3600
+    store._unindex(("twitter", "1"))
+    store._index(("twitter", "1"), record(1, hours_ago=expired))
+    store.add_many([record(2)])
+
+    assert recorder.removed == [("twitter", "1")]
+    assert store.get("twitter", "1") is None
+
+
+def test_posts_evicted_in_the_same_call_are_not_announced(monkeypatch):
+    monkeypatch.setattr(post_store_module, "MAX_POSTS", 3)
+    store = PostStore()
+    recorder = Recorder()
+    store.subscribe(recorder)
+
+    store.add_many(record(i, engagement=i) for i in range(10, 13))
+    store.add_many(record(i, engagement=i) for i in range(5))
+
+    # Posts 0-4 rank below everything stored, so they are evicted before ever being added
+    assert recorder.added == [("twitter", str(i)) for i in range(10, 13)]
+    assert recorder.removed == []
+
+    store.add_many([record(20, engagement=20)])
+    assert recorder.removed == [("twitter", "10")]
+    assert store.count() == 3
@@ -0,0 +1,59 @@
+"""Sentiment backends: the interface, backend lookup and VADER scoring"""
+
+import numpy as np
+import pytest
+
+from services.sentiment_backends import (
+    FIXTURES, NEUTRAL_SCORES, POLITICAL_LEXICON, SentimentBackend, VaderBackend, get_backend
+)
+from services.sentiment_engine import label_sentiment
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SentimentBackend()
+
+    class Incomplete(SentimentBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("no-such-backend")
+
+
+def test_backends_are_shared():
+    assert get_backend("vader") is get_backend("vader")
+    assert isinstance(get_backend("vader"), VaderBackend)
+
+
+def test_vader_matches_polarity_scores():
+    backend = get_backend("vader")
+    texts = [text for text, _ in FIXTURES]
+    scores = backend.score_batch(texts)
+    for text, row in zip(texts, scores):
+        s = backend.analyzer.polarity_scores(text)
+        assert tuple(row) == (s['compound'], s['pos'], s['neg'], s['neu'])
+
+
+def test_vader_applies_political_lexicon():
+    lexicon = get_backend("vader").analyzer.lexicon
+    for word, valence in POLITICAL_LEXICON.items():
+        assert lexicon[word] == valence
+
+
+def test_vader_empty_texts_are_neutral():
+    scores = get_backend("vader").score_batch(["", "corruption scandal"])
+    assert tuple(scores[0]) == NEUTRAL_SCORES
+    assert label_sentiment(scores[1:, 0]).tolist() == ["negative"]
+
+
+def test_vader_labels_english_fixtures():
+    english = [(text, label) for text, label in FIXTURES if text.isascii()]
+    scores = get_backend("vader").score_batch([text for text, _ in english])
+    labels = label_sentiment(scores[:, 0])
+    accuracy = np.mean(labels == np.array([label for _, label in english]))
+    assert accuracy >= 0.6
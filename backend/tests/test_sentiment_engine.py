@@ -0,0 +1,55 @@
+"""Batch sentiment engine: in-process, process-pool and memoized scores agree"""
+
+import random
+
+import numpy as np
+import pytest
+
+from services.sentiment_engine import SentimentEngine, label_sentiment, text_key
+
+PHRASES = ("jagan welfare scheme success for farmers", "naidu slams corruption scandal in amaravati",
+           "tdp rally in vijayawada today", "ysrcp govt failure on roads, people protest",
+           "great victory for the people of andhra", "opposition raises crisis over polavaram")
+
+
+@pytest.fixture(scope="module")
+def texts():
+    rng = random.Random(42)
+    return [f"{rng.choice(PHRASES)} {rng.choice(PHRASES)} #{i}" for i in range(600)] + ["", "   "]
+
+
+def test_parallel_scores_match_serial(texts):
+    engine = SentimentEngine(backend="vader", workers=2, parallel_threshold=100, chunk_size=150)
+    try:
+        serial = engine.backend.score_batch(texts)
+        batch = engine.score(texts)
+        assert engine._pool is not None  # Large enough to be sharded across workers
+    finally:
+        engine.shutdown()
+    assert np.allclose(serial[:, 0], batch.compound)
+    assert np.allclose(serial[:, 1], batch.positive)
+    assert np.allclose(serial[:, 2], batch.negative)
+    assert np.allclose(serial[:, 3], batch.neutral)
+
+
+def test_memoized_scores_match_fresh(texts):
+    engine = SentimentEngine(backend="vader", workers=1)
+    first = engine.score(texts)
+    again = engine.score(texts)
+    assert np.array_equal(first.compound, again.compound)
+    assert engine.score_text(texts[0])[0] == first.compound[0]
+
+
+def test_empty_texts_are_neutral():
+    scores = SentimentEngine(backend="vader", workers=1).score(["", "welfare success"])
+    assert scores.compound[0] == 0.0 and scores.neutral[0] == 1.0
+    assert scores.compound[1] > 0
+
+
+def test_text_key_ignores_whitespace():
+    assert text_key("great  victory\n") == text_key("great victory")
+    assert text_key("great victory") != text_key("great defeat")
+
+
+def test_labels():
+    assert label_sentiment(np.array([0.5, -0.5, 0.0])).tolist() == ["positive", "negative", "neutral"]
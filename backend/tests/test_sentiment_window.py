@@ -0,0 +1,34 @@
+"""Sliding-window sentiment: running aggregates and eviction as items age out"""
+
+import time
+
+from services.sentiment_window import SentimentWindow
+
+
+def test_running_aggregates_match_the_items_in_the_window():
+    window = SentimentWindow(window_hours=1)
+    now = time.time()
+    window.add("tdp", "a", 0.8, now)
+    window.add("tdp", "b", -0.6, now)
+    window.add("tdp", "b", 0.2, now - 60)  # Re-ingesting replaces the previous score
+    window.add("tdp", "old", 0.9, now - 7200)  # Already outside the window
+
+    snapshot = window.snapshot("tdp")
+    assert snapshot["totalAnalyzed"] == 2
+    assert snapshot["averageScore"] == round((0.8 + 0.2) / 2, 3)
+    assert sum(snapshot["histogram"]) == 2
+
+
+def test_ingesting_past_the_window_evicts_without_reads(monkeypatch):
+    window = SentimentWindow(window_hours=1)
+    clock = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+
+    # Ten hours of items, one a minute, and nothing ever reads the window
+    for i in range(600):
+        window.add("ysrcp", str(i), 0.5)
+        clock[0] += 60
+
+    assert len(window._items) <= 61
+    assert len(window._expiry) <= 61
+    assert window._parties["ysrcp"].total == len(window._items)
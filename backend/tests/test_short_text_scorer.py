@@ -0,0 +1,67 @@
+"""VADER short-text fast path: identical to polarity_scores, or declines"""
+
+import pytest
+
+from services.sentiment_backends import POLITICAL_LEXICON, ShortTextScorer, _fuzz_texts, build_analyzer
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return build_analyzer()
+
+
+@pytest.fixture(scope="module")
+def scorer(analyzer):
+    return ShortTextScorer(analyzer)
+
+
+def vader_row(analyzer, text):
+    s = analyzer.polarity_scores(text)
+    return s['compound'], s['pos'], s['neg'], s['neu']
+
+
+def test_fuzz_corpus_matches_polarity_scores(analyzer, scorer):
+    accepted = 0
+    for text in _fuzz_texts(10_000):
+        row = scorer.score(text)
+        if row is not None:
+            accepted += 1
+            assert row == vader_row(analyzer, text), text
+    # The corpus is dense with contextual words, but plenty of texts still take the fast path
+    assert accepted > 1000
+
+
+@pytest.mark.parametrize("text", [
+    "", "good", "welfare scheme", "#Amaravati victory!!!", "corruption scam??", "GOOD GREAT",
+    "farmers protest", "Jagan Naidu farmers", "TDP YSRCP", ":)", "lol", *POLITICAL_LEXICON,
+])
+def test_plain_texts_take_fast_path(analyzer, scorer, text):
+    assert scorer.score(text) == vader_row(analyzer, text)
+
+
+@pytest.mark.parametrize("text", [
+    "very good",             # booster
+    "extremely bad scheme",  # booster
+    "not good",              # negation
+    "isn't great",           # contracted negation
+    "never a success",       # negation
+    "no jobs",
+    "least corrupt",
+    "good but corrupt",      # "but" shifts weight to the second clause
+    "kind of good",
+    "this is great",
+    "great victory 😀",     # emoji are translated to words
+    "GOOD scheme",           # mixed ALL CAPS boosts the capitalized words
+    "Jagan Naidu TDP",
+    "the shit",              # special-case idioms
+    "kiss of death",
+    "good " * 11,            # longer than SHORT_TEXT_TOKENS
+])
+def test_contextual_rules_decline(analyzer, scorer, text):
+    assert scorer.score(text) is None
+
+
+def test_max_tokens(analyzer):
+    scorer = ShortTextScorer(analyzer, max_tokens=2)
+    assert scorer.score("good roads") is not None
+    assert scorer.score("good roads today") is None
@@ -0,0 +1,98 @@
+"""Trending topics: count-min counts, burst scores and warming from stored history"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from models.post_record import PostRecord
+from services.article_store import ArticleStore
+from services.topic_trends import (
+    BUCKET_SECONDS, FALLBACK_MIN_SCORE, RECENT_BUCKETS, RING_BUCKETS, TopicTrends, _synthetic_items, topic_terms
+)
+
+BURST_WORDS = {"polavaram", "flood", "relief"}
+
+
+def trend(items, now):
+    trends = TopicTrends()
+    for i in range(0, len(items), 500):
+        trends.add(items[i:i + 500], now=now)
+    return trends
+
+
+@pytest.mark.parametrize("seed", [47, 25, 3])
+def test_burst_trends_and_noise_does_not(seed):
+    now = time.time()
+    top = trend(_synthetic_items(40000, now, seed), now).top(10, now=now)
+    assert top and set(top[0]["topic"].split()) <= BURST_WORDS and all(t["burst"] for t in top)
+    # Filler words and pairs are seen a handful of times each; none of them may trend
+    assert all(set(t["topic"].split()) <= BURST_WORDS for t in top), top
+
+
+def test_counts_are_never_underestimated():
+    now = time.time()
+    items = _synthetic_items(5000, now)
+    trends = trend(items, now)
+
+    recent_since = (int(now // BUCKET_SECONDS) - RECENT_BUCKETS + 1) * BUCKET_SECONDS
+    true_counts = {}
+    for _, text, ts in items:
+        if ts >= recent_since:
+            for term in topic_terms(text):
+                true_counts[term] = true_counts.get(term, 0) + 1
+    terms = list(true_counts)
+    hashes = np.array([trends._candidates.get(t) or 0 for t in terms], dtype=np.uint64)
+    known = hashes > 0
+    estimates = trends._window_counts(hashes[known], int(now // BUCKET_SECONDS))[0][-1]
+    truth = np.array([true_counts[t] for t, k in zip(terms, known) if k])
+    assert (estimates >= truth).all()
+    # Conservative update keeps one-off terms close to their true count
+    assert np.mean(estimates - truth) < 0.5
+
+
+def test_items_are_counted_once():
+    now = time.time()
+    trends = TopicTrends()
+    assert trends.add([("a", "Polavaram flood relief", now)], now=now) == 1
+    assert trends.add([("a", "Polavaram flood relief", now), ("b", "sand policy", None)], now=now) == 1
+    # Items older than the ring are skipped
+    assert trends.add([("c", "old story", now - 1000 * BUCKET_SECONDS)], now=now) == 0
+
+
+def test_warm_start_gives_a_baseline():
+    now = time.time()
+    recent_since = now - RECENT_BUCKETS * BUCKET_SECONDS
+    items = _synthetic_items(20000, now)
+    history = [item for item in items if item[2] < recent_since]
+    recent = [item for item in items if item[2] >= recent_since]
+
+    store = ArticleStore(":memory:")
+    store.ingest("general", [(key, key, {"title": text}, ts) for key, text, ts in history[::2]])
+    store.posts_added([PostRecord(id=key, platform="twitter", party="ysrcp", text=text, author="",
+                                  timestamp=datetime.fromtimestamp(ts)) for key, text, ts in history[1::2]])
+    store.flush()
+
+    # Without history, everyday topics trend on their raw counts
+    cold = trend(recent, now).top(10, now=now)
+    assert any(not set(t["topic"].split()) & BURST_WORDS for t in cold)
+
+    warmed = TopicTrends()
+    ring_start = (int(now // BUCKET_SECONDS) - RING_BUCKETS + 1) * BUCKET_SECONDS
+    assert warmed.warm(store, now=now) == sum(ts >= ring_start for _, _, ts in history)
+    for i in range(0, len(recent), 500):
+        warmed.add(recent[i:i + 500], now=now)
+    top = warmed.top(10, now=now)
+    assert top and all(set(t["topic"].split()) <= BURST_WORDS for t in top), top
+
+
+@pytest.mark.parametrize("seed", [47, 25, 3])
+def test_ordinary_hour_lists_terms_above_their_baseline(seed):
+    now = time.time()
+    trends = trend(_synthetic_items(40000, now, seed, burst=False), now)
+    top = trends.top(10, now=now)
+    # Nothing bursts, but trending is not left empty
+    assert top and not any(t["burst"] for t in top), top
+    assert all(t["count"] >= trends.min_count and t["score"] >= FALLBACK_MIN_SCORE for t in top)
+    assert not set(" ".join(t["topic"] for t in top).split()) & BURST_WORDS
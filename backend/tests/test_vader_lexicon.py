@@ -0,0 +1,48 @@
+"""Prebuilt VADER lexicon: written by the build step only, ignored when stale"""
+
+import ast
+import os
+import pickle
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from services.vader_lexicon import POLITICAL_LEXICON, build_analyzer, load_lexicon, write_lexicon
+
+
+def test_build_analyzer_does_not_write(tmp_path):
+    path = str(tmp_path / "vader_lexicon.pkl")
+    analyzer = build_analyzer(path)
+    assert not os.path.exists(path)
+    assert analyzer.lexicon["scam"] == POLITICAL_LEXICON["scam"]
+
+
+def test_prebuilt_lexicon_matches_vader(tmp_path):
+    path = str(tmp_path / "data" / "vader_lexicon.pkl")
+    write_lexicon(path)
+    lexicon, emojis = load_lexicon(path)
+
+    reference = SentimentIntensityAnalyzer()
+    reference.lexicon.update(POLITICAL_LEXICON)
+    assert lexicon == reference.lexicon and emojis == reference.emojis
+
+    text = "Welfare victory for farmers, no corruption :)"
+    assert build_analyzer(path).polarity_scores(text) == reference.polarity_scores(text)
+
+
+def test_stale_or_missing_lexicon_is_ignored(tmp_path):
+    path = str(tmp_path / "vader_lexicon.pkl")
+    assert load_lexicon(path) is None
+
+    with open(path, "wb") as f:
+        pickle.dump({"version": ("0.0", []), "lexicon": {}, "emojis": {}}, f)
+    assert load_lexicon(path) is None
+    assert build_analyzer(path).lexicon["welfare"] == POLITICAL_LEXICON["welfare"]
+
+
+def test_vercel_copy_has_the_same_political_lexicon():
+    path = os.path.join(os.path.dirname(__file__), "..", "..", "api", "services", "vader_lexicon.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    assignment = next(node for node in tree.body if isinstance(node, ast.Assign)
+                      and getattr(node.targets[0], "id", None) == "POLITICAL_LEXICON")
+    assert ast.literal_eval(assignment.value) == POLITICAL_LEXICON